@@ -0,0 +1,182 @@
+"""Admission chances instead of a hard cutoff filter.
+
+search_colleges only returns colleges whose cutoff is at or below the
+student's score. Here every college in the (exam, field, category) group
+gets a chance of admission instead. The chance models next year's cutoff
+as normally distributed around the current one. Its spread comes from how
+much the college's year-final cutoff moved between years in CutoffHistory,
+plus a small share of the cutoff itself. Each college is then banded:
+
+    safe    chance >= 0.8
+    target  chance >= 0.4
+    reach   chance >= min_chance (0.1 by default)
+
+A group's cutoffs and spreads are kept as parallel arrays sorted by cutoff,
+like the cutoff index. Scoring a student is one pass over the rows whose
+cutoff could still give min_chance, and College objects are only built for
+the top k of each band.
+"""
+import math
+import threading
+from array import array
+from bisect import bisect_right
+from statistics import NormalDist
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from cutoff_index import CutoffColumns, load_columns
+from database_operations import College, DatabaseManager
+
+BANDS = (("safe", 0.8), ("target", 0.4), ("reach", 0.0))
+
+# Year-final cutoffs of one group, in college and year order.
+_FINAL_CUTOFFS_QUERY = """
+    SELECT y.CollegeID, y.CutoffScore
+    FROM (
+        SELECT h.CollegeID, h.Year, h.CutoffScore, MAX(h.Round)
+        FROM CutoffHistory h
+        WHERE h.ExamID = (SELECT ExamID FROM Exams WHERE ExamName = ?) AND h.Category = ?
+          AND h.CutoffScore IS NOT NULL
+        GROUP BY h.CollegeID, h.Year
+    ) y
+    JOIN Colleges c ON c.CollegeID = y.CollegeID
+    WHERE c.Field = ?
+    ORDER BY y.CollegeID, y.Year
+"""
+
+
+class AdmissionChance(NamedTuple):
+    college: College
+    chance: float
+    band: str
+    # Student score minus cutoff: negative for reach colleges.
+    margin: float
+
+
+class ChanceColumns(NamedTuple):
+    """A group's cutoff columns with each row's cutoff spread alongside."""
+    columns: CutoffColumns
+    sigmas: array
+    max_sigma: float
+
+
+def yearly_spreads(rows) -> Dict[int, float]:
+    """Root mean square of year-to-year changes per college.
+
+    ``rows`` are (CollegeID, CutoffScore) in college and year order; colleges
+    with a single year of history are left out.
+    """
+    spreads = {}
+    previous_id = previous_score = None
+    total = count = 0
+    for college_id, score in rows:
+        if college_id != previous_id:
+            if count:
+                spreads[previous_id] = math.sqrt(total / count)
+            previous_id, total, count = college_id, 0.0, 0
+        else:
+            total += (score - previous_score) ** 2
+            count += 1
+        previous_score = score
+    if count:
+        spreads[previous_id] = math.sqrt(total / count)
+    return spreads
+
+
+class AdmissionChanceEngine:
+    """Score every college in a group for a student and keep the best of each band.
+
+    Groups are loaded once and reused until the database changes, whether
+    through this process or another one (see check_external_writes).
+    """
+
+    def __init__(self, db_manager: DatabaseManager, spread: float = 0.02,
+            min_sigma: float = 0.5, min_chance: float = 0.1):
+        if not 0 < min_chance < 1:
+            raise ValueError("min_chance must be between 0 and 1")
+        self.db_manager = db_manager
+        self.spread = spread
+        self.min_sigma = min_sigma
+        self.min_chance = min_chance
+        # How many spreads above the score a cutoff can be and still give min_chance.
+        self._reach_sigmas = -NormalDist().inv_cdf(min_chance)
+        self._groups: Dict[Tuple[str, str, str], ChanceColumns] = {}
+        db_manager.check_external_writes()
+        self._data_version = db_manager.data_version
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._groups = {}
+            self._data_version = self.db_manager.data_version
+
+    def _load(self, exam_name: str, field: str, category: str) -> ChanceColumns:
+        with self.db_manager.connection() as conn:
+            columns = load_columns(conn, exam_name, field, category)
+            spreads = yearly_spreads(conn.execute(_FINAL_CUTOFFS_QUERY,
+                                                  (exam_name, category, field)))
+        sigmas = array('d', (
+            math.hypot(spreads.get(college_id, 0.0), max(self.spread * cutoff, self.min_sigma))
+            for college_id, cutoff in zip(columns.college_ids, columns.scores)))
+        return ChanceColumns(columns, sigmas, max(sigmas, default=0.0))
+
+    def group(self, exam_name: str, field: str, category: str) -> ChanceColumns:
+        """The arrays for one (exam, field, category), loading them on first use."""
+        key = (exam_name, field, category)
+        self.db_manager.check_external_writes()
+        with self._lock:
+            if self._data_version != self.db_manager.data_version:
+                self._groups = {}
+                self._data_version = self.db_manager.data_version
+            group = self._groups.get(key)
+            version = self._data_version
+        if group is None:
+            group = self._load(*key)
+            with self._lock:
+                # A write during the load may have left it half-stale.
+                if version == self.db_manager.data_version:
+                    self._groups[key] = group
+        return group
+
+    def chances(self, exam_name: str, field: str, category: str, score: float,
+            budget: Optional[float] = None, k: int = 10) -> List[AdmissionChance]:
+        """The k most selective colleges of each band, safe band first.
+
+        Within a band colleges are ordered by cutoff, highest first.
+        """
+        columns, sigmas, max_sigma = self.group(exam_name, field, category)
+        end = bisect_right(columns.scores, score + self._reach_sigmas * max_sigma)
+        erfc, root2 = math.erfc, math.sqrt(2)
+        chances = [0.5 * erfc((cutoff - score) / (sigma * root2))
+                   for cutoff, sigma in zip(columns.scores[:end], sigmas[:end])]
+
+        picked = {name: [] for name, _ in BANDS}
+        wanted = len(BANDS)
+        for i in range(end - 1, -1, -1):
+            chance = chances[i]
+            if chance < self.min_chance or (budget and columns.fees[i] > budget):
+                continue
+            band = next(name for name, threshold in BANDS if chance >= threshold)
+            rows = picked[band]
+            if len(rows) < k:
+                rows.append(i)
+                if len(rows) == k:
+                    wanted -= 1
+                    if not wanted:
+                        break
+
+        results = []
+        for band, _ in BANDS:
+            for i in picked[band]:
+                cutoff = columns.scores[i]
+                results.append(AdmissionChance(
+                    College(
+                        name=columns.names[i],
+                        location=columns.locations[i],
+                        cutoff_score=cutoff,
+                        field=field,
+                        tuition_fee=columns.fees[i]
+                    ),
+                    chance=round(chances[i], 4),
+                    band=band,
+                    margin=round(score - cutoff, 2)))
+        return results
@@ -0,0 +1,325 @@
+"""Batch recommendations for a whole cohort of students.
+
+Students are grouped by (exam, field, category). Each group loads its cutoffs
+once, sorted by score, and every student in the group is answered from that
+sorted list instead of issuing one query per student.
+
+Run as a script to process a CSV or JSONL file of students with a pool of
+worker processes::
+
+    python batch_recommender.py students.csv recommendations.jsonl --workers 4
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from cutoff_index import CutoffColumns, load_columns
+from database_operations import College, CollegeList, DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class StudentRecord(NamedTuple):
+    student_id: str
+    exam: str
+    field: str
+    category: str
+    score: float
+    budget: Optional[float] = None
+
+
+@dataclass
+class StudentResult:
+    student_id: str
+    colleges: Sequence[College]
+
+
+@dataclass
+class BatchStats:
+    students: int = 0
+    groups_loaded: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def students_per_second(self) -> float:
+        return self.students / self.elapsed if self.elapsed else 0.0
+
+
+class BatchRecommender:
+    """Produce recommendations for many students with one pass per group."""
+
+    def __init__(self, db_manager: DatabaseManager, chunk_size: int = 10000,
+            limit: Optional[int] = None):
+        self.db_manager = db_manager
+        self.chunk_size = chunk_size
+        self.limit = limit
+        self.stats = BatchStats()
+        self._columns: Dict[Tuple[str, str, str], CutoffColumns] = {}
+
+    def _group_columns(self, key: Tuple[str, str, str]) -> CutoffColumns:
+        """Sorted cutoffs for a group, loaded at most once per batch."""
+        columns = self._columns.get(key)
+        if columns is None:
+            if self.db_manager.cutoff_index is not None:
+                columns = self.db_manager.cutoff_index.columns(*key) or CutoffColumns()
+            else:
+                with self.db_manager.connection() as conn:
+                    columns = load_columns(conn, *key)
+            self._columns[key] = columns
+            self.stats.groups_loaded += 1
+        return columns
+
+    def _recommend_chunk(self, chunk: List[StudentRecord]) -> List[StudentResult]:
+        groups: Dict[Tuple[str, str, str], List[int]] = {}
+        for position, record in enumerate(chunk):
+            groups.setdefault((record.exam, record.field, record.category), []).append(position)
+
+        results: List[Optional[StudentResult]] = [None] * len(chunk)
+        for key, positions in groups.items():
+            columns = self._group_columns(key)
+            field = key[1]
+            for position in positions:
+                record = chunk[position]
+                names, locations, scores, fees = columns.eligible(
+                    record.score, record.budget, self.limit)
+                # Columns, not College objects: a cohort's results can run
+                # to millions of rows.
+                results[position] = StudentResult(
+                    student_id=record.student_id,
+                    colleges=CollegeList(field, names, locations, scores, fees)
+                )
+        return results
+
+    def recommend(self, records: Iterable[Tuple]) -> Iterator[StudentResult]:
+        """Yield a StudentResult for every record, in input order.
+
+        Records are read in chunks of ``chunk_size`` so arbitrarily large
+        streams are processed in bounded memory.
+        """
+        self.stats = BatchStats()
+        self._columns = {}
+        if self.db_manager.cutoff_index is not None:
+            self.db_manager.check_external_writes()
+        started = time.perf_counter()
+        iterator = (StudentRecord(*record) for record in records)
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                break
+            yield from self._recommend_chunk(chunk)
+            self.stats.students += len(chunk)
+            self.stats.elapsed = time.perf_counter() - started
+            logger.debug(f"Processed {self.stats.students} students "
+                         f"({self.stats.students_per_second:,.0f} students/s)")
+        logger.info(f"Recommended colleges for {self.stats.students} students in "
+                    f"{self.stats.elapsed:.2f}s ({self.stats.students_per_second:,.0f} students/s)")
+
+
+def recommend_batch(db_manager: DatabaseManager,
+        records: Iterable[Tuple]) -> Iterator[StudentResult]:
+    """Convenience wrapper around BatchRecommender.recommend."""
+    return BatchRecommender(db_manager).recommend(records)
+
+
+# --- Command line batch processing -------------------------------------------
+
+OUTPUT_FIELDS = ["student_id", "rank", "college", "location", "field",
+                 "cutoff_score", "tuition_fee"]
+
+_worker_recommender: Optional[BatchRecommender] = None
+_worker_jsonl = False
+
+
+def parse_student(row: dict) -> StudentRecord:
+    """Build a StudentRecord from a CSV row or JSON object; raises on bad input."""
+    budget = row.get("budget")
+    return StudentRecord(
+        student_id=str(row["student_id"]),
+        exam=row["exam"],
+        field=row["field"],
+        category=row["category"],
+        score=float(row["score"]),
+        budget=float(budget) if budget not in (None, "") else None
+    )
+
+
+def read_students(path: str) -> Iterator[Optional[StudentRecord]]:
+    """Stream student records from a CSV or JSONL file.
+
+    Unparseable rows are reported and yielded as None so that input
+    positions (used for checkpoints) stay stable.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        jsonl = path.lower().endswith(".jsonl")
+        rows = (line for line in f if line.strip()) if jsonl else csv.DictReader(f)
+        for line_number, row in enumerate(rows, start=1):
+            try:
+                if jsonl:
+                    row = json.loads(row)
+                if not isinstance(row, dict):
+                    raise TypeError("record is not an object")
+                yield parse_student(row)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Skipping record {line_number}: {e}", file=sys.stderr)
+                yield None
+
+
+def _init_worker(db_path: str, limit: Optional[int], jsonl: bool):
+    """Give each worker process its own read-only connection."""
+    global _worker_recommender, _worker_jsonl
+    _worker_recommender = BatchRecommender(
+        DatabaseManager(db_path, pool_size=1, read_only=True), limit=limit)
+    _worker_jsonl = jsonl
+
+
+def _process_chunk(chunk: List[Optional[StudentRecord]]) -> bytes:
+    """Recommend and format one chunk, so the parent only has to write it."""
+    records = [record for record in chunk if record is not None]
+    results = _worker_recommender._recommend_chunk(records)
+    return _format_results(results, _worker_jsonl).encode("utf-8")
+
+
+def _format_results(results: List[StudentResult], jsonl: bool) -> str:
+    buffer = io.StringIO()
+    if jsonl:
+        for result in results:
+            buffer.write(json.dumps({
+                "student_id": result.student_id,
+                "colleges": [asdict(college) for college in result.colleges]
+            }) + "\n")
+    else:
+        writer = csv.writer(buffer)
+        for result in results:
+            for rank, college in enumerate(result.colleges, start=1):
+                writer.writerow([result.student_id, rank, college.name,
+                                 college.location, college.field,
+                                 college.cutoff_score, college.tuition_fee])
+    return buffer.getvalue()
+
+
+def _load_checkpoint(path: Optional[str]) -> dict:
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {"records_done": 0, "output_offset": 0}
+
+
+def _save_checkpoint(path: Optional[str], records_done: int, output_offset: int):
+    if not path:
+        return
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"records_done": records_done, "output_offset": output_offset}, f)
+    os.replace(temp_path, path)
+
+
+def run_batch(input_path: str, output_path: str, db_path: str = "career_counseling.db",
+        workers: Optional[int] = None, chunk_size: int = 1000,
+        checkpoint_path: Optional[str] = None, limit: Optional[int] = None) -> int:
+    """Process a student file with a worker pool and return the students recommended.
+
+    Unparseable records are skipped and not counted.
+
+    Chunks are written in input order and at most ``2 * workers`` chunks are
+    in flight, so memory use does not depend on the size of the input. With a
+    checkpoint file, an interrupted run resumes after the last written chunk.
+    """
+    workers = workers or os.cpu_count() or 1
+    jsonl = output_path.lower().endswith(".jsonl")
+    checkpoint = _load_checkpoint(checkpoint_path)
+    records_done = checkpoint["records_done"]
+
+    output = open(output_path, "a+b" if records_done else "wb")
+    output.truncate(checkpoint["output_offset"])
+    output.seek(0, os.SEEK_END)
+    if not records_done and not jsonl:
+        output.write((",".join(OUTPUT_FIELDS) + "\r\n").encode("utf-8"))
+
+    students = islice(read_students(input_path), records_done, None)
+    started = time.perf_counter()
+    processed = skipped = 0
+    pending = deque()
+
+    def write_oldest():
+        nonlocal records_done, processed, skipped
+        chunk_length, students_in_chunk, async_result = pending.popleft()
+        output.write(async_result.get())
+        output.flush()
+        # Checkpoints count input records; the totals count students only.
+        records_done += chunk_length
+        processed += students_in_chunk
+        skipped += chunk_length - students_in_chunk
+        _save_checkpoint(checkpoint_path, records_done, output.tell())
+        elapsed = time.perf_counter() - started
+        print(f"\r{records_done:,} records written "
+              f"({processed / elapsed:,.0f} rows/s)", end="", file=sys.stderr)
+
+    try:
+        with multiprocessing.Pool(workers, initializer=_init_worker,
+                                  initargs=(db_path, limit, jsonl)) as pool:
+            while True:
+                chunk = list(islice(students, chunk_size))
+                if not chunk:
+                    break
+                students_in_chunk = sum(record is not None for record in chunk)
+                pending.append((len(chunk), students_in_chunk,
+                                pool.apply_async(_process_chunk, (chunk,))))
+                if len(pending) >= 2 * workers:
+                    write_oldest()
+            while pending:
+                write_oldest()
+    finally:
+        output.close()
+        print(file=sys.stderr)
+        if skipped:
+            print(f"Skipped {skipped:,} unparseable records", file=sys.stderr)
+
+    # A finished run leaves nothing to resume.
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return processed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate college recommendations for a file of students.")
+    parser.add_argument("input", help="CSV or JSONL file with student_id, exam, "
+                                      "field, category, score and optional budget")
+    parser.add_argument("output", help="output file; .jsonl writes one line per "
+                                       "student, anything else writes CSV")
+    parser.add_argument("--db", default="career_counseling.db", help="database path")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="students sent to a worker at a time")
+    parser.add_argument("--checkpoint", default=None,
+                        help="checkpoint file used to resume an interrupted run")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="maximum colleges listed per student")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    processed = run_batch(args.input, args.output, db_path=args.db,
+                          workers=args.workers, chunk_size=args.chunk_size,
+                          checkpoint_path=args.checkpoint, limit=args.limit)
+    elapsed = time.perf_counter() - started
+    print(f"Processed {processed:,} students in {elapsed:.2f}s "
+          f"({processed / elapsed if elapsed else 0:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
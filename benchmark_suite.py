@@ -0,0 +1,242 @@
+"""Repeatable benchmark suite with machine-readable results.
+
+Every run builds the same synthetic database (see synthetic_data.py), times
+the operations the two GUIs perform and writes the results as JSON, so runs
+on different commits can be compared::
+
+    python benchmark_suite.py --output before.json
+    git checkout other-branch
+    python benchmark_suite.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Callable, Dict, List
+
+from bulk_import import BulkImporter
+from database_operations import DatabaseManager
+from synthetic_data import FEE_DISTRIBUTIONS, SyntheticConfig, exam_names, import_rows, populate
+
+SUITE_VERSION = 1
+
+
+def _summary(timings: List[float]) -> dict:
+    """Latency statistics in milliseconds for a list of per-call seconds."""
+    ordered = sorted(timings)
+    pick = lambda q: ordered[min(int(len(ordered) * q), len(ordered) - 1)] * 1000
+    total = sum(ordered)
+    return {
+        "calls": len(ordered),
+        "total_s": round(total, 6),
+        "mean_ms": round(total / len(ordered) * 1000, 4),
+        "p50_ms": round(pick(0.50), 4),
+        "p95_ms": round(pick(0.95), 4),
+        "p99_ms": round(pick(0.99), 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+        "ops_per_s": round(len(ordered) / total, 1) if total else None,
+    }
+
+
+def _time_each(func: Callable, arguments: List[tuple]) -> dict:
+    timings = []
+    for args in arguments:
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return _summary(timings)
+
+
+def _search_queries(config: SyntheticConfig, iterations: int, rng: random.Random) -> List[tuple]:
+    exams = exam_names(config.exams)
+    queries = []
+    for _ in range(iterations):
+        exam = rng.choice(exams)
+        budget = rng.choice([None, None, config.fee_min * 10, config.fee_max / 4])
+        queries.append((exam, rng.choice(config.fields), rng.choice(config.categories),
+                        rng.uniform(0, 400), budget))
+    return queries
+
+
+def bench_reads(db_manager: DatabaseManager, config: SyntheticConfig,
+        iterations: int, seed: int) -> Dict[str, dict]:
+    rng = random.Random(seed)
+    queries = _search_queries(config, iterations, rng)
+    results = {"search_colleges": _time_each(db_manager.search_colleges, queries)}
+
+    db_manager.enable_cutoff_index()
+    results["search_colleges_cutoff_index"] = _time_each(db_manager.search_colleges, queries)
+    db_manager.cutoff_index = None
+
+    results["get_exam_types"] = _time_each(db_manager.get_exam_types, [()] * iterations)
+
+    terms = ["", "institute", "city 1", "medical college 12", "ture", "zzz"]
+    sorts = ["Name (A-Z)", "Name (Z-A)", "Fee (Low-High)", "Fee (High-Low)"]
+    admin_queries = [(rng.choice(terms), rng.choice([None] + config.fields), rng.choice(sorts))
+                     for _ in range(max(iterations // 10, 10))]
+    results["admin_search"] = _time_each(db_manager.search_college_list, admin_queries)
+    return results
+
+
+def bench_writes(db_manager: DatabaseManager, config: SyntheticConfig,
+        iterations: int, seed: int) -> Dict[str, dict]:
+    rng = random.Random(seed)
+    exams = exam_names(config.exams)
+    writes = max(iterations // 5, 10)
+
+    def form(number):
+        return (f"Benchmark College {seed}-{number}", f"City {rng.randrange(config.locations)}",
+                rng.choice(config.fields), round(rng.uniform(config.fee_min, config.fee_max), 2),
+                rng.choice(exams), {c: round(rng.uniform(0, 300), 2) for c in config.categories})
+
+    # The same calls CollegeManagerGUI makes for add, update and delete.
+    added, timings = [], []
+    for number in range(writes):
+        values = form(number)
+        started = time.perf_counter()
+        college_id = db_manager.add_college(*values)
+        timings.append(time.perf_counter() - started)
+        added.append(college_id)
+    results = {"add_college": _summary(timings)}
+
+    timings = []
+    for number, college_id in enumerate(added):
+        values = form(writes + number)
+        started = time.perf_counter()
+        db_manager.update_college(college_id, *values)
+        timings.append(time.perf_counter() - started)
+    results["update_college"] = _summary(timings)
+
+    timings = []
+    for college_id in added:
+        started = time.perf_counter()
+        db_manager.delete_college(college_id)
+        timings.append(time.perf_counter() - started)
+    results["delete_college"] = _summary(timings)
+    return results
+
+
+def bench_bulk_load(tmp: str, config: SyntheticConfig) -> Dict[str, dict]:
+    """Generator populate and CSV-style bulk import of the same data into empty databases."""
+    db_manager = DatabaseManager(os.path.join(tmp, "populate.db"))
+    started = time.perf_counter()
+    colleges, cutoffs = populate(db_manager, config)
+    elapsed = time.perf_counter() - started
+    db_manager.close()
+    results = {"populate": {"colleges": colleges, "rows": cutoffs, "seconds": round(elapsed, 4),
+                            "rows_per_s": round(cutoffs / elapsed, 1)}}
+
+    db_manager = DatabaseManager(os.path.join(tmp, "import.db"))
+    stats = BulkImporter(db_manager).import_rows(import_rows(config))
+    db_manager.close()
+    results["bulk_import"] = {"rows": stats.rows_imported, "rejected": stats.rows_rejected,
+                              "seconds": round(stats.elapsed, 4),
+                              "rows_per_s": round(stats.rows_per_second, 1)}
+    return results
+
+
+def _git_commit() -> dict:
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=here, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    cwd=here, capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def run_suite(config: SyntheticConfig, iterations: int = 1000, bulk_colleges: int = 5000,
+        only: List[str] = None) -> dict:
+    """Run the suite and return a JSON-serialisable result document."""
+    benchmarks = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "suite.db"))
+        started = time.perf_counter()
+        populate(db_manager, config)
+        setup_seconds = time.perf_counter() - started
+        try:
+            if not only or "reads" in only:
+                benchmarks.update(bench_reads(db_manager, config, iterations, config.seed))
+            if not only or "writes" in only:
+                benchmarks.update(bench_writes(db_manager, config, iterations, config.seed))
+        finally:
+            db_manager.close()
+        if not only or "bulk" in only:
+            bulk_config = SyntheticConfig(**{**asdict(config), "colleges": bulk_colleges})
+            benchmarks.update(bench_bulk_load(tmp, bulk_config))
+
+    return {
+        "suite_version": SUITE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        **_git_commit(),
+        "environment": {"python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+                        "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": asdict(config),
+        "iterations": iterations,
+        "setup_s": round(setup_seconds, 4),
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(baseline: dict, current: dict, out=sys.stdout):
+    """Print the change in each benchmark's headline number against a baseline."""
+    if baseline.get("config") != current.get("config"):
+        print("warning: the runs used different data configurations", file=out)
+    print(f"{'benchmark':<30} {'metric':<11} {'baseline':>12} {'current':>12} {'change':>9}",
+          file=out)
+    for name, result in current["benchmarks"].items():
+        old = baseline.get("benchmarks", {}).get(name)
+        metric = "p50_ms" if "p50_ms" in result else "rows_per_s"
+        if not old or metric not in old:
+            print(f"{name:<30} {metric:<11} {'-':>12} {result[metric]:>12} {'new':>9}", file=out)
+            continue
+        change = (result[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+        print(f"{name:<30} {metric:<11} {old[metric]:>12} {result[metric]:>12} "
+              f"{change:>+8.1f}%", file=out)
+
+
+def main():
+    defaults = SyntheticConfig()
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and emit JSON.")
+    parser.add_argument("--colleges", type=int, default=defaults.colleges)
+    parser.add_argument("--exams", type=int, default=defaults.exams)
+    parser.add_argument("--fees", choices=FEE_DISTRIBUTIONS, default=defaults.fee_distribution,
+                        help="tuition fee distribution")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--iterations", type=int, default=1000,
+                        help="calls per read benchmark (writes use a fifth)")
+    parser.add_argument("--bulk-colleges", type=int, default=5000,
+                        help="colleges in the bulk load benchmarks")
+    parser.add_argument("--only", action="append", choices=["reads", "writes", "bulk"],
+                        help="run only these groups (repeatable)")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON from an earlier run")
+    args = parser.parse_args()
+
+    config = SyntheticConfig(colleges=args.colleges, exams=args.exams,
+                             fee_distribution=args.fees, seed=args.seed)
+    result = run_suite(config, iterations=args.iterations,
+                       bulk_colleges=args.bulk_colleges, only=args.only)
+
+    document = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), result, out=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
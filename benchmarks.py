@@ -0,0 +1,1154 @@
+"""Micro-benchmarks for the database layer.
+
+Run with ``python benchmarks.py``. Each benchmark builds its own temporary
+database so the real ``career_counseling.db`` is never touched.
+"""
+import asyncio
+import csv
+import gc
+import json
+import multiprocessing
+import os
+import random
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from dataclasses import dataclass
+
+from batch_recommender import BatchRecommender, StudentRecord
+from bulk_import import IMPORT_FIELDS, BulkImporter, read_rows
+from database_operations import College, CollegeList, CollegeOption, DatabaseManager
+from startup_profile import CLICK_TIME_ENV, EXIT_AFTER_PAINT_ENV, REPORT_PAINT_ENV
+from synthetic_data import SyntheticConfig, populate
+
+EXAMS = ["JEE Main", "JEE Advanced", "NEET", "BITSAT"]
+FIELDS = ["Engineering", "Medicine", "Architecture"]
+CATEGORIES = ["General", "OBC", "SC", "ST"]
+
+
+def populate_sample_data(db_manager, colleges=2000, seed=42):
+    """Fill an empty database with synthetic colleges for benchmarking.
+
+    One exam per college, every category, fees from 50k to 500k and all
+    exams marked out of 360, which the query mixes below are written for.
+    """
+    populate(db_manager, SyntheticConfig(
+        colleges=colleges, exams=len(EXAMS), categories=CATEGORIES, fields=FIELDS,
+        locations=200, exams_per_college=1, fee_distribution="uniform",
+        fee_min=50000.0, fee_max=500000.0, max_score=360.0, seed=seed))
+
+
+def _search_connect_per_call(db_path, exam_name, field, category, score):
+    """The search path as it was before pooling: one connection per query."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT c.CollegeName, c.Location, ct.CutoffScore, c.Field, c.TuitionFee
+        FROM Colleges c
+        JOIN Cutoffs ct ON c.CollegeID = ct.CollegeID
+        JOIN Exams e ON ct.ExamID = e.ExamID
+        WHERE e.ExamName = ? AND c.Field = ? AND ct.Category = ?
+        AND ct.CutoffScore <= ?
+        ORDER BY ct.CutoffScore DESC
+    """, (exam_name, field, category, score))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+# The three-way join search_colleges ran before CutoffRanking existed.
+_JOIN_SEARCH = """
+    SELECT c.CollegeName, c.Location, ct.CutoffScore, c.Field, c.TuitionFee
+    FROM Colleges c
+    JOIN Cutoffs ct ON c.CollegeID = ct.CollegeID
+    JOIN Exams e ON ct.ExamID = e.ExamID
+    WHERE e.ExamName = ? AND c.Field = ? AND ct.Category = ?
+    AND ct.CutoffScore <= ? AND (? IS NULL OR c.TuitionFee <= ?)
+    ORDER BY ct.CutoffScore DESC, c.CollegeID DESC
+"""
+
+
+def _join_search(db_manager, exam_name, field, category, score, budget=None):
+    with db_manager.connection() as conn:
+        rows = conn.execute(_JOIN_SEARCH, (exam_name, field, category, score,
+                                           budget, budget)).fetchall()
+    return [College(name, location, cutoff, college_field, fee)
+            for name, location, cutoff, college_field, fee in rows]
+
+
+def _scramble(db_manager, rng, edits):
+    """Apply a mix of admin-style writes to exercise the ranking triggers."""
+    with db_manager.transaction() as conn:
+        ids = [row[0] for row in conn.execute("SELECT CollegeID FROM Colleges")]
+        exam_ids = [row[0] for row in conn.execute("SELECT ExamID FROM Exams")]
+        for _ in range(edits):
+            college_id = rng.choice(ids)
+            action = rng.randrange(5)
+            if action == 0:
+                conn.execute("UPDATE Colleges SET TuitionFee = ?, Field = ? WHERE CollegeID = ?",
+                             (round(rng.uniform(50000, 500000), 2), rng.choice(FIELDS), college_id))
+            elif action == 1:
+                conn.execute("UPDATE Cutoffs SET CutoffScore = ? WHERE CollegeID = ?",
+                             (round(rng.uniform(0, 360), 2), college_id))
+            elif action == 2:
+                conn.execute("DELETE FROM Cutoffs WHERE CollegeID = ? AND Category = 'SC'",
+                             (college_id,))
+            elif action == 3:
+                conn.execute("DELETE FROM Cutoffs WHERE CollegeID = ?", (college_id,))
+                conn.execute("DELETE FROM Colleges WHERE CollegeID = ?", (college_id,))
+                ids.remove(college_id)
+            else:
+                conn.execute(
+                    "INSERT INTO Cutoffs (CollegeID, ExamID, Category, CutoffScore) "
+                    "VALUES (?, ?, 'ST', ?) ON CONFLICT(CollegeID, ExamID, Category) "
+                    "DO UPDATE SET CutoffScore = excluded.CutoffScore",
+                    (college_id, rng.choice(exam_ids), round(rng.uniform(0, 360), 2)))
+
+
+def bench_cutoff_ranking(colleges=20000, iterations=500):
+    """The precomputed CutoffRanking lookup against the three-way join."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "ranking.db"))
+        populate_sample_data(db_manager, colleges=colleges)
+
+        rng = random.Random(13)
+        queries = [(rng.choice(EXAMS), rng.choice(FIELDS), rng.choice(CATEGORIES),
+                    rng.uniform(0, 360), rng.choice([None, 150000, 300000]))
+                   for _ in range(iterations)]
+
+        _scramble(db_manager, rng, edits=2000)
+        for query in queries:
+            if db_manager.search_colleges_sql(*query) != _join_search(db_manager, *query):
+                print(f"CutoffRanking out of step with the join for {query}")
+                sys.exit(1)
+
+        print(f"search over {colleges} colleges after 2000 writes, "
+              f"{iterations} queries (results match)")
+        _report("three-way join", _time_calls(
+            lambda *q: _join_search(db_manager, *q), queries))
+        _report("CutoffRanking", _time_calls(db_manager.search_colleges_sql, queries))
+        db_manager.close()
+
+
+def _time_calls(func, queries):
+    timings = []
+    for args in queries:
+        start = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"  {label:<22} mean {statistics.mean(timings):7.3f} ms"
+          f"   median {statistics.median(timings):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+def bench_connection_pool(iterations=500):
+    """Compare per-query latency of connect-per-call against the pool."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        db_manager = DatabaseManager(db_path)
+        populate_sample_data(db_manager)
+
+        rng = random.Random(7)
+        queries = [(rng.choice(EXAMS), rng.choice(FIELDS), rng.choice(CATEGORIES),
+                    rng.uniform(0, 360)) for _ in range(iterations)]
+
+        print(f"search_colleges latency over {iterations} queries")
+        _report("connect per call",
+                _time_calls(lambda *q: _search_connect_per_call(db_path, *q), queries))
+        _report("pooled connection", _time_calls(db_manager.search_colleges, queries))
+        db_manager.close()
+
+
+def check_search_plan(colleges=100000):
+    """Fail if search_colleges stops using the search indexes.
+
+    A full scan of Colleges or Cutoffs, or a temporary B-tree for the
+    ORDER BY, means the covering indexes are no longer being used.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "plan.db")
+        db_manager = DatabaseManager(db_path)
+        populate_sample_data(db_manager, colleges=colleges)
+        with db_manager.transaction() as conn:
+            conn.execute("ANALYZE")
+
+        failures = []
+        for budget in (None, 200000):
+            plan = db_manager.explain_search("JEE Main", "Engineering", "General",
+                                             180, budget)
+            print(f"search_colleges plan (budget={budget}):")
+            for detail in plan:
+                print(f"  {detail}")
+                if detail.startswith("SCAN") or "TEMP B-TREE" in detail:
+                    failures.append(detail)
+        db_manager.close()
+
+    if failures:
+        print("Query plan regression: " + "; ".join(failures))
+        sys.exit(1)
+    print(f"Query plan OK on {colleges} colleges")
+
+
+def bench_cutoff_index(colleges=20000, iterations=500):
+    """Cross-check the in-memory cutoff index against SQL and time both."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "index.db")
+        db_manager = DatabaseManager(db_path)
+        populate_sample_data(db_manager, colleges=colleges)
+        db_manager.enable_cutoff_index()
+
+        rng = random.Random(11)
+        queries = [(rng.choice(EXAMS), rng.choice(FIELDS), rng.choice(CATEGORIES),
+                    rng.uniform(0, 360), rng.choice([None, 150000, 300000]))
+                   for _ in range(iterations)]
+
+        for query in queries:
+            if db_manager.cutoff_index.search(*query) != db_manager.search_colleges_sql(*query):
+                print(f"Cutoff index mismatch for {query}")
+                sys.exit(1)
+
+        # Patch one college and make sure the index follows the database.
+        with db_manager.transaction() as conn:
+            college_id = conn.execute("SELECT MIN(CollegeID) FROM Colleges").fetchone()[0]
+            conn.execute("UPDATE Cutoffs SET CutoffScore = 1 WHERE CollegeID = ?", (college_id,))
+            conn.execute("UPDATE Colleges SET TuitionFee = 1 WHERE CollegeID = ?", (college_id,))
+        db_manager.refresh_college(college_id)
+        for query in queries[:50]:
+            if db_manager.cutoff_index.search(*query) != db_manager.search_colleges_sql(*query):
+                print(f"Cutoff index mismatch after refresh for {query}")
+                sys.exit(1)
+
+        print(f"search over {colleges} colleges, {iterations} queries (results match)")
+        _report("SQL", _time_calls(db_manager.search_colleges_sql, queries))
+        _report("cutoff index", _time_calls(db_manager.cutoff_index.search, queries))
+        db_manager.close()
+
+
+def bench_batch(colleges=20000, students=20000):
+    """Throughput of the batch API against one search_colleges call per student."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "batch.db")
+        db_manager = DatabaseManager(db_path)
+        populate_sample_data(db_manager, colleges=colleges)
+
+        rng = random.Random(3)
+        records = [(f"S{i:06d}", rng.choice(EXAMS), rng.choice(FIELDS),
+                    rng.choice(CATEGORIES), rng.uniform(0, 360),
+                    rng.choice([None, 150000, 300000]))
+                   for i in range(students)]
+
+        print(f"batch recommendations for {students} students over {colleges} colleges")
+        recommender = BatchRecommender(db_manager)
+        batch_results = list(recommender.recommend(records))
+        stats = recommender.stats
+        print(f"  {'batch API':<22} {stats.elapsed:7.2f} s   "
+              f"{stats.students_per_second:10,.0f} students/s   "
+              f"{stats.groups_loaded} groups loaded")
+
+        sample = records[:2000]
+        start = time.perf_counter()
+        single_results = [db_manager.search_colleges(*record[1:]) for record in sample]
+        elapsed = time.perf_counter() - start
+        print(f"  {'per-student queries':<22} {elapsed:7.2f} s   "
+              f"{len(sample) / elapsed:10,.0f} students/s   (first {len(sample)} students)")
+
+        for result, expected in zip(batch_results, single_results):
+            if result.colleges != expected:
+                print(f"Batch result mismatch for {result.student_id}")
+                sys.exit(1)
+        db_manager.close()
+
+
+def bench_result_cache(colleges=20000, iterations=2000, distinct=200):
+    """search_colleges latency for a repetitive counsellor workload, cached and not."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "bench.db"))
+        populate_sample_data(db_manager, colleges)
+
+        rng = random.Random(11)
+        # Counsellors mostly revisit a handful of popular queries.
+        popular = [(rng.choice(EXAMS), rng.choice(FIELDS), rng.choice(CATEGORIES),
+                    round(rng.uniform(100, 360)), rng.choice([None, 200000, 400000]))
+                   for _ in range(distinct)]
+        queries = [popular[min(int(rng.paretovariate(1.2)) - 1, distinct - 1)]
+                   for _ in range(iterations)]
+
+        print(f"search_colleges over {iterations} queries ({distinct} distinct)")
+        _report("uncached", _time_calls(db_manager.search_colleges, queries))
+        db_manager.enable_result_cache(max_entries=64)
+        _report("LRU cache", _time_calls(db_manager.search_colleges, queries))
+        stats = db_manager.cache_stats()
+        print(f"  hit rate {stats['hit_rate']:.1%}, {stats['evictions']} evictions")
+
+        # A write must be visible to the very next search.
+        exam, field, category, _, _ = popular[0]
+        before = db_manager.search_colleges(exam, field, category, 1000)
+        with db_manager.transaction() as conn:
+            exam_id = conn.execute("SELECT ExamID FROM Exams WHERE ExamName = ?",
+                                   (exam,)).fetchone()[0]
+            college_id = conn.execute(
+                "INSERT INTO Colleges (CollegeName, Location, Field, TuitionFee) "
+                "VALUES ('Cache Check', 'Nowhere', ?, 1)", (field,)).lastrowid
+            conn.execute("INSERT INTO Cutoffs (CollegeID, ExamID, Category, CutoffScore) "
+                         "VALUES (?, ?, ?, 0)", (college_id, exam_id, category))
+        db_manager.refresh_college(college_id)
+        after = db_manager.search_colleges(exam, field, category, 1000)
+        db_manager.close()
+        if len(after) != len(before) + 1:
+            print("Result cache served a stale result after a write")
+            sys.exit(1)
+        print("  write invalidated the cache")
+
+
+def _percentiles(timings):
+    timings = sorted(timings)
+    if not timings:
+        return "no successful calls"
+    pick = lambda q: timings[min(int(len(timings) * q), len(timings) - 1)]
+    return (f"p50 {pick(0.50):8.2f} ms   p95 {pick(0.95):8.2f} ms   "
+            f"p99 {pick(0.99):8.2f} ms   max {timings[-1]:8.2f} ms")
+
+
+def _stress_reader(db_path, duration, busy_timeout, seed, results):
+    """Run recommender searches until the deadline; report latencies and lock errors."""
+    import sqlite3
+    from database_operations import is_lock_error
+    db_manager = DatabaseManager(db_path, read_only=True, busy_timeout=busy_timeout)
+    rng = random.Random(seed)
+    timings, lock_errors = [], 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        query = (rng.choice(EXAMS), rng.choice(FIELDS), rng.choice(CATEGORIES),
+                 rng.uniform(0, 360))
+        started = time.perf_counter()
+        try:
+            db_manager.search_colleges_sql(*query)
+            timings.append((time.perf_counter() - started) * 1000)
+        except Exception as e:
+            cause = e.__context__
+            if isinstance(cause, sqlite3.Error) and is_lock_error(cause):
+                lock_errors += 1
+            else:
+                raise
+    db_manager.close()
+    results.put(("reader", timings, lock_errors))
+
+
+def _stress_writer(db_path, duration, busy_timeout, journal_mode, results):
+    """Keep editing colleges the way update_college does until the deadline."""
+    import sqlite3
+    from database_operations import is_lock_error
+    db_manager = DatabaseManager(db_path, journal_mode=journal_mode,
+                                 busy_timeout=busy_timeout)
+    rng = random.Random(99)
+    with db_manager.connection() as conn:
+        ids = [row[0] for row in conn.execute("SELECT CollegeID FROM Colleges")]
+
+    def update(conn):
+        college_id = rng.choice(ids)
+        conn.execute("UPDATE Colleges SET TuitionFee = ? WHERE CollegeID = ?",
+                     (round(rng.uniform(50000, 500000), 2), college_id))
+        conn.execute("UPDATE Cutoffs SET CutoffScore = ? WHERE CollegeID = ?",
+                     (round(rng.uniform(0, 360), 2), college_id))
+
+    timings, lock_errors = [], 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            db_manager.run_write(update)
+            timings.append((time.perf_counter() - started) * 1000)
+        except sqlite3.OperationalError as e:
+            if not is_lock_error(e):
+                raise
+            lock_errors += 1
+    db_manager.close()
+    results.put(("writer", timings, lock_errors))
+
+
+def bench_concurrency(readers=4, duration=5.0, colleges=20000, busy_timeout=0.2):
+    """N reader processes against one writer, in rollback-journal and WAL mode."""
+    for journal_mode in ("DELETE", "WAL"):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "stress.db")
+            db_manager = DatabaseManager(db_path, journal_mode=journal_mode)
+            populate_sample_data(db_manager, colleges=colleges)
+            db_manager.close()
+
+            results = multiprocessing.Queue()
+            processes = [multiprocessing.Process(
+                target=_stress_writer,
+                args=(db_path, duration, busy_timeout, journal_mode, results))]
+            processes += [multiprocessing.Process(
+                target=_stress_reader,
+                args=(db_path, duration, busy_timeout, seed, results))
+                for seed in range(readers)]
+            for process in processes:
+                process.start()
+            outcomes = [results.get(timeout=duration + 120) for _ in processes]
+            for process in processes:
+                process.join()
+
+            read_timings, read_errors = [], 0
+            for role, timings, lock_errors in outcomes:
+                if role == "reader":
+                    read_timings += timings
+                    read_errors += lock_errors
+                else:
+                    write_timings, write_errors = timings, lock_errors
+
+            print(f"{journal_mode} journal: {readers} readers + 1 writer for {duration:.0f}s "
+                  f"(busy timeout {busy_timeout * 1000:.0f} ms)")
+            print(f"  reads  {len(read_timings):>7,}   lock errors {read_errors:>5,}   "
+                  + _percentiles(read_timings))
+            print(f"  writes {len(write_timings):>7,}   lock errors {write_errors:>5,}   "
+                  + _percentiles(write_timings))
+
+
+async def _http_request(reader, writer, method, target, body=b""):
+    """Send one keep-alive request and return (status, body bytes)."""
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    status = int(head[0].split()[1])
+    headers = dict(line.lower().split(": ", 1) for line in head[1:] if ": " in line)
+    if headers.get("transfer-encoding") == "chunked":
+        parts = []
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            data = await reader.readexactly(size + 2)
+            if not size:
+                break
+            parts.append(data[:-2])
+        return status, b"".join(parts)
+    return status, await reader.readexactly(int(headers.get("content-length", 0)))
+
+
+async def _http_load(port, targets, connections):
+    """Replay GET targets over a fixed number of keep-alive connections."""
+    pending = list(reversed(targets))
+    timings, errors = [], 0
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        while pending:
+            target = pending.pop()
+            started = time.perf_counter()
+            status, _ = await _http_request(reader, writer, "GET", target)
+            timings.append((time.perf_counter() - started) * 1000)
+            if status != 200:
+                errors += 1
+        writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return timings, errors, time.perf_counter() - started
+
+
+async def _http_call(port, method, target, body=b""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        return await _http_request(reader, writer, method, target, body)
+    finally:
+        writer.close()
+
+
+def bench_http_service(colleges=20000, requests=2000, connections=32, distinct=300,
+        batch_students=20000, batch_limit=20):
+    """Load-test the HTTP recommendation service on localhost."""
+    import socket
+    from urllib.parse import urlencode
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "service.db")
+        db_manager = DatabaseManager(db_path)
+        populate_sample_data(db_manager, colleges=colleges)
+        db_manager.close()
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        here = os.path.dirname(os.path.abspath(__file__))
+        server = subprocess.Popen([sys.executable, os.path.join(here, "recommendation_service.py"),
+                                   "--db", db_path, "--port", str(port)],
+                                  stderr=subprocess.DEVNULL)
+        try:
+            for _ in range(100):
+                try:
+                    asyncio.run(_http_call(port, "GET", "/health"))
+                    break
+                except OSError:
+                    time.sleep(0.1)
+
+            rng = random.Random(17)
+            popular = [urlencode({"exam": rng.choice(EXAMS), "field": rng.choice(FIELDS),
+                                  "category": rng.choice(CATEGORIES),
+                                  "score": round(rng.uniform(0, 360))})
+                       for _ in range(distinct)]
+            targets = ["/search?" + rng.choice(popular) for _ in range(requests)]
+            timings, errors, elapsed = asyncio.run(_http_load(port, targets, connections))
+
+            print(f"GET /search: {requests} requests over {connections} connections, "
+                  f"{distinct} distinct queries, {colleges} colleges")
+            print(f"  {requests / elapsed:,.0f} requests/s   {errors} errors   "
+                  + _percentiles(timings))
+            _, health = asyncio.run(_http_call(port, "GET", "/health"))
+            health = json.loads(health)
+            print(f"  {health['searches_run']} searches run, "
+                  f"{health['searches_coalesced']} coalesced with one in flight")
+
+            students = "".join(json.dumps({
+                "student_id": str(i), "exam": rng.choice(EXAMS), "field": rng.choice(FIELDS),
+                "category": rng.choice(CATEGORIES), "score": round(rng.uniform(0, 360), 1)
+            }) + "\n" for i in range(batch_students)).encode()
+            started = time.perf_counter()
+            status, body = asyncio.run(_http_call(port, "POST", f"/batch?limit={batch_limit}",
+                                                  students))
+            elapsed = time.perf_counter() - started
+            lines = body.count(b"\n")
+            print(f"POST /batch (top {batch_limit}): {lines:,} students streamed in {elapsed:.2f}s "
+                  f"({len(body) / 1e6:.1f} MB, status {status})")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def write_import_file(path, rows, seed=5):
+    """Write a CSV of synthetic cutoff rows in the bulk import format."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(IMPORT_FIELDS)
+        for i in range(rows):
+            college = i // len(CATEGORIES)
+            writer.writerow([f"College {college}", f"City {college % 500}",
+                             FIELDS[college % len(FIELDS)],
+                             50000 + (college * 7919) % 450000,
+                             EXAMS[college % len(EXAMS)],
+                             CATEGORIES[i % len(CATEGORIES)],
+                             round(rng.uniform(0, 360), 2)])
+
+
+def check_reimport(rows=5000):
+    """Fail if re-importing changed cutoffs does not update them and their history."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "reimport.db"))
+        importer = BulkImporter(db_manager)
+        for seed in (5, 6):
+            import_path = os.path.join(tmp, f"cutoffs-{seed}.csv")
+            write_import_file(import_path, rows, seed=seed)
+            stats = importer.import_file(import_path)
+            if stats.rows_imported != rows:
+                print(f"Re-import with seed {seed} imported {stats.rows_imported} of {rows} rows")
+                sys.exit(1)
+        with db_manager.connection() as conn:
+            stale = conn.execute("""
+                SELECT COUNT(*) FROM Cutoffs ct
+                JOIN AdmissionSession s
+                LEFT JOIN CutoffHistory h
+                  ON h.ExamID = ct.ExamID AND h.Category = ct.Category
+                 AND h.CollegeID = ct.CollegeID AND h.Year = s.Year AND h.Round = s.Round
+                WHERE h.CutoffScore IS NOT ct.CutoffScore""").fetchone()[0]
+            imported = [(row["college_name"], row["exam"], row["category"],
+                         float(row["cutoff_score"])) for row in read_rows(import_path)]
+            current = conn.execute("""
+                SELECT c.CollegeName, e.ExamName, ct.Category, ct.CutoffScore
+                FROM Cutoffs ct
+                JOIN Colleges c ON c.CollegeID = ct.CollegeID
+                JOIN Exams e ON e.ExamID = ct.ExamID""").fetchall()
+        db_manager.close()
+    if stale or sorted(imported) != sorted(current):
+        print(f"Re-import left {stale} history rows out of step with Cutoffs "
+              f"or did not replace the scores")
+        sys.exit(1)
+    print(f"re-import of {rows} changed cutoffs updated Cutoffs and CutoffHistory")
+
+
+def check_admission_session():
+    """Fail unless writes after rolling the admission session land in the new year."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "session.db")
+        db_manager = DatabaseManager(db_path)
+        db_manager.set_admission_session(2024, 1)
+        college_id = db_manager.add_college("Session College", "City 1", "Engineering",
+                                            100000.0, "JEE Main", {"General": 200.0})
+        db_manager.set_admission_session(2025, 1)
+        db_manager.update_college(college_id, "Session College", "City 1", "Engineering",
+                                  100000.0, "JEE Main", {"General": 210.0})
+        db_manager.close()
+
+        # The bulk importer's --year and --round flags roll it too.
+        import_path = os.path.join(tmp, "round2.csv")
+        with open(import_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(IMPORT_FIELDS)
+            writer.writerow(["Session College", "City 1", "Engineering", 100000.0,
+                             "JEE Main", "General", 220.0])
+        subprocess.run([sys.executable, os.path.join(os.path.dirname(__file__), "bulk_import.py"),
+                        import_path, "--db", db_path, "--year", "2025", "--round", "2"],
+                       check=True, capture_output=True)
+
+        db_manager = DatabaseManager(db_path)
+        history = [(row.year, row.counselling_round, row.cutoff_score)
+                   for row in db_manager.get_cutoff_history(college_id)]
+        session = db_manager.admission_session()
+        as_of = [college.cutoff_score for college in db_manager.search_colleges(
+            "JEE Main", "Engineering", "General", 300, year=2024)]
+        db_manager.close()
+    expected = [(2024, 1, 200.0), (2025, 1, 210.0), (2025, 2, 220.0)]
+    if history != expected or session != (2025, 2) or as_of != [200.0]:
+        print(f"Admission session roll not honoured: history {history}, "
+              f"session {session}, 2024 search {as_of}")
+        sys.exit(1)
+    print("writes after rolling the admission session are recorded under the new year and round")
+
+
+def bench_bulk_import(sizes=(10000, 100000, 1000000)):
+    """Rows/second of the bulk importer at increasing file sizes."""
+    check_reimport()
+    print("bulk import throughput")
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            import_path = os.path.join(tmp, "cutoffs.csv")
+            write_import_file(import_path, rows)
+            db_manager = DatabaseManager(os.path.join(tmp, "import.db"))
+            stats = BulkImporter(db_manager).import_file(import_path)
+            db_manager.close()
+        print(f"  {rows:>9,} rows   {stats.elapsed:7.2f} s   "
+              f"{stats.rows_per_second:10,.0f} rows/s")
+
+
+def bench_admin_search(colleges=100000):
+    """Admin search box latency with the trigram index against LIKE scans."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "admin.db"))
+        populate_sample_data(db_manager, colleges=colleges)
+        if not db_manager.has_college_search:
+            print("This SQLite build has no FTS5 trigram tokenizer; skipping")
+            return
+
+        terms = ["college 12", "city 1", "ege 999", "engineering", "medic", "zzz"]
+        queries = [(term, field, sort) for term in terms
+                   for field in (None, "Medicine") for sort in ("Name (A-Z)", "Fee (High-Low)")]
+
+        indexed = _time_calls(db_manager.search_college_list, queries)
+        indexed_results = [db_manager.search_college_list(*q) for q in queries]
+        db_manager.has_college_search = False
+        scanned = _time_calls(db_manager.search_college_list, queries)
+        scanned_results = [db_manager.search_college_list(*q) for q in queries]
+        db_manager.close()
+
+    if indexed_results != scanned_results:
+        print("Full-text search results differ from LIKE results")
+        sys.exit(1)
+    print(f"admin search over {colleges} colleges, {len(queries)} queries (results match)")
+    _report("LIKE scan", scanned)
+    _report("trigram index", indexed)
+
+
+def bench_cutoff_history(colleges=20000, years=10, rounds=2, iterations=300):
+    """Bulk history load, as-of searches against current ones, and trend queries."""
+    config = SyntheticConfig(colleges=colleges, years=years, rounds=rounds)
+    rng = random.Random(9)
+    queries = [(rng.choice(EXAMS), rng.choice(FIELDS), rng.choice(CATEGORIES),
+                rng.uniform(0, 400), rng.choice([None, None, 500000]))
+               for _ in range(iterations)]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "history.db"))
+        start = time.perf_counter()
+        populate(db_manager, config)
+        loaded = time.perf_counter() - start
+        with db_manager.connection() as conn:
+            history_rows = conn.execute("SELECT COUNT(*) FROM CutoffHistory").fetchone()[0]
+
+        current = _time_calls(db_manager.search_colleges, queries)
+        last_year = _time_calls(db_manager.search_colleges,
+                                [q + (config.last_year - 1,) for q in queries])
+        first_year = _time_calls(db_manager.search_colleges,
+                                 [q + (config.last_year - years + 1, 1) for q in queries])
+        trends = _time_calls(db_manager.cutoff_trends,
+                             [(q[0], q[2], q[1]) for q in queries[:100]])
+
+        # Each live cutoff write also appends to the history and its trend row.
+        ids = rng.sample(range(1, colleges + 1), 100)
+        writes = _time_calls(db_manager.update_college,
+                             [(college_id, f"College {college_id}", "City 1", "Engineering",
+                               100000.0, "JEE Main", {c: 150.0 for c in CATEGORIES})
+                              for college_id in ids])
+        db_manager.close()
+
+    print(f"cutoff history: {colleges} colleges, {years} years x {rounds} rounds, "
+          f"{history_rows:,} history rows loaded in {loaded:.1f} s")
+    _report("search current", current)
+    _report("search last year", last_year)
+    _report(f"search {config.last_year - years + 1} r1", first_year)
+    _report("cutoff trends", trends)
+    _report("update college", writes)
+
+
+def bench_admission_chances(colleges=20000, years=6, iterations=500, k=10):
+    """Banded admission chances: the array pass against scoring every College object."""
+    from statistics import NormalDist
+    from admission_chance import BANDS, AdmissionChanceEngine
+
+    config = SyntheticConfig(colleges=colleges, years=years)
+    rng = random.Random(13)
+    queries = [(rng.choice(EXAMS), rng.choice(FIELDS), rng.choice(CATEGORIES),
+                rng.uniform(0, 400), rng.choice([None, None, 500000]), k)
+               for _ in range(iterations)]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "chances.db"))
+        populate(db_manager, config)
+        engine = AdmissionChanceEngine(db_manager)
+        groups = {query[:3] for query in queries}
+        start = time.perf_counter()
+        for key in groups:
+            engine.group(*key)
+        loaded = time.perf_counter() - start
+
+        def per_object(exam, field, category, score, budget, k):
+            # What a caller would do without the engine: build every
+            # College, score it, then sort and cut each band.
+            columns, sigmas, _ = engine.group(exam, field, category)
+            colleges = [College(name, location, cutoff, field, fee) for name, location, cutoff, fee
+                        in zip(columns.names, columns.locations, columns.scores, columns.fees)]
+            scored = []
+            for college, sigma in zip(colleges, sigmas):
+                chance = NormalDist(college.cutoff_score, sigma).cdf(score)
+                if chance >= engine.min_chance and not (budget and college.tuition_fee > budget):
+                    band = next(name for name, threshold in BANDS if chance >= threshold)
+                    scored.append((band, college, chance))
+            scored.sort(key=lambda row: -row[1].cutoff_score)
+            return [[row for row in scored if row[0] == name][:k] for name, _ in BANDS]
+
+        naive = _time_calls(per_object, queries)
+        vectorised = _time_calls(engine.chances, queries)
+        hard_filter = _time_calls(db_manager.search_colleges, [q[:5] for q in queries])
+        db_manager.close()
+
+    print(f"admission chances over {colleges} colleges, {len(groups)} groups "
+          f"loaded in {loaded:.2f} s, top {k} per band")
+    _report("search_colleges", hard_filter)
+    _report("score every College", naive)
+    _report("array pass", vectorised)
+
+
+def _check_search_pages(db_manager, queries, page_sizes, path):
+    """Fail unless keyset pages, walked to the end, add up to the full search.
+
+    Both search_colleges_page and iter_search_colleges are walked at every
+    page size and compared with search_colleges and the plain SQL search.
+    """
+    split_ties = 0
+    for query in queries:
+        expected = db_manager.search_colleges_sql(*query)
+        if db_manager.search_colleges(*query) != expected:
+            print(f"search_colleges ({path}) differs from SQL for {query}")
+            sys.exit(1)
+        for page_size in page_sizes:
+            walked, after = [], None
+            for _ in range(len(expected) // page_size + 2):
+                page = db_manager.search_colleges_page(*query, after=after, page_size=page_size)
+                if walked and page.colleges and \
+                        walked[-1].cutoff_score == page.colleges[0].cutoff_score:
+                    split_ties += 1
+                walked.extend(page.colleges)
+                if page.next_after is None:
+                    break
+                after = page.next_after
+            iterated = [college for page in db_manager.iter_search_colleges(
+                *query, page_size=page_size) for college in page]
+            limit = page_size * 2 + 3
+            limited = [college for page in db_manager.iter_search_colleges(
+                *query, page_size=page_size, limit=limit) for college in page]
+            if walked != expected or iterated != expected or limited != expected[:limit]:
+                print(f"Keyset pages ({path}) differ from the full search for {query}, "
+                      f"{page_size} rows per page")
+                sys.exit(1)
+    if not split_ties:
+        print(f"No page boundary ({path}) fell inside a run of equal cutoffs; "
+              f"the check did not cover ties")
+        sys.exit(1)
+    return split_ties
+
+
+def bench_search_pages(colleges=100000, iterations=200, page_size=200):
+    """First page and deep pages of a keyset-paged search against the full result list."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "pages.db"))
+        populate_sample_data(db_manager, colleges=colleges)
+        rng = random.Random(17)
+        # High scores: nearly every college in the group qualifies.
+        queries = [(rng.choice(EXAMS), rng.choice(FIELDS), rng.choice(CATEGORIES),
+                    rng.uniform(300, 400)) for _ in range(iterations)]
+
+        # Budgets and lower scores too, for the cross-check only.
+        checks = [query + (None,) for query in queries[:10]] + [
+            (rng.choice(EXAMS), rng.choice(FIELDS), rng.choice(CATEGORIES),
+             rng.uniform(50, 400), rng.choice([None, 150000, 300000])) for _ in range(10)]
+        page_sizes = (7, page_size)
+        split_ties = _check_search_pages(db_manager, checks, page_sizes, "SQL")
+
+        full = _time_calls(db_manager.search_colleges, queries)
+        first = _time_calls(lambda *q: db_manager.search_colleges_page(*q, page_size=page_size),
+                            queries)
+
+        # The page starting at the middle of each result list, by keyset and by OFFSET.
+        deep = []
+        for query in queries[:50]:
+            with db_manager.connection() as conn:
+                sql, params = db_manager._build_search_query(*query)
+                middle = len(conn.execute(sql, params).fetchall()) // 2
+                row = conn.execute(sql + " LIMIT 1 OFFSET ?", params + [middle]).fetchone()
+            deep.append((query, middle, (row[2], row[5])))
+        keyset = _time_calls(lambda q, _, after: db_manager.search_colleges_page(
+            *q, after=after, page_size=page_size), deep)
+
+        def offset_page(query, middle, _):
+            sql, params = db_manager._build_search_query(*query)
+            with db_manager.connection() as conn:
+                return conn.execute(sql + " LIMIT ? OFFSET ?",
+                                    params + [page_size, middle]).fetchall()
+        offset = _time_calls(offset_page, deep)
+        db_manager.enable_cutoff_index()
+        split_ties += _check_search_pages(db_manager, checks, page_sizes, "cutoff index")
+        db_manager.close()
+
+    print(f"paged search over {colleges} colleges, {page_size} rows per page "
+          f"(pages match the full search, {split_ties} page breaks inside equal cutoffs)")
+    _report("full result list", full)
+    _report("first page", first)
+    _report("middle page, OFFSET", offset)
+    _report("middle page, keyset", keyset)
+
+
+@dataclass
+class _DictCollege:
+    """College as it was before __slots__, for the memory benchmark."""
+    name: str
+    location: str
+    cutoff_score: float
+    field: str
+    tuition_fee: float
+
+
+def _held_bytes(build):
+    """Build time of ``build()``, then the bytes its result keeps allocated."""
+    gc.collect()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    # Timed separately: tracing slows allocation-heavy code down several times.
+    tracemalloc.start()
+    result = build()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return held, elapsed
+
+
+def bench_result_memory(rows=500000, colleges=20000, students=5000):
+    """Memory and build time of result rows: dict-backed, slotted and column-backed."""
+    rng = random.Random(21)
+    names = [f"College {i}" for i in range(rows)]
+    locations = [f"City {rng.randrange(300)}" for _ in range(rows)]
+    scores = array('d', (rng.uniform(0, 360) for _ in range(rows)))
+    fees = array('d', (rng.uniform(20000, 2500000) for _ in range(rows)))
+    builds = [
+        ("dict dataclass", lambda: [_DictCollege(n, l, s, "Engineering", f)
+                                    for n, l, s, f in zip(names, locations, scores, fees)]),
+        ("slotted College", lambda: [College(n, l, s, "Engineering", f)
+                                     for n, l, s, f in zip(names, locations, scores, fees)]),
+        # Copies of the columns, as CutoffColumns.eligible returns them.
+        ("CollegeList", lambda: CollegeList("Engineering", names[:], locations[:],
+                                            scores[:], fees[:])),
+    ]
+    print(f"{rows:,} result rows held in memory (strings shared, not counted)")
+    for label, build in builds:
+        held, elapsed = _held_bytes(build)
+        print(f"  {label:<22} {held / 2**20:8.1f} MiB   {held / rows:6.1f} B/row   "
+              f"{elapsed * 1000:8.1f} ms to build")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "memory.db"))
+        populate_sample_data(db_manager, colleges=colleges)
+        records = [StudentRecord(f"S{i:06d}", rng.choice(EXAMS), rng.choice(FIELDS),
+                                 rng.choice(CATEGORIES), rng.uniform(0, 360))
+                   for i in range(students)]
+        recommender = BatchRecommender(db_manager)
+        recommender._recommend_chunk(records)  # load every group before measuring
+        held, elapsed = _held_bytes(lambda: recommender._recommend_chunk(records))
+        results = recommender._recommend_chunk(records)
+        total = sum(len(result.colleges) for result in results)
+        as_objects, object_elapsed = _held_bytes(
+            lambda: [list(result.colleges) for result in results])
+        db_manager.close()
+    print(f"batch results for {students:,} students, {total:,} rows")
+    print(f"  {'CollegeList columns':<22} {held / 2**20:8.1f} MiB   {elapsed:6.2f} s")
+    print(f"  {'College objects':<22} {as_objects / 2**20:8.1f} MiB   "
+          f"{object_elapsed:6.2f} s more")
+
+
+def _merge_single_searches(db_manager, college_ids, scores, field, categories, budget=None,
+        limit=None):
+    """What a caller does without search_colleges_multi: one search per pair, then merge.
+
+    College has no id, so ``college_ids`` maps (name, location) to CollegeID
+    for the same tie-break as the combined search.
+    """
+    best = {}
+    for exam_name, score in sorted(scores.items()):
+        for category in sorted(categories):
+            for college in db_manager.search_colleges(exam_name, field, category, score, budget):
+                margin = score - college.cutoff_score
+                key = (college.name, college.location)
+                if key not in best or margin > best[key][0]:
+                    best[key] = (margin, college, exam_name, category)
+    ranked = sorted(best.items(), key=lambda item: (item[1][0], -college_ids[item[0]]))
+    return [CollegeOption(college.name, college.location, college.cutoff_score, college.field,
+                          college.tuition_fee, exam_name, category, margin)
+            for _, (margin, college, exam_name, category) in ranked[:limit]]
+
+
+def _check_multi_exam(db_manager, college_ids, queries, limits, path):
+    """Fail unless the combined search matches the merged loop, in full and cut to each limit."""
+    for query in queries:
+        expected = _merge_single_searches(db_manager, college_ids, *query)
+        results = {None: db_manager.search_colleges_multi(*query)}
+        results.update((limit, db_manager.search_colleges_multi(*query, limit=limit))
+                       for limit in limits)
+        for limit, options in results.items():
+            if options != expected[:limit]:
+                print(f"Combined {path} search differs from the loop for {query}, limit {limit}")
+                sys.exit(1)
+
+
+def bench_multi_exam(colleges=50000, iterations=100, limit=50):
+    """One combined multi-exam search against a loop of single-exam searches."""
+    rng = random.Random(23)
+    queries = []
+    for _ in range(iterations):
+        exams = rng.sample(EXAMS, 3)
+        queries.append(({exam: rng.uniform(150, 360) for exam in exams}, rng.choice(FIELDS),
+                        rng.sample(CATEGORIES, 2)))
+    # Fewer exams and categories, budgets, and low scores that land among
+    # tied cutoffs, for the cross-check only.
+    checks = queries[:20] + [
+        ({exam: rng.uniform(0, 360) for exam in rng.sample(EXAMS, rng.randint(1, 3))},
+         rng.choice(FIELDS), rng.sample(CATEGORIES, rng.randint(1, 3)),
+         rng.choice([None, 150000, 300000]))
+        for _ in range(40)]
+    limits = (0, 1, 7, limit)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "multi.db"))
+        populate_sample_data(db_manager, colleges=colleges)
+        with db_manager.connection() as conn:
+            college_ids = {(name, location): college_id for college_id, name, location
+                           in conn.execute("SELECT CollegeID, CollegeName, Location FROM Colleges")}
+        if len(college_ids) != colleges:
+            print("College names and locations are not unique; the loop cannot merge them")
+            sys.exit(1)
+
+        _check_multi_exam(db_manager, college_ids, checks, limits, "SQL")
+        looped = _time_calls(lambda *q: _merge_single_searches(db_manager, college_ids, *q),
+                             queries)
+        combined = _time_calls(db_manager.search_colleges_multi, queries)
+        combined_top = _time_calls(lambda *q: db_manager.search_colleges_multi(*q, limit=limit),
+                                   queries)
+        rows = sum(len(db_manager.search_colleges_multi(*q)) for q in queries) // len(queries)
+        db_manager.enable_cutoff_index()
+        _check_multi_exam(db_manager, college_ids, checks, limits, "index")
+        indexed = _time_calls(db_manager.search_colleges_multi, queries)
+        indexed_top = _time_calls(lambda *q: db_manager.search_colleges_multi(*q, limit=limit),
+                                  queries)
+        db_manager.close()
+
+    print(f"3 exam scores x 2 categories over {colleges} colleges, ~{rows:,} colleges per result "
+          f"(SQL, index and loop results match)")
+    _report("6 searches + merge", looped)
+    _report("combined SQL", combined)
+    _report(f"combined SQL, top {limit}", combined_top)
+    _report("combined index", indexed)
+    _report(f"combined index, top {limit}", indexed_top)
+
+
+def _rss_kb():
+    """Current resident set size of this process in KiB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure_result_list(mode, count, results):
+    """Render ``count`` colleges in a fresh window and report time and RSS growth."""
+    import tkinter as tk
+    import ttkbootstrap as ttk
+    from ttkbootstrap.scrolled import ScrolledFrame
+    from college_recommender import CollegeRecommenderGUI
+    from virtual_list import VirtualList
+
+    root = ttk.Window(themename="cosmo")
+    root.geometry("900x700")
+    root.update()
+    colleges = [College(name=f"College {i}", location=f"City {i % 200}",
+                        cutoff_score=360 - i * 360 / count, field="Engineering",
+                        tuition_fee=100000 + i) for i in range(count)]
+    # The card builders do not use any GUI state, so they can run unbound.
+    create_card = lambda parent: CollegeRecommenderGUI.create_college_card(None, parent)
+    update_card = lambda row, college: CollegeRecommenderGUI.update_college_card(None, row, college)
+
+    rss_before = _rss_kb()
+    start = time.perf_counter()
+    if mode == "cards":
+        container = ScrolledFrame(root, autohide=True)
+        container.pack(fill=tk.BOTH, expand=True)
+        for college in colleges:
+            row = create_card(container)
+            update_card(row, college)
+            row.pack(fill=tk.X)
+    else:
+        container = VirtualList(root, create_row=create_card, update_row=update_card)
+        container.pack(fill=tk.BOTH, expand=True)
+        container.set_items(colleges)
+    root.update()
+    results.put((time.perf_counter() - start, _rss_kb() - rss_before))
+    root.destroy()
+
+
+def bench_result_list(sizes=(100, 10000, 100000), max_cards=10000):
+    """Render time and memory of per-college cards against the virtual list."""
+    try:
+        import tkinter
+        tkinter.Tk().destroy()
+    except Exception as e:
+        print(f"Result list benchmark needs a display ({e}); skipping")
+        return
+
+    print("result list render time and RSS growth")
+    for count in sizes:
+        for mode in ("cards", "virtual"):
+            if mode == "cards" and count > max_cards:
+                print(f"  {mode:<8} {count:>7,} results   skipped (too slow)")
+                continue
+            # A fresh process per run keeps RSS measurements independent.
+            results = multiprocessing.Queue()
+            process = multiprocessing.Process(target=_measure_result_list,
+                                              args=(mode, count, results))
+            process.start()
+            elapsed, rss_kb = results.get(timeout=600)
+            process.join()
+            print(f"  {mode:<8} {count:>7,} results   {elapsed * 1000:9.1f} ms   "
+                  f"+{rss_kb / 1024:7.1f} MiB")
+
+
+_STARTUP_APPS = {
+    "admin": ("college_manager", "CollegeManagerGUI"),
+    "user": ("college_recommender", "CollegeRecommenderGUI"),
+}
+
+def _warm_launch(app_name):
+    """Mirror launcher.run_in_process without Qt: warm up, then "click" and open."""
+    import importlib
+    from startup_profile import mark_click
+    module_name, class_name = _STARTUP_APPS[app_name]
+    gui_class = getattr(importlib.import_module(module_name), class_name)
+    db_manager = DatabaseManager('career_counseling.db')
+    mark_click()
+    gui_class(db_manager=db_manager).run()
+
+
+def _startup_ms(command, cwd, env, click_now=True):
+    """Run one launch and return the click-to-first-paint time it reported."""
+    env = dict(env, **{EXIT_AFTER_PAINT_ENV: "1", REPORT_PAINT_ENV: "1"})
+    if click_now:
+        env[CLICK_TIME_ENV] = repr(time.time())
+    process = subprocess.run(command, cwd=cwd, env=env, capture_output=True,
+                             text=True, timeout=120)
+    match = re.search(r"(\d+) ms from click to first paint", process.stderr)
+    if match is None:
+        raise Exception(f"Error measuring startup: {process.stderr.strip()}")
+    return float(match.group(1)) / 1000
+
+
+def bench_startup(runs=5, colleges=2000):
+    """Click-to-first-paint time of a subprocess launch against an in-process one."""
+    try:
+        import tkinter
+        tkinter.Tk().destroy()
+    except Exception as e:
+        print(f"Startup benchmark needs a display ({e}); skipping")
+        return
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=here)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "career_counseling.db"))
+        populate_sample_data(db_manager, colleges)
+        db_manager.close()
+
+        print(f"click to first paint, {runs} launches each")
+        for app_name, (module_name, _) in _STARTUP_APPS.items():
+            spawned = [_startup_ms([sys.executable, os.path.join(here, f"{module_name}.py"),
+                                    "benchmark"], tmp, env)
+                       for _ in range(runs)]
+            warm = [_startup_ms([sys.executable, "-c",
+                                 f"import benchmarks; benchmarks._warm_launch('{app_name}')"],
+                                tmp, env, click_now=False)
+                    for _ in range(runs)]
+            _report(f"{app_name} subprocess", spawned)
+            _report(f"{app_name} in-process", warm)
+
+
+BENCHMARKS = {
+    "pool": bench_connection_pool,
+    "plan": check_search_plan,
+    "index": bench_cutoff_index,
+    "ranking": bench_cutoff_ranking,
+    "batch": bench_batch,
+    "cache": bench_result_cache,
+    "concurrency": bench_concurrency,
+    "http": bench_http_service,
+    "import": bench_bulk_import,
+    "reimport": check_reimport,
+    "session": check_admission_session,
+    "admin-search": bench_admin_search,
+    "history": bench_cutoff_history,
+    "chances": bench_admission_chances,
+    "pages": bench_search_pages,
+    "memory": bench_result_memory,
+    "multi-exam": bench_multi_exam,
+    "result-list": bench_result_list,
+    "startup": bench_startup,
+}
+
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name} (choose from {', '.join(BENCHMARKS)})")
+            return
+    for name in names:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Bulk import of colleges and cutoff scores.
+
+Each input row describes one cutoff for one college::
+
+    college_name,location,field,tuition_fee,exam,category,cutoff_score
+
+Rows are streamed from a CSV or JSON-lines file, validated, and written with
+``executemany`` in batched transactions. Colleges are upserted on
+(CollegeName, Location) and cutoffs on (CollegeID, ExamID, Category), so
+re-importing a corrected file updates rows instead of duplicating them.
+Rejected rows are written to a side file together with the reason.
+
+Usage::
+
+    python bulk_import.py cutoffs_2025.csv --rejects rejects.csv
+    python bulk_import.py round2.csv --year 2025 --round 2
+
+With --year, the admission session is moved first, so the imported cutoffs
+are recorded in the cutoff history under that year and round.
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from database_operations import DatabaseManager
+
+IMPORT_FIELDS = ["college_name", "location", "field", "tuition_fee",
+                 "exam", "category", "cutoff_score"]
+
+_UPSERT_COLLEGE = """
+    INSERT INTO Colleges (CollegeName, Location, Field, TuitionFee)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(CollegeName, Location) DO UPDATE SET
+        Field = excluded.Field,
+        TuitionFee = excluded.TuitionFee
+"""
+
+_UPSERT_CUTOFF = """
+    INSERT INTO Cutoffs (CollegeID, ExamID, Category, CutoffScore)
+    SELECT CollegeID, ?, ?, ? FROM Colleges
+    WHERE CollegeName = ? AND Location = ?
+    ON CONFLICT(CollegeID, ExamID, Category) DO UPDATE SET
+        CutoffScore = excluded.CutoffScore
+"""
+
+
+class RowError(ValueError):
+    """Raised when an input row fails validation."""
+
+
+@dataclass
+class ImportStats:
+    rows_read: int = 0
+    rows_imported: int = 0
+    rows_rejected: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+
+def read_rows(path: str) -> Iterator[dict]:
+    """Stream raw rows from a CSV or JSON-lines file.
+
+    A JSON line that does not parse is yielded as a RowError, so the
+    importer rejects it and carries on with the next line.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith((".json", ".jsonl")):
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError as e:
+                        yield RowError(f"invalid JSON: {e}")
+        else:
+            yield from csv.DictReader(f)
+
+
+class BulkImporter:
+    """Validate and load cutoff rows in batched transactions."""
+
+    def __init__(self, db_manager: DatabaseManager, batch_size: int = 5000):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.stats = ImportStats()
+        self._exam_ids: Dict[str, int] = {}
+        self._rejects_writer = None
+
+    def _load_exam_ids(self):
+        with self.db_manager.connection() as conn:
+            self._exam_ids = dict(conn.execute("SELECT ExamName, ExamID FROM Exams"))
+
+    def validate(self, row: dict) -> Tuple[tuple, tuple]:
+        """Return (college params, cutoff params) for a row or raise RowError."""
+        if isinstance(row, RowError):
+            raise row
+        if not isinstance(row, dict):
+            raise RowError("row is not an object")
+        values = {}
+        for name in IMPORT_FIELDS:
+            value = row.get(name)
+            value = str(value).strip() if value is not None else ""
+            if not value:
+                raise RowError(f"missing {name}")
+            values[name] = value
+
+        exam_id = self._exam_ids.get(values["exam"])
+        if exam_id is None:
+            raise RowError(f"unknown exam '{values['exam']}'")
+        try:
+            fee = float(values["tuition_fee"])
+            score = float(values["cutoff_score"])
+        except ValueError:
+            raise RowError("tuition_fee and cutoff_score must be numbers")
+        if not (math.isfinite(fee) and math.isfinite(score)):
+            raise RowError("tuition_fee and cutoff_score must be finite numbers")
+        if fee < 0 or score < 0:
+            raise RowError("tuition_fee and cutoff_score cannot be negative")
+
+        college = (values["college_name"], values["location"], values["field"], fee)
+        cutoff = (exam_id, values["category"], score,
+                  values["college_name"], values["location"])
+        return college, cutoff
+
+    def _write_batch(self, colleges: List[tuple], cutoffs: List[tuple]):
+        with self.db_manager.transaction() as conn:
+            conn.executemany(_UPSERT_COLLEGE, colleges)
+            conn.executemany(_UPSERT_CUTOFF, cutoffs)
+
+    def _reject(self, row: dict, reason: str):
+        self.stats.rows_rejected += 1
+        if self._rejects_writer is None:
+            return
+        if not isinstance(row, dict):
+            row = {}
+        self._rejects_writer.writerow([self.stats.rows_read]
+                                      + [row.get(name, "") for name in IMPORT_FIELDS]
+                                      + [reason])
+
+    def import_rows(self, rows: Iterator[dict], rejects_path: Optional[str] = None) -> ImportStats:
+        """Import an iterable of row dicts and return the import statistics."""
+        self.stats = ImportStats()
+        self._load_exam_ids()
+        started = time.perf_counter()
+        rows = iter(rows)
+
+        rejects_file = None
+        self._rejects_writer = None
+        if rejects_path:
+            rejects_file = open(rejects_path, "w", newline="", encoding="utf-8")
+            self._rejects_writer = csv.writer(rejects_file)
+            self._rejects_writer.writerow(["row"] + IMPORT_FIELDS + ["reason"])
+
+        try:
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                # A college repeats once per exam/category; upsert it once per batch.
+                colleges = {}
+                cutoffs = []
+                for row in batch:
+                    self.stats.rows_read += 1
+                    try:
+                        college, cutoff = self.validate(row)
+                    except RowError as e:
+                        self._reject(row, str(e))
+                        continue
+                    colleges[college[:2]] = college
+                    cutoffs.append(cutoff)
+                self._write_batch(list(colleges.values()), cutoffs)
+                self.stats.rows_imported += len(cutoffs)
+        finally:
+            if rejects_file is not None:
+                rejects_file.close()
+
+        self.db_manager.reload_cutoff_index()
+        self.stats.elapsed = time.perf_counter() - started
+        return self.stats
+
+    def import_file(self, path: str, rejects_path: Optional[str] = None) -> ImportStats:
+        """Import a CSV or JSON-lines file."""
+        return self.import_rows(read_rows(path), rejects_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import colleges and cutoff scores.")
+    parser.add_argument("input", help="CSV or JSON-lines file with columns: "
+                                      + ", ".join(IMPORT_FIELDS))
+    parser.add_argument("--db", default="career_counseling.db", help="database path")
+    parser.add_argument("--rejects", default=None,
+                        help="CSV file that receives rejected rows and the reason")
+    parser.add_argument("--batch-size", type=int, default=5000,
+                        help="rows written per transaction")
+    parser.add_argument("--year", type=int, default=None,
+                        help="record these cutoffs under this admission year")
+    parser.add_argument("--round", type=int, default=1,
+                        help="counselling round within --year")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.db)
+    try:
+        if args.year is not None:
+            db_manager.set_admission_session(args.year, args.round)
+        stats = BulkImporter(db_manager, batch_size=args.batch_size).import_file(
+            args.input, args.rejects)
+    finally:
+        db_manager.close()
+
+    print(f"Imported {stats.rows_imported:,} of {stats.rows_read:,} rows "
+          f"({stats.rows_rejected:,} rejected) in {stats.elapsed:.2f}s "
+          f"({stats.rows_per_second:,.0f} rows/s)")
+    if stats.rows_rejected and not args.rejects:
+        print("Use --rejects to see why rows were rejected", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
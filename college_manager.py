@@ -2,20 +2,31 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from ttkbootstrap.scrolled import ScrolledFrame
-from database_operations import DatabaseManager, College
+from diagnostics_panel import install_diagnostics
+from database_operations import COLLEGE_SORT_ORDERS, DatabaseManager
+from search_scheduler import SearchScheduler
+from startup_profile import after_first_paint, watch_first_paint
+from virtual_list import VirtualList
 import sqlite3
 import sys
 
 class CollegeManagerGUI:
-    def __init__(self):
+    def __init__(self, db_manager=None):
         self.root = ttk.Window(themename="cosmo")
         self.root.title("College Database Manager")
         self.root.geometry("1000x800")
+        watch_first_paint(self.root, "College Database Manager")
         self.search_var = tk.StringVar()
         self.search_field_var = tk.StringVar(value="All Fields")
         self.sort_var = tk.StringVar(value="Name (A-Z)")
-        self.db_manager = DatabaseManager('career_counseling.db')
+        self.db_manager = db_manager or DatabaseManager('career_counseling.db')
+        install_diagnostics(self.root, self.db_manager)
+        self.search_scheduler = SearchScheduler(
+            self.root,
+            run_query=self.db_manager.search_college_list,
+            on_result=self.show_search_results,
+            on_error=self.on_search_error
+        )
 
         # Main container
         self.main_container = ttk.Frame(self.root, padding="20")
@@ -26,6 +37,13 @@ class CollegeManagerGUI:
         self.create_add_college_form()
         self.create_search_bar()
         self.create_college_list()
+        # Database-backed lists are filled once the window is on screen.
+        after_first_paint(self.root, self.populate_lists)
+
+    def populate_lists(self):
+        """Load the exam choices and the college list from the database."""
+        self.exam_combobox.configure(values=self.get_exams())
+        self.show_admission_session()
         self.load_colleges()
 
 
@@ -56,98 +74,54 @@ class CollegeManagerGUI:
             width=15
         )
         field_filter.pack(side=tk.LEFT, padx=(0, 10))
-        field_filter.bind('<<ComboboxSelected>>', lambda e: self.on_search())
+        field_filter.bind('<<ComboboxSelected>>', lambda e: self.on_search(delay_ms=0))
 
         # Sort options
 
         sort_combobox = ttk.Combobox(
             search_frame,
             textvariable=self.sort_var,
-            values=["Name (A-Z)", "Name (Z-A)", "Location (A-Z)", "Fee (Low-High)", "Fee (High-Low)"],
+            values=list(COLLEGE_SORT_ORDERS),
             state="readonly",
             width=15
         )
         sort_combobox.pack(side=tk.LEFT)
-        sort_combobox.bind('<<ComboboxSelected>>', lambda e: self.on_search())
+        sort_combobox.bind('<<ComboboxSelected>>', lambda e: self.on_search(delay_ms=0))
+
+    def on_search(self, delay_ms=None):
+        """Handle search and filtering of colleges.
 
-    def on_search(self):
-        """Handle search and filtering of colleges."""
+        Typing is debounced and the query runs in the background; see
+        show_search_results for the UI update.
+        """
         search_term = self.search_var.get().lower()
         field_filter = self.search_field_var.get()
         sort_option = self.sort_var.get()
 
-        try:
-            conn = sqlite3.connect('career_counseling.db')
-            cursor = conn.cursor()
-
-            # Build the query based on search and filter criteria
-            query = """
-                   SELECT 
-                       c.CollegeID,
-                       c.CollegeName,
-                       c.Location,
-                       c.Field,
-                       c.TuitionFee
-                   FROM Colleges c
-                   WHERE 1=1
-               """
-            params = []
-
-            if search_term:
-                query += """ AND (
-                       LOWER(c.CollegeName) LIKE ? OR
-                       LOWER(c.Location) LIKE ? OR
-                       LOWER(c.Field) LIKE ?
-                   )"""
-                search_pattern = f"%{search_term}%"
-                params.extend([search_pattern, search_pattern, search_pattern])
-
-            if field_filter != "All Fields":
-                query += " AND c.Field = ?"
-                params.append(field_filter)
-
-            # Add sorting
-            if sort_option == "Name (A-Z)":
-                query += " ORDER BY c.CollegeName ASC"
-            elif sort_option == "Name (Z-A)":
-                query += " ORDER BY c.CollegeName DESC"
-            elif sort_option == "Location (A-Z)":
-                query += " ORDER BY c.Location ASC"
-            elif sort_option == "Fee (Low-High)":
-                query += " ORDER BY c.TuitionFee ASC"
-            elif sort_option == "Fee (High-Low)":
-                query += " ORDER BY c.TuitionFee DESC"
-
-            cursor.execute(query, params)
-            colleges = cursor.fetchall()
-            conn.close()
-
-            # Clear existing college cards
-            for widget in self.scrolled_frame.winfo_children():
-                widget.destroy()
-
-            # Create cards for filtered colleges
-            for college in colleges:
-                self.create_college_card(college)
-
-            if not colleges:
-                no_results = ttk.Label(
-                    self.scrolled_frame,
-                    text="No colleges found matching your search criteria",
-                    font=("Helvetica", 12),
-                    foreground="gray"
-                )
-                no_results.pack(pady=20)
+        self.search_scheduler.request(
+            search_term,
+            None if field_filter == "All Fields" else field_filter,
+            sort_option,
+            delay_ms=delay_ms
+        )
 
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error searching colleges: {e}")
+    def show_search_results(self, colleges):
+        """Display the results of the latest search."""
+        if colleges:
+            self.college_list.set_items(colleges)
+        else:
+            self.college_list.show_message(
+                "No colleges found matching your search criteria")
+
+    def on_search_error(self, error):
+        messagebox.showerror("Database Error", f"Error searching colleges: {error}")
 
     def load_colleges(self):
         """Load and display existing colleges."""
         self.search_var.set("")  # Clear search
         self.search_field_var.set("All Fields")  # Reset field filter
         self.sort_var.set("Name (A-Z)")  # Reset sort
-        self.on_search()  # Use the search function t
+        self.on_search(delay_ms=0)  # Use the search function t
 
     def create_header(self):
         """Create the application header."""
@@ -168,6 +142,48 @@ class CollegeManagerGUI:
         )
         subtitle.pack()
 
+        # Cutoff writes are recorded in the history under this year and round.
+        session_frame = ttk.Frame(header_frame)
+        session_frame.pack(pady=(10, 0))
+        self.session_label = ttk.Label(session_frame, font=("Helvetica", 10))
+        self.session_label.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(
+            session_frame,
+            text="Next Round",
+            command=lambda: self.roll_admission_session(new_year=False),
+            style="secondary.Outline.TButton"
+        ).pack(side=tk.LEFT, padx=5)
+        ttk.Button(
+            session_frame,
+            text="Next Year",
+            command=lambda: self.roll_admission_session(new_year=True),
+            style="secondary.Outline.TButton"
+        ).pack(side=tk.LEFT, padx=5)
+
+    def show_admission_session(self):
+        try:
+            year, counselling_round = self.db_manager.admission_session()
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Error loading admission session: {e}")
+            return
+        self.session_label.configure(
+            text=f"Recording cutoffs for {year}, round {counselling_round}")
+
+    def roll_admission_session(self, new_year):
+        """Record later cutoff writes under the next round, or round 1 of the next year."""
+        try:
+            year, counselling_round = self.db_manager.admission_session()
+            target = (year + 1, 1) if new_year else (year, counselling_round + 1)
+            if not messagebox.askyesno(
+                    "Confirm Session",
+                    f"Record cutoff changes from now on under {target[0]}, round {target[1]}?"):
+                return
+            self.db_manager.set_admission_session(*target)
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Error changing admission session: {e}")
+            return
+        self.show_admission_session()
+
     def create_add_college_form(self):
         """Create the form for adding/editing college details."""
         self.form_frame = ttk.LabelFrame(
@@ -240,7 +256,6 @@ class CollegeManagerGUI:
         self.exam_combobox = ttk.Combobox(
             exam_frame,
             textvariable=self.exam_var,
-            values=self.get_exams(),
             state="readonly",
             width=30
         )
@@ -301,53 +316,50 @@ class CollegeManagerGUI:
         )
         self.list_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.scrolled_frame = ScrolledFrame(self.list_frame, autohide=True)
-        self.scrolled_frame.pack(fill=tk.BOTH, expand=True)
+        self.college_list = VirtualList(
+            self.list_frame,
+            create_row=self.create_college_card,
+            update_row=self.update_college_card
+        )
+        self.college_list.pack(fill=tk.BOTH, expand=True)
 
     def get_exams(self):
         """Get list of exams from database."""
         try:
-            conn = sqlite3.connect('career_counseling.db')
-            cursor = conn.cursor()
-            cursor.execute("SELECT ExamName FROM Exams ORDER BY ExamName")
-            exams = [row[0] for row in cursor.fetchall()]
-            conn.close()
-            return exams
-        except sqlite3.Error as e:
+            return self.db_manager.get_exam_types()
+        except Exception as e:
             messagebox.showerror("Database Error", f"Error loading exams: {e}")
             return []
 
 
-    def create_college_card(self, college_data):
-        """Create a display card for a college."""
-        college_id, name, location, field, fee = college_data
-
-        card = ttk.Frame(self.scrolled_frame, style="Card.TFrame")
+    def create_college_card(self, parent):
+        """Create an empty display card; update_college_card fills it in."""
+        row = ttk.Frame(parent)
+        card = ttk.Frame(row, style="Card.TFrame")
         card.pack(fill=tk.X, pady=5, padx=5)
 
         # College details
         details_frame = ttk.Frame(card)
         details_frame.pack(fill=tk.X, padx=10, pady=10)
 
-        name_label = ttk.Label(
+        row.name_label = ttk.Label(
             details_frame,
-            text=name,
             font=("Helvetica", 12, "bold")
         )
-        name_label.pack(anchor=tk.W)
+        row.name_label.pack(anchor=tk.W)
 
-        info_text = f"Location: {location} | Field: {field} | Tuition Fee: ₹{fee:,.2f}"
-        info_label = ttk.Label(details_frame, text=info_text)
-        info_label.pack(anchor=tk.W)
+        row.info_label = ttk.Label(details_frame)
+        row.info_label.pack(anchor=tk.W)
 
         # Buttons
         button_frame = ttk.Frame(details_frame)
         button_frame.pack(anchor=tk.W, pady=(5, 0))
 
+        # Rows are recycled, so the buttons act on whichever college is shown.
         edit_button = ttk.Button(
             button_frame,
             text="Edit",
-            command=lambda c=college_data: self.load_college_for_edit(c),
+            command=lambda: self.load_college_for_edit(row.college_data),
             style="info.TButton",
             width=10
         )
@@ -356,13 +368,22 @@ class CollegeManagerGUI:
         delete_button = ttk.Button(
             button_frame,
             text="Delete",
-            command=lambda cid=college_id: self.delete_college(cid),
+            command=lambda: self.delete_college(row.college_data[0]),
             style="danger.TButton",
             width=10
         )
         delete_button.pack(side=tk.LEFT)
 
-        ttk.Separator(self.scrolled_frame).pack(fill=tk.X, pady=5)
+        ttk.Separator(row).pack(fill=tk.X, pady=5)
+        return row
+
+    def update_college_card(self, row, college_data):
+        """Show a college in a recycled display card."""
+        college_id, name, location, field, fee = college_data
+        row.college_data = college_data
+        row.name_label.configure(text=name)
+        row.info_label.configure(
+            text=f"Location: {location} | Field: {field} | Tuition Fee: ₹{fee:,.2f}")
 
     def load_college_for_edit(self, college_data):
         """Load college data into the form for editing."""
@@ -376,24 +397,15 @@ class CollegeManagerGUI:
 
         # Load cutoff scores
         try:
-            conn = sqlite3.connect('career_counseling.db')
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT e.ExamName, ct.Category, ct.CutoffScore
-                FROM Cutoffs ct
-                JOIN Exams e ON ct.ExamID = e.ExamID
-                WHERE ct.CollegeID = ?
-            """, (college_id,))
-
-            cutoffs = cursor.fetchall()
-            conn.close()
+            cutoffs = self.db_manager.get_college_cutoffs(college_id)
 
             if cutoffs:
-                self.exam_var.set(cutoffs[0][0])
-                for exam_name, category, score in cutoffs:
-                    if category in self.cutoff_vars:
-                        self.cutoff_vars[category].set(str(score))
+                # The form edits one exam at a time; show the first one.
+                exam_name = cutoffs[0].exam_name
+                self.exam_var.set(exam_name)
+                for cutoff in cutoffs:
+                    if cutoff.exam_name == exam_name and cutoff.category in self.cutoff_vars:
+                        self.cutoff_vars[cutoff.category].set(str(cutoff.cutoff_score))
 
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Error loading cutoff scores: {e}")
@@ -426,35 +438,13 @@ class CollegeManagerGUI:
                 return
 
             fee = float(self.fee_var.get())
+            cutoffs = {category: float(var.get())
+                       for category, var in self.cutoff_vars.items() if var.get()}
 
-            conn = sqlite3.connect('career_counseling.db')
-            cursor = conn.cursor()
-
-            # Insert college
-            cursor.execute("""
-                INSERT INTO Colleges (CollegeName, Location, Field, TuitionFee)
-                VALUES (?, ?, ?, ?)
-            """, (self.name_var.get(), self.location_var.get(),
-                  self.field_var.get(), fee))
-
-            college_id = cursor.lastrowid
-
-            # Insert cutoff scores
-            if self.exam_var.get():
-                cursor.execute("SELECT ExamID FROM Exams WHERE ExamName = ?",
-                            (self.exam_var.get(),))
-                exam_id = cursor.fetchone()[0]
-
-                for category, var in self.cutoff_vars.items():
-                    if var.get():
-                        cursor.execute("""
-                            INSERT INTO Cutoffs (CollegeID, ExamID, Category, CutoffScore)
-                            VALUES (?, ?, ?, ?)
-                        """, (college_id, exam_id, category, float(var.get())))
-
-            conn.commit()
-            conn.close()
-
+            # Retried with backoff if a recommender is holding the database.
+            self.db_manager.add_college(
+                self.name_var.get(), self.location_var.get(), self.field_var.get(), fee,
+                exam_name=self.exam_var.get() or None, cutoffs=cutoffs)
             messagebox.showinfo("Success", "College added successfully!")
             self.clear_form()
             self.load_colleges()
@@ -477,42 +467,13 @@ class CollegeManagerGUI:
                 return
 
             fee = float(self.fee_var.get())
+            cutoffs = {category: float(var.get())
+                       for category, var in self.cutoff_vars.items() if var.get()}
 
-            conn = sqlite3.connect('career_counseling.db')
-            cursor = conn.cursor()
-
-                # Update college
-            cursor.execute("""
-                UPDATE Colleges 
-            SET CollegeName = ?, Location = ?, Field = ?, TuitionFee = ?
-                    WHERE CollegeID = ?
-            """, (self.name_var.get(), self.location_var.get(),
-                    self.field_var.get(), fee, self.current_college_id))
-
-            # Update cutoff scores
-            if self.exam_var.get():
-                # Get exam ID
-                cursor.execute("SELECT ExamID FROM Exams WHERE ExamName = ?",
-                                (self.exam_var.get(),))
-                exam_id = cursor.fetchone()[0]
-
-                # Delete existing cutoff scores
-                cursor.execute("""
-                    DELETE FROM Cutoffs 
-                    WHERE CollegeID = ? AND ExamID = ?
-                """, (self.current_college_id, exam_id))
-
-                # Insert new cutoff scores
-                for category, var in self.cutoff_vars.items():
-                    if var.get():
-                        cursor.execute("""
-                            INSERT INTO Cutoffs (CollegeID, ExamID, Category, CutoffScore)
-                            VALUES (?, ?, ?, ?)
-                        """, (self.current_college_id, exam_id, category, float(var.get())))
-
-            conn.commit()
-            conn.close()
-
+            self.db_manager.update_college(
+                self.current_college_id, self.name_var.get(), self.location_var.get(),
+                self.field_var.get(), fee, exam_name=self.exam_var.get() or None,
+                cutoffs=cutoffs)
             messagebox.showinfo("Success", "College updated successfully!")
             self.clear_form()
             self.load_colleges()
@@ -529,18 +490,7 @@ class CollegeManagerGUI:
             return
 
         try:
-            conn = sqlite3.connect('career_counseling.db')
-            cursor = conn.cursor()
-
-            # Delete cutoff scores first (foreign key constraint)
-            cursor.execute("DELETE FROM Cutoffs WHERE CollegeID = ?", (college_id,))
-
-            # Delete college
-            cursor.execute("DELETE FROM Colleges WHERE CollegeID = ?", (college_id,))
-
-            conn.commit()
-            conn.close()
-
+            self.db_manager.delete_college(college_id)
             messagebox.showinfo("Success", "College deleted successfully!")
             self.load_colleges()
 
@@ -549,7 +499,11 @@ class CollegeManagerGUI:
 
     def run(self):
         """Start the application."""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.search_scheduler.shutdown()
+            self.db_manager.close()
 def main():
     if len(sys.argv) != 2:
         print("Access Denied: Please launch through the main app.")
@@ -3,19 +3,29 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from ttkbootstrap.scrolled import ScrolledFrame
+from diagnostics_panel import install_diagnostics
 from database_operations import DatabaseManager, College
+from result_filter import ResultFilter
+from startup_profile import after_first_paint, watch_first_paint
+from virtual_list import VirtualList
 import sys
 
 
 class CollegeRecommenderGUI:
-    def __init__(self):
+    # Results loaded per step; the first page is on screen before the rest arrive.
+    PAGE_SIZE = 200
+
+    def __init__(self, db_manager=None):
         self.root = ttk.Window(themename="cosmo")
         self.root.title("College Recommender System")
         self.root.geometry("900x700")
         self.root.minsize(800, 600)
+        watch_first_paint(self.root, "College Recommender System")
 
-        self.db_manager = DatabaseManager('career_counseling.db')
+        self.db_manager = db_manager or DatabaseManager('career_counseling.db')
+        # Counsellors re-run the same searches; serve repeats from memory.
+        self.db_manager.enable_result_cache()
+        install_diagnostics(self.root, self.db_manager)
 
         # Add state variables for form validation
         self.form_valid = False
@@ -23,6 +33,9 @@ class CollegeRecommenderGUI:
 
         # Add state variable for storing current search results
         self.current_results = []
+        self.result_filter = None
+        # Pages of the search still being loaded, if any
+        self._pages = None
 
         self.main_container = ttk.Frame(self.root, padding="20")
         self.main_container.pack(fill=tk.BOTH, expand=True)
@@ -32,7 +45,8 @@ class CollegeRecommenderGUI:
         self.create_search_bar()  # New search bar
         self.create_results_area()
         self.create_status_bar()
-        self.populate_exam_types()
+        # Exam choices come from the database; load them once the window is on screen.
+        after_first_paint(self.root, self.populate_exam_types)
 
         # Bind validation to form inputs
         self.score_var.trace_add('write', self.validate_form)
@@ -216,17 +230,12 @@ class CollegeRecommenderGUI:
         if search_text == "search colleges by name or location...":
             return
 
-        # Clear existing results
-        self.clear_results()
-
         if not self.current_results:
+            self.clear_results()
             return
 
-        # Filter and display matching colleges
-        for college in self.current_results:
-            if (search_text in college.name.lower() or
-                    search_text in college.location.lower()):
-                self.create_college_card(college)
+        # Filter and display matching colleges; the list re-fills its rows in place
+        self.results_list.set_items(self.result_filter.filter(search_text))
 
     def search_colleges(self, event=None):
         self.logger.debug("Search colleges function called")
@@ -256,47 +265,76 @@ class CollegeRecommenderGUI:
                 Score: {score}
                 Budget: {budget}""")
 
-            # Call database search
-            colleges = self.db_manager.search_colleges(
+            # Results arrive a page at a time, best cutoff first; the first
+            # page is shown straight away and the rest load while idle.
+            pages = self.db_manager.iter_search_colleges(
                 exam_name=exam_name,
                 field=field,
                 category=category,
                 score=score,
-                budget=budget
+                budget=budget,
+                page_size=self.PAGE_SIZE
             )
+            self._pages = pages
+            first_page = next(pages, [])
 
-            self.logger.debug(f"Found {len(colleges) if colleges else 0} colleges")
+            self.logger.debug(f"First page has {len(first_page)} colleges")
 
-            if not colleges:
-                no_results_label = ttk.Label(
-                    self.scrolled_frame,
-                    text="No colleges found matching your criteria.\nTry adjusting your score or budget criteria.",
-                    font=("Helvetica", 12),
-                    justify="center"
+            if not first_page:
+                self.results_list.show_message(
+                    "No colleges found matching your criteria.\nTry adjusting your score or budget criteria."
                 )
-                no_results_label.pack(pady=20)
                 self.status_var.set("No colleges found")
                 self.current_results = []  # Clear current results
+                self._pages = None
                 return
 
-            # Sort colleges by cutoff score in descending order
-            colleges.sort(key=lambda x: x.cutoff_score, reverse=True)
-
             # Store current results for search filtering
-            self.current_results = [c for c in colleges if score >= c.cutoff_score]
-
-            # Display results
-            for college in self.current_results:
-                self.create_college_card(college)
-                self.logger.debug(f"Created card for college: {college.name}")
-
-            self.status_var.set(f"Found {len(self.current_results)} matching colleges")
+            self.current_results = []
+            self.result_filter = ResultFilter(
+                self.current_results,
+                lambda college: (college.name, college.location)
+            )
+            self._show_page(first_page)
+            self.root.after_idle(self._load_next_page, pages)
 
         except Exception as e:
             self.logger.error(f"Error during college search: {str(e)}", exc_info=True)
             messagebox.showerror("Error", f"An error occurred while searching: {str(e)}")
             self.status_var.set("Search failed")
             self.current_results = []  # Clear current results
+            self._pages = None
+
+    def _show_page(self, colleges, more=True):
+        """Append a page of results, keeping the list's scroll position."""
+        self.result_filter.add_items(colleges)
+        search_text = self.search_var.get().lower()
+        if search_text and search_text != "search colleges by name or location...":
+            self.results_list.set_items(self.result_filter.filter(search_text),
+                                        keep_scroll=True)
+        else:
+            self.results_list.set_items(self.current_results, keep_scroll=True)
+        loading = ", loading more..." if more else ""
+        self.status_var.set(f"Found {len(self.current_results)} matching colleges{loading}")
+
+    def _load_next_page(self, pages):
+        # A newer search or a cleared form abandons this one.
+        if pages is not self._pages:
+            return
+        try:
+            colleges = next(pages, None)
+        except Exception as e:
+            self.logger.error(f"Error loading more results: {str(e)}", exc_info=True)
+            self.status_var.set(f"Found {len(self.current_results)} matching colleges "
+                                f"(could not load the rest)")
+            self._pages = None
+            return
+        if colleges is None:
+            self._pages = None
+            self._show_page([], more=False)
+            return
+        self._show_page(colleges)
+        self.root.after_idle(self._load_next_page, pages)
 
 
     def create_results_area(self):
@@ -308,8 +346,12 @@ class CollegeRecommenderGUI:
         )
         self.results_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.scrolled_frame = ScrolledFrame(self.results_frame, autohide=True)
-        self.scrolled_frame.pack(fill=tk.BOTH, expand=True)
+        self.results_list = VirtualList(
+            self.results_frame,
+            create_row=self.create_college_card,
+            update_row=self.update_college_card
+        )
+        self.results_list.pack(fill=tk.BOTH, expand=True)
 
     def create_status_bar(self):
         """Create a status bar for displaying messages."""
@@ -393,13 +435,15 @@ class CollegeRecommenderGUI:
         self.current_results = []
 
     def clear_results(self):
-            """Clear the results area."""
-            for widget in self.scrolled_frame.winfo_children():
-                widget.destroy()
-    def create_college_card(self, college: College):
-        """Create a card-style display for a college with improved styling."""
+        """Clear the results area."""
+        self._pages = None
+        self.results_list.set_items([])
+
+    def create_college_card(self, parent):
+        """Create an empty card-style row; update_college_card fills it in."""
+        row = ttk.Frame(parent)
         card = ttk.Frame(
-            self.scrolled_frame,
+            row,
             style="Card.TFrame"
         )
         card.pack(fill=tk.X, pady=5, padx=5)
@@ -408,12 +452,11 @@ class CollegeRecommenderGUI:
         name_frame = ttk.Frame(card)
         name_frame.pack(fill=tk.X, pady=(10, 5), padx=10)
 
-        name_label = ttk.Label(
+        row.name_label = ttk.Label(
             name_frame,
-            text=college.name,
             font=("Helvetica", 14, "bold")
         )
-        name_label.pack(side=tk.LEFT)
+        row.name_label.pack(side=tk.LEFT)
 
         # Details section with grid layout
         details_frame = ttk.Frame(card)
@@ -428,10 +471,8 @@ class CollegeRecommenderGUI:
             text="Location:",
             font=("Helvetica", 10, "bold")
         ).grid(row=current_row, column=0, sticky='w')
-        ttk.Label(
-            details_frame,
-            text=college.location
-        ).grid(row=current_row, column=1, sticky='w', padx=(5, 20))
+        row.location_label = ttk.Label(details_frame)
+        row.location_label.grid(row=current_row, column=1, sticky='w', padx=(5, 20))
 
         # Field
         ttk.Label(
@@ -439,10 +480,8 @@ class CollegeRecommenderGUI:
             text="Field:",
             font=("Helvetica", 10, "bold")
         ).grid(row=current_row, column=2, sticky='w')
-        ttk.Label(
-            details_frame,
-            text=college.field
-        ).grid(row=current_row, column=3, sticky='w', padx=(5, 0))
+        row.field_label = ttk.Label(details_frame)
+        row.field_label.grid(row=current_row, column=3, sticky='w', padx=(5, 0))
         current_row += 1
 
         # Cutoff Score
@@ -451,10 +490,8 @@ class CollegeRecommenderGUI:
             text="Cutoff Score:",
             font=("Helvetica", 10, "bold")
         ).grid(row=current_row, column=0, sticky='w')
-        ttk.Label(
-            details_frame,
-            text=f"{college.cutoff_score:.2f}"
-        ).grid(row=current_row, column=1, sticky='w', padx=(5, 20))
+        row.cutoff_label = ttk.Label(details_frame)
+        row.cutoff_label.grid(row=current_row, column=1, sticky='w', padx=(5, 20))
 
         # Tuition Fee
         ttk.Label(
@@ -462,13 +499,26 @@ class CollegeRecommenderGUI:
             text="Annual Tuition Fee:",
             font=("Helvetica", 10, "bold")
         ).grid(row=current_row, column=2, sticky='w')
-        ttk.Label(
-            details_frame,
-            text=f"₹{college.tuition_fee:,.2f}"
-        ).grid(row=current_row, column=3, sticky='w', padx=(5, 0))
-
-        ttk.Separator(self.scrolled_frame).pack(fill=tk.X, pady=5)
-
+        row.fee_label = ttk.Label(details_frame)
+        row.fee_label.grid(row=current_row, column=3, sticky='w', padx=(5, 0))
+
+        ttk.Separator(row).pack(fill=tk.X, pady=5)
+        return row
+
+    def update_college_card(self, row, college: College):
+        """Show a college in a recycled card row."""
+        row.name_label.configure(text=college.name)
+        row.location_label.configure(text=college.location)
+        row.field_label.configure(text=college.field)
+        row.cutoff_label.configure(text=f"{college.cutoff_score:.2f}")
+        row.fee_label.configure(text=f"₹{college.tuition_fee:,.2f}")
+
+    def run(self):
+        """Start the application."""
+        try:
+            self.root.mainloop()
+        finally:
+            self.db_manager.close()
 
 def main():
     if len(sys.argv) != 2:
@@ -476,7 +526,7 @@ def main():
         return
     token = sys.argv[1]
     app = CollegeRecommenderGUI()
-    app.root.mainloop()
+    app.run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,332 @@
+"""In-process cutoff index for fast college recommendations.
+
+Cutoffs are grouped by (exam, field, category). Each group keeps its rows in
+parallel, array-backed columns sorted by cutoff score, so "every college with
+a cutoff at or below this score" is one binary search and a slice. A running
+minimum of the fees narrows budget-filtered searches the same way.
+
+The rows are read from the CutoffRanking table, which stores them already
+grouped and sorted, so loading needs neither the join nor a sort.
+"""
+import heapq
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import compress
+from typing import Dict, List, Optional, Tuple
+
+from database_operations import College, CollegeOption, SearchPage
+
+IndexKey = Tuple[str, str, str]
+
+_INDEX_QUERY = """
+    SELECT ExamName, Field, Category, CutoffScore,
+           CollegeID, CollegeName, Location, TuitionFee
+    FROM CutoffRanking
+"""
+
+
+class CutoffColumns:
+    """Rows for one (exam, field, category), sorted by (score, college id)."""
+
+    def __init__(self):
+        self.scores = array('d')
+        self.college_ids = array('q')
+        self.fees = array('d')
+        self.names = []
+        self.locations = []
+        # Negated running minimum of fees: non-decreasing, so it can be bisected.
+        # Rows before the first position whose minimum fits a budget cannot fit it.
+        self.neg_min_fees = array('d')
+
+    def __len__(self):
+        return len(self.scores)
+
+    def _update_min_fees(self, start=0):
+        """Recompute the running fee minimum from ``start`` onwards."""
+        del self.neg_min_fees[start:]
+        lowest = -self.neg_min_fees[-1] if self.neg_min_fees else float('inf')
+        for fee in self.fees[start:]:
+            lowest = min(lowest, fee)
+            self.neg_min_fees.append(-lowest)
+
+    def insert(self, score, college_id, name, location, fee):
+        """Insert one row, keeping the columns sorted."""
+        pos = bisect_right(self.scores, score)
+        # Ties are ordered by college id so results match the SQL index order.
+        while pos > 0 and self.scores[pos - 1] == score and self.college_ids[pos - 1] > college_id:
+            pos -= 1
+        self.scores.insert(pos, score)
+        self.college_ids.insert(pos, college_id)
+        self.fees.insert(pos, fee)
+        self.names.insert(pos, name)
+        self.locations.insert(pos, location)
+        self._update_min_fees(pos)
+
+    def remove(self, score, college_id) -> bool:
+        """Remove the row for a college at the given score."""
+        pos = bisect_left(self.scores, score)
+        end = bisect_right(self.scores, score)
+        for i in range(pos, end):
+            if self.college_ids[i] == college_id:
+                for column in (self.scores, self.college_ids, self.fees,
+                               self.names, self.locations):
+                    del column[i]
+                self._update_min_fees(i)
+                return True
+        return False
+
+    def eligible(self, score, budget=None, limit=None):
+        """Return (names, locations, scores, fees) for cutoffs <= score, highest first."""
+        end = bisect_right(self.scores, score)
+        start = 0
+        if budget:
+            start = min(bisect_left(self.neg_min_fees, -budget), end)
+        elif limit is not None:
+            start = max(end - limit, 0)
+        scores = self.scores[start:end][::-1]
+        fees = self.fees[start:end][::-1]
+        names = self.names[start:end][::-1]
+        locations = self.locations[start:end][::-1]
+        if budget:
+            mask = [fee <= budget for fee in fees]
+            scores = list(compress(scores, mask))[:limit]
+            fees = list(compress(fees, mask))[:limit]
+            names = list(compress(names, mask))[:limit]
+            locations = list(compress(locations, mask))[:limit]
+        return names, locations, scores, fees
+
+    def page(self, score, budget=None, after=None, size=100):
+        """Up to ``size`` rows for cutoffs <= score, highest first, after a keyset.
+
+        ``after`` is the (score, college id) of the last row of the previous
+        page. Returns (rows, more) with rows as (name, location, score, fee,
+        college id).
+        """
+        end = bisect_right(self.scores, score)
+        if after is not None:
+            after_score, after_id = after
+            end = min(end, bisect_right(self.scores, after_score))
+            # Ties are ordered by college id; skip those at or past the keyset.
+            while end > 0 and self.scores[end - 1] == after_score \
+                    and self.college_ids[end - 1] >= after_id:
+                end -= 1
+        # Rows below the first whose running fee minimum fits cannot fit.
+        start = min(bisect_left(self.neg_min_fees, -budget), end) if budget else 0
+        rows = []
+        for i in range(end - 1, start - 1, -1):
+            if budget and self.fees[i] > budget:
+                continue
+            if len(rows) == size:
+                return rows, True
+            rows.append((self.names[i], self.locations[i], self.scores[i], self.fees[i],
+                         self.college_ids[i]))
+        return rows, False
+
+
+def load_columns(conn: sqlite3.Connection, exam_name: str, field: str,
+        category: str) -> CutoffColumns:
+    """Load the sorted columns for a single (exam, field, category)."""
+    rows = conn.execute(_INDEX_QUERY + """
+        WHERE ExamName = ? AND Field = ? AND Category = ?
+        ORDER BY CutoffScore, CollegeID
+    """, (exam_name, field, category)).fetchall()
+    columns = CutoffColumns()
+    columns.scores = array('d', (row[3] for row in rows))
+    columns.college_ids = array('q', (row[4] for row in rows))
+    columns.names = [row[5] for row in rows]
+    columns.locations = [row[6] for row in rows]
+    columns.fees = array('d', (row[7] for row in rows))
+    columns._update_min_fees()
+    return columns
+
+
+class CutoffIndex:
+    """Sorted in-memory copy of the Cutoffs join, keyed by (exam, field, category)."""
+
+    def __init__(self):
+        self._groups: Dict[IndexKey, CutoffColumns] = {}
+        # CollegeID -> [(key, score), ...] so a college can be patched in place.
+        self._college_rows: Dict[int, List[Tuple[IndexKey, float]]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return sum(len(group) for group in self._groups.values())
+
+    def rebuild(self, conn: sqlite3.Connection):
+        """Reload the whole index from the database."""
+        groups: Dict[IndexKey, list] = {}
+        college_rows: Dict[int, list] = {}
+        # Primary-key order: grouped, then sorted by (score, college id).
+        rows = conn.execute(_INDEX_QUERY + """
+            ORDER BY ExamName, Field, Category, CutoffScore, CollegeID
+        """)
+        for exam, field, category, score, college_id, name, location, fee in rows:
+            key = (exam, field, category)
+            groups.setdefault(key, []).append((score, college_id, name, location, fee))
+            college_rows.setdefault(college_id, []).append((key, score))
+
+        built = {}
+        for key, rows in groups.items():
+            columns = CutoffColumns()
+            columns.scores = array('d', (row[0] for row in rows))
+            columns.college_ids = array('q', (row[1] for row in rows))
+            columns.names = [row[2] for row in rows]
+            columns.locations = [row[3] for row in rows]
+            columns.fees = array('d', (row[4] for row in rows))
+            columns._update_min_fees()
+            built[key] = columns
+
+        with self._lock:
+            self._groups = built
+            self._college_rows = college_rows
+
+    def _drop_college(self, college_id: int):
+        for key, score in self._college_rows.pop(college_id, []):
+            group = self._groups.get(key)
+            if group is not None:
+                group.remove(score, college_id)
+                if not group:
+                    del self._groups[key]
+
+    def refresh_college(self, conn: sqlite3.Connection, college_id: int):
+        """Re-read one college's cutoffs after it was added, edited or deleted."""
+        rows = conn.execute(_INDEX_QUERY + " WHERE CollegeID = ?",
+                            (college_id,)).fetchall()
+        with self._lock:
+            self._drop_college(college_id)
+            for exam, field, category, score, _, name, location, fee in rows:
+                key = (exam, field, category)
+                self._groups.setdefault(key, CutoffColumns()).insert(
+                    score, college_id, name, location, fee)
+                self._college_rows.setdefault(college_id, []).append((key, score))
+
+    def columns(self, exam_name: str, field: str, category: str) -> Optional[CutoffColumns]:
+        """Return the sorted columns for one (exam, field, category), if any."""
+        with self._lock:
+            return self._groups.get((exam_name, field, category))
+
+    def search_page(self, exam_name: str, field: str, category: str, score: float,
+            budget: Optional[float] = None, after: Optional[Tuple[float, int]] = None,
+            page_size: int = 100) -> SearchPage:
+        """One keyset page of search(), as DatabaseManager.search_colleges_page."""
+        with self._lock:
+            group = self._groups.get((exam_name, field, category))
+            if group is None:
+                return SearchPage([], None)
+            rows, more = group.page(score, budget, after, page_size)
+        colleges = [
+            College(
+                name=name,
+                location=location,
+                cutoff_score=cutoff,
+                field=field,
+                tuition_fee=fee
+            )
+            for name, location, cutoff, fee, _ in rows
+        ]
+        return SearchPage(colleges, (rows[-1][2], rows[-1][4]) if more else None)
+
+    def _best_option(self, college_id: int, scores: Dict[str, float], field: str,
+            categories: List[str]) -> Optional[tuple]:
+        """(margin, cutoff, exam, category) of a college's best qualifying option."""
+        best = None
+        for (exam_name, row_field, category), cutoff in self._college_rows.get(college_id, ()):
+            score = scores.get(exam_name)
+            if row_field != field or score is None or category not in categories \
+                    or cutoff > score:
+                continue
+            option = (score - cutoff, cutoff, exam_name, category)
+            # Equal margins go to the first exam, then category, in name order.
+            if best is None or option[0] > best[0] or \
+                    (option[0] == best[0] and option[2:] < best[2:]):
+                best = option
+        return best
+
+    def _top_options(self, scores: Dict[str, float], field: str, categories: List[str],
+            budget: Optional[float], limit: int) -> List[CollegeOption]:
+        # Walk every (exam, category) range from its highest cutoff down, all
+        # merged in order of margin. Colleges not seen yet have a margin at
+        # least the current one in every option, so once ``limit`` colleges
+        # rank below it the rest cannot get in.
+        def stream(group, score):
+            for position in range(bisect_right(group.scores, score) - 1, -1, -1):
+                yield score - group.scores[position], group, position
+
+        streams = []
+        for exam_name, score in scores.items():
+            for category in categories:
+                group = self._groups.get((exam_name, field, category))
+                if group is not None:
+                    streams.append(stream(group, score))
+        seen = set()
+        found = []
+        for margin, group, position in heapq.merge(*streams, key=lambda row: row[0]):
+            if len(found) >= limit and margin > found[limit - 1][0]:
+                break
+            college_id = group.college_ids[position]
+            if college_id in seen:
+                continue
+            seen.add(college_id)
+            if budget and group.fees[position] > budget:
+                continue
+            best_margin, cutoff, exam_name, category = self._best_option(
+                college_id, scores, field, categories)
+            insort(found, (best_margin, -college_id, cutoff, exam_name, category,
+                           group.names[position], group.locations[position],
+                           group.fees[position]))
+        return [CollegeOption(name, location, cutoff, field, fee, exam_name, category, margin)
+                for margin, _, cutoff, exam_name, category, name, location, fee
+                in found[:limit]]
+
+    def search_multi(self, scores: Dict[str, float], field: str, categories: List[str],
+            budget: Optional[float] = None, limit: Optional[int] = None) -> List[CollegeOption]:
+        """Same results as DatabaseManager.search_colleges_multi, served from memory."""
+        if limit is not None and limit <= 0:
+            return []
+        with self._lock:
+            if limit is not None:
+                return self._top_options(scores, field, categories, budget, limit)
+            # CollegeID -> (margin, group, position, exam, category) of its best option so far
+            best: Dict[int, tuple] = {}
+            for exam_name, score in scores.items():
+                for category in categories:
+                    group = self._groups.get((exam_name, field, category))
+                    if group is None:
+                        continue
+                    end = bisect_right(group.scores, score)
+                    rows = zip(range(end), group.college_ids[:end], group.scores[:end])
+                    if budget:
+                        rows = compress(rows, [fee <= budget for fee in group.fees[:end]])
+                    for position, college_id, cutoff in rows:
+                        margin = score - cutoff
+                        current = best.get(college_id)
+                        if current is None or margin > current[0]:
+                            best[college_id] = (margin, group, position, exam_name, category)
+            ranked = sorted(best.items(), key=lambda item: (item[1][0], -item[0]))
+            return [
+                CollegeOption(group.names[position], group.locations[position],
+                              group.scores[position], field, group.fees[position],
+                              exam_name, category, margin)
+                for _, (margin, group, position, exam_name, category) in ranked
+            ]
+
+    def search(self, exam_name: str, field: str, category: str,
+            score: float, budget: Optional[float] = None) -> List[College]:
+        """Same results as DatabaseManager.search_colleges, served from memory."""
+        with self._lock:
+            group = self._groups.get((exam_name, field, category))
+            if group is None:
+                return []
+            names, locations, scores, fees = group.eligible(score, budget)
+        return [
+            College(
+                name=name,
+                location=location,
+                cutoff_score=cutoff,
+                field=field,
+                tuition_fee=fee
+            )
+            for name, location, cutoff, fee in zip(names, locations, scores, fees)
+        ]
@@ -1,122 +1,1058 @@
+import logging
+import queue
+import random
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
 from dataclasses import dataclass
-from typing import List, Optional
+from functools import lru_cache
+from typing import (Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional,
+                    Sequence, Tuple, TypeVar)
+
+from migrations import deferred_trends, migrate
+from query_stats import InstrumentedConnection, QueryStats
+
+# Applied once to every connection when the pool opens it.
+DEFAULT_PRAGMAS = {
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": "-8000",
+}
+
+# WAL lets recommender processes keep reading while the admin app writes.
+# Unlike the other PRAGMAs it is stored in the database file.
+DEFAULT_JOURNAL_MODE = "WAL"
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def is_lock_error(error: sqlite3.Error) -> bool:
+    """Whether an error means another connection holds a conflicting lock."""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and (
+        "locked" in message or "busy" in message)
+
+# Sort options offered by the admin college list, mapped to ORDER BY clauses.
+COLLEGE_SORT_ORDERS = {
+    "Name (A-Z)": "c.CollegeName ASC",
+    "Name (Z-A)": "c.CollegeName DESC",
+    "Location (A-Z)": "c.Location ASC",
+    "Fee (Low-High)": "c.TuitionFee ASC",
+    "Fee (High-Low)": "c.TuitionFee DESC",
+}
+
+
+# Admin statements. Their text never varies, so each pooled connection's
+# sqlite3 statement cache prepares them once and reuses them.
+INSERT_COLLEGE = """
+    INSERT INTO Colleges (CollegeName, Location, Field, TuitionFee) VALUES (?, ?, ?, ?)
+"""
+UPDATE_COLLEGE = """
+    UPDATE Colleges SET CollegeName = ?, Location = ?, Field = ?, TuitionFee = ?
+    WHERE CollegeID = ?
+"""
+DELETE_COLLEGE = "DELETE FROM Colleges WHERE CollegeID = ?"
+DELETE_COLLEGE_CUTOFFS = "DELETE FROM Cutoffs WHERE CollegeID = ?"
+DELETE_EXAM_CUTOFFS = "DELETE FROM Cutoffs WHERE CollegeID = ? AND ExamID = ?"
+INSERT_CUTOFF = """
+    INSERT INTO Cutoffs (CollegeID, ExamID, Category, CutoffScore) VALUES (?, ?, ?, ?)
+"""
+SELECT_EXAM_ID = "SELECT ExamID FROM Exams WHERE ExamName = ?"
+INSERT_HISTORY = """
+    INSERT OR REPLACE INTO CutoffHistory
+        (ExamID, Category, CollegeID, Year, Round, CutoffScore)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+SELECT_COLLEGE_HISTORY = """
+    SELECT e.ExamName, h.Category, h.Year, h.Round, h.CutoffScore
+    FROM CutoffHistory h
+    JOIN Exams e ON h.ExamID = e.ExamID
+    WHERE h.CollegeID = ?
+    ORDER BY e.ExamName, h.Category, h.Year, h.Round
+"""
+SELECT_COLLEGE_CUTOFFS = """
+    SELECT e.ExamName, ct.Category, ct.CutoffScore
+    FROM Cutoffs ct
+    JOIN Exams e ON ct.ExamID = e.ExamID
+    WHERE ct.CollegeID = ?
+    ORDER BY e.ExamName, ct.Category
+"""
+
+
+@lru_cache(maxsize=None)
+def _college_list_query(match: Optional[str], by_field: bool, sort_option: str) -> str:
+    """The admin list query for one combination of filters.
+
+    There are only a few dozen combinations, and building each text once
+    keeps it identical between calls so its prepared statement is reused.
+    """
+    query = """
+        SELECT c.CollegeID, c.CollegeName, c.Location, c.Field, c.TuitionFee
+        FROM Colleges c
+        WHERE 1=1
+    """
+    if match == "fts":
+        query += """ AND c.CollegeID IN (
+            SELECT rowid FROM CollegeSearch WHERE CollegeSearch MATCH ?
+        )"""
+    elif match == "like":
+        query += """ AND (
+            LOWER(c.CollegeName) LIKE ? OR
+            LOWER(c.Location) LIKE ? OR
+            LOWER(c.Field) LIKE ?
+        )"""
+    if by_field:
+        query += " AND c.Field = ?"
+    return query + " ORDER BY " + COLLEGE_SORT_ORDERS[sort_option]
+
+
+@lru_cache(maxsize=None)
+def _multi_exam_query(exams: int, categories: int, by_budget: bool, limited: bool) -> str:
+    """The combined search over several exam scores and categories.
+
+    Each (exam, category) pair is one range scan of CutoffRanking; the rows
+    are grouped by college keeping the option with the largest margin. Only
+    the narrow grouped rows are sorted, and names are joined on afterwards.
+    """
+    query = f"""
+        WITH Scores(ExamName, Score) AS (VALUES {", ".join(["(?, ?)"] * exams)}),
+             Categories(Category) AS (VALUES {", ".join(["(?)"] * categories)})
+        SELECT c.CollegeName, c.Location, b.CutoffScore, c.Field, c.TuitionFee,
+               b.ExamName, b.Category, b.Margin
+        FROM (
+            SELECT r.CollegeID, r.ExamName, r.Category, r.CutoffScore,
+                   MAX(s.Score - r.CutoffScore) AS Margin
+            FROM Scores s
+            JOIN Categories g
+            JOIN CutoffRanking r
+              ON r.ExamName = s.ExamName AND r.Field = ? AND r.Category = g.Category
+             AND r.CutoffScore <= s.Score
+    """
+    if by_budget:
+        query += " AND r.TuitionFee <= ?"
+    query += """
+            GROUP BY r.CollegeID
+            ORDER BY Margin, r.CollegeID DESC
+    """
+    if limited:
+        query += " LIMIT ?"
+    return query + """
+        ) b
+        JOIN Colleges c ON c.CollegeID = b.CollegeID
+        ORDER BY b.Margin, b.CollegeID DESC
+    """
+
+
+class CollegeRow(NamedTuple):
+    """A row of the admin college list."""
+    college_id: int
+    name: str
+    location: str
+    field: str
+    tuition_fee: float
+
+
+class CutoffRow(NamedTuple):
+    exam_name: str
+    category: str
+    cutoff_score: float
+
+
+class HistoryRow(NamedTuple):
+    exam_name: str
+    category: str
+    year: int
+    counselling_round: int
+    # None when the cutoff was removed in that session.
+    cutoff_score: Optional[float]
+
+
+class CutoffTrendRow(NamedTuple):
+    """How one college's cutoff for an exam and category moved over the years."""
+    college_id: int
+    name: str
+    location: str
+    field: str
+    first_year: int
+    last_year: int
+    years: int
+    first_score: float
+    last_score: float
+    drift: float
+    slope: Optional[float]
+
 
 @dataclass
 class College:
+    # No per-instance __dict__: searches and batches create one per result row.
+    __slots__ = ("name", "location", "cutoff_score", "field", "tuition_fee")
+
     name: str
     location: str
     cutoff_score: float
     field: str
     tuition_fee: float
 
+
+class CollegeList(Sequence):
+    """Results of one field kept as columns; College rows are built when read.
+
+    Compares equal to a list of the same College rows, so it can stand in
+    for the lists search_colleges returns.
+    """
+
+    __slots__ = ("field", "names", "locations", "scores", "fees")
+
+    def __init__(self, field: str, names: Sequence[str], locations: Sequence[str],
+            scores: Sequence[float], fees: Sequence[float]):
+        self.field = field
+        self.names = names
+        self.locations = locations
+        self.scores = scores
+        self.fees = fees
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CollegeList(self.field, self.names[index], self.locations[index],
+                               self.scores[index], self.fees[index])
+        return College(
+            name=self.names[index],
+            location=self.locations[index],
+            cutoff_score=self.scores[index],
+            field=self.field,
+            tuition_fee=self.fees[index]
+        )
+
+    def __iter__(self):
+        field = self.field
+        for name, location, cutoff, fee in zip(self.names, self.locations,
+                                               self.scores, self.fees):
+            yield College(name=name, location=location, cutoff_score=cutoff,
+                          field=field, tuition_fee=fee)
+
+    def __eq__(self, other):
+        if isinstance(other, (CollegeList, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CollegeList({list(self)!r})"
+
+
+class SearchPage(NamedTuple):
+    """One page of search results, best cutoff first."""
+    colleges: List[College]
+    # (CutoffScore, CollegeID) of the last row, to pass as ``after`` for the
+    # next page; None when there are no more rows.
+    next_after: Optional[Tuple[float, int]]
+
+
+class CollegeOption(NamedTuple):
+    """A college's best way in across several exams and categories.
+
+    It has College's attributes, so result lists can render it directly.
+    """
+    name: str
+    location: str
+    cutoff_score: float
+    field: str
+    tuition_fee: float
+    exam_name: str
+    category: str
+    # Score minus cutoff for that exam and category.
+    margin: float
+
+class ConnectionPool:
+    """Thread-safe pool of reusable SQLite connections."""
+
+    def __init__(self, db_path: str, pool_size: int = 5, timeout: float = 30.0,
+            pragmas: Optional[Dict[str, str]] = None, read_only: bool = False):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.read_only = read_only
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.query_stats: Optional[QueryStats] = None
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a new connection and apply the configured PRAGMAs."""
+        # The pool hands each connection to one thread at a time, so it is
+        # safe to let a connection move between threads.
+        factory = sqlite3.Connection if self.query_stats is None else InstrumentedConnection
+        if self.read_only:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=self.timeout,
+                                   check_same_thread=False, factory=factory)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout,
+                                   check_same_thread=False, factory=factory)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        if self.query_stats is not None:
+            conn.query_stats = self.query_stats
+        return conn
+
+    def instrument(self, query_stats: QueryStats):
+        """Record statements into ``query_stats`` on connections opened from now on.
+
+        Idle connections are closed so they get reopened instrumented;
+        connections checked out right now stay uninstrumented.
+        """
+        self.query_stats = query_stats
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        """Check that a pooled connection is still usable."""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take a connection from the pool, opening one if there is room."""
+        while True:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_open = self._created < self.pool_size
+                    if can_open:
+                        self._created += 1
+                if can_open:
+                    try:
+                        return self._open()
+                    except sqlite3.Error:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError(
+                        "Timed out waiting for a database connection")
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, rolling back anything left open."""
+        if self._closed:
+            self._discard(conn)
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with-block."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close every idle connection and refuse further checkouts."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
 class DatabaseManager:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, pool_size: int = 5,
+            use_cutoff_index: bool = False, read_only: bool = False,
+            journal_mode: Optional[str] = DEFAULT_JOURNAL_MODE, busy_timeout: float = 5.0):
         self.db_path = db_path
-        self.setup_database()
+        self.pool = ConnectionPool(db_path, pool_size=pool_size, timeout=busy_timeout,
+                                   read_only=read_only)
+        if journal_mode and not read_only:
+            self._set_journal_mode(journal_mode)
+        self.cutoff_index = None
+        self.result_cache = None
+        self.query_stats = None
+        # Bumped by every write made through this manager, and when
+        # check_external_writes() sees a commit from another connection.
+        self.data_version = 0
+        # PRAGMA data_version is per connection, so commits by other
+        # processes are watched for on one connection kept out of the pool.
+        self._watch_conn: Optional[sqlite3.Connection] = None
+        self._watched_version = None
+        self._watch_lock = threading.Lock()
+        self.has_college_search = False
+        # Read-only managers expect an existing database and never touch the schema.
+        if read_only:
+            with self.connection() as conn:
+                self.has_college_search = self._college_search_exists(conn)
+        else:
+            self.setup_database()
+        if use_cutoff_index:
+            self.enable_cutoff_index()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection for reads."""
+        with self.pool.connection() as conn:
+            yield conn
+
+    def _set_journal_mode(self, journal_mode: str):
+        with self.connection() as conn:
+            current = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            if current.lower() == journal_mode.lower():
+                return
+            try:
+                conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+            except sqlite3.OperationalError as e:
+                # Another process is mid-write; the next start will switch over.
+                logger.warning(f"Could not switch {self.db_path} to {journal_mode}: {e}")
+
+    @contextmanager
+    def transaction(self):
+        """Borrow a pooled connection and commit on success, roll back on error.
+
+        The write lock is taken up front (BEGIN IMMEDIATE), so a busy database
+        is waited on for the busy timeout instead of failing half-way through.
+        """
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def run_write(self, work: Callable[[sqlite3.Connection], T], retries: int = 4,
+            backoff: float = 0.05) -> T:
+        """Run ``work(conn)`` in a transaction, retrying while the database is locked.
+
+        Waits grow exponentially from ``backoff`` seconds, with jitter so
+        competing writers do not retry in lockstep. ``work`` may run more
+        than once, so it should only touch the database.
+        """
+        for attempt in range(retries + 1):
+            try:
+                with self.transaction() as conn:
+                    return work(conn)
+            except sqlite3.OperationalError as e:
+                if not is_lock_error(e) or attempt == retries:
+                    raise
+                delay = backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                logger.debug(f"Database locked, retrying write in {delay:.3f}s")
+                time.sleep(delay)
+
+    def close(self):
+        """Release all pooled connections."""
+        self.pool.close()
+        with self._watch_lock:
+            if self._watch_conn is not None:
+                self._watch_conn.close()
+                self._watch_conn = None
+
+    def enable_cutoff_index(self):
+        """Serve search_colleges from an in-memory CutoffIndex.
+
+        The index is rebuilt when check_external_writes() sees a commit from
+        another process, so a busy writer elsewhere means frequent reloads.
+        """
+        from cutoff_index import CutoffIndex
+
+        self.check_external_writes()
+        index = CutoffIndex()
+        with self.connection() as conn:
+            index.rebuild(conn)
+        self.cutoff_index = index
+
+    def enable_result_cache(self, max_entries: int = 256, ttl: float = 60.0):
+        """Cache search_colleges results in a bounded LRU cache.
+
+        Writes by other processes are picked up on the next search through
+        check_external_writes(); the TTL is a backstop.
+        """
+        from query_cache import QueryCache
+
+        self.check_external_writes()
+        self.result_cache = QueryCache(max_entries=max_entries, ttl=ttl)
+
+    def cache_stats(self) -> Optional[dict]:
+        """Hit, miss and eviction counters of the result cache, if enabled."""
+        if self.result_cache is None:
+            return None
+        return self.result_cache.stats()
+
+    def enable_query_stats(self, slow_ms: float = 100.0, explain_slow: bool = False,
+            query_stats: Optional[QueryStats] = None) -> QueryStats:
+        """Time every statement run through the pool and log slow ones.
+
+        Returns the collector; call its ``snapshot()`` or ``dump(path)`` to
+        read the numbers.
+        """
+        self.query_stats = query_stats or QueryStats(slow_ms=slow_ms, explain_slow=explain_slow)
+        self.pool.instrument(self.query_stats)
+        return self.query_stats
+
+    def _read_watched_version(self) -> int:
+        if self._watch_conn is None:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            self._watch_conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        return self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def check_external_writes(self) -> bool:
+        """Drop cached results and reload the cutoff index if another process committed.
+
+        The first call only records where the database is. Returns True when
+        a write was picked up. Cheap enough to call before every cached search.
+        """
+        with self._watch_lock:
+            try:
+                version = self._read_watched_version()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not check {self.db_path} for external writes: {e}")
+                return False
+            changed = self._watched_version is not None and version != self._watched_version
+            self._watched_version = version
+        if changed:
+            self.reload_cutoff_index()
+        return changed
+
+    def _data_changed(self, index_reloaded: bool = False):
+        # Read the watched version before invalidating. Whatever another
+        # process had committed by then is covered by this invalidation, and
+        # anything committed later moves the version again, so it can be taken
+        # as seen. Reading it afterwards could swallow such a later commit.
+        with self._watch_lock:
+            try:
+                seen = None if self._watch_conn is None else self._read_watched_version()
+            except sqlite3.Error:
+                seen = None
+        self.data_version += 1
+        if self.result_cache is not None:
+            self.result_cache.bump_version()
+        # A cutoff index only patched for one college still needs the next
+        # check to reload it.
+        if seen is not None and (self.cutoff_index is None or index_reloaded):
+            with self._watch_lock:
+                self._watched_version = seen
+
+    def reload_cutoff_index(self):
+        """Rebuild the cutoff index and drop cached results after bulk changes."""
+        self._data_changed(index_reloaded=True)
+        if self.cutoff_index is None:
+            return
+        with self.connection() as conn:
+            self.cutoff_index.rebuild(conn)
+
+    def refresh_college(self, college_id: int):
+        """Bring the cutoff index and result cache up to date after a college was written."""
+        self._data_changed()
+        if self.cutoff_index is None:
+            return
+        with self.connection() as conn:
+            self.cutoff_index.refresh_college(conn, college_id)
 
     def setup_database(self):
-        """Initialize the database with required tables and sample data."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.executescript("""
-            CREATE TABLE IF NOT EXISTS Exams (
-                ExamID INTEGER PRIMARY KEY AUTOINCREMENT,
-                ExamName TEXT UNIQUE NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS Colleges (
-                CollegeID INTEGER PRIMARY KEY AUTOINCREMENT,
-                CollegeName TEXT NOT NULL,
-                Location TEXT NOT NULL,
-                Field TEXT NOT NULL,
-                TuitionFee REAL NOT NULL,
-                UNIQUE(CollegeName, Location)
-            );
-
-            CREATE TABLE IF NOT EXISTS Cutoffs (
-                CollegeID INTEGER,
-                ExamID INTEGER,
-                Category TEXT NOT NULL,
-                CutoffScore REAL NOT NULL,
-                FOREIGN KEY (CollegeID) REFERENCES Colleges(CollegeID),
-                FOREIGN KEY (ExamID) REFERENCES Exams(ExamID),
-                UNIQUE(CollegeID, ExamID, Category)
-            );
-        """)
-        cursor.execute("SELECT COUNT(*) FROM Exams")
-        if cursor.fetchone()[0] == 0:
-            cursor.execute("""
-                    INSERT INTO Exams (ExamName) VALUES 
-                        ('JEE Main'),
-                        ('JEE Advanced'),
-                        ('NEET'),
-                        ('BITSAT');""")
-
-        conn.commit()
-        conn.close()
+        """Bring the database schema up to date, creating it if needed."""
+        with self.connection() as conn:
+            migrate(conn)
+            self.has_college_search = self._college_search_exists(conn)
+
+    @staticmethod
+    def _college_search_exists(conn: sqlite3.Connection) -> bool:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'CollegeSearch'"
+        ).fetchone() is not None
+
+    def search_college_list(self, search_term: str = "", field: Optional[str] = None,
+            sort_option: str = "Name (A-Z)",
+            cancelled: Optional[Callable[[], bool]] = None) -> List[CollegeRow]:
+        """Search colleges for the admin list.
+
+        Returns rows whose name, location or field contains ``search_term``.
+        If ``cancelled`` returns True while the query runs, SQLite aborts it
+        and sqlite3.OperationalError is raised.
+        """
+        params = []
+        search_term = search_term.lower()
+        # The trigram index needs at least three characters to narrow the search.
+        if search_term and self.has_college_search and len(search_term) >= 3:
+            match = "fts"
+            params.append('"' + search_term.replace('"', '""') + '"')
+        elif search_term:
+            match = "like"
+            params.extend([f"%{search_term}%"] * 3)
+        else:
+            match = None
+        if field:
+            params.append(field)
+        if sort_option not in COLLEGE_SORT_ORDERS:
+            sort_option = "Name (A-Z)"
+        query = _college_list_query(match, bool(field), sort_option)
+
+        with self.connection() as conn:
+            if cancelled is None:
+                return list(map(CollegeRow._make, conn.execute(query, params)))
+            # Checked every few thousand VM steps; a true result interrupts the query.
+            conn.set_progress_handler(cancelled, 5000)
+            try:
+                return list(map(CollegeRow._make, conn.execute(query, params)))
+            finally:
+                conn.set_progress_handler(None, 0)
+
+    def get_college_cutoffs(self, college_id: int) -> List[CutoffRow]:
+        """Cutoff scores recorded for one college, by exam and category."""
+        with self.connection() as conn:
+            return list(map(CutoffRow._make, conn.execute(SELECT_COLLEGE_CUTOFFS, (college_id,))))
+
+    @staticmethod
+    def _exam_id(conn: sqlite3.Connection, exam_name: str) -> int:
+        row = conn.execute(SELECT_EXAM_ID, (exam_name,)).fetchone()
+        if row is None:
+            raise sqlite3.IntegrityError(f"Unknown exam: {exam_name}")
+        return row[0]
+
+    @classmethod
+    def _write_cutoffs(cls, conn: sqlite3.Connection, college_id: int, exam_name: str,
+            cutoffs: Dict[str, float], replace: bool):
+        exam_id = cls._exam_id(conn, exam_name)
+        if replace:
+            conn.execute(DELETE_EXAM_CUTOFFS, (college_id, exam_id))
+        conn.executemany(INSERT_CUTOFF, [(college_id, exam_id, category, score)
+                                         for category, score in cutoffs.items()])
+
+    def add_college(self, name: str, location: str, field: str, tuition_fee: float,
+            exam_name: Optional[str] = None,
+            cutoffs: Optional[Dict[str, float]] = None) -> int:
+        """Insert a college and its cutoffs for one exam in one transaction.
+
+        Returns the new CollegeID.
+        """
+        def write(conn):
+            college_id = conn.execute(INSERT_COLLEGE,
+                                      (name, location, field, tuition_fee)).lastrowid
+            if exam_name:
+                self._write_cutoffs(conn, college_id, exam_name, cutoffs or {}, replace=False)
+            return college_id
+
+        college_id = self.run_write(write)
+        self.refresh_college(college_id)
+        return college_id
+
+    def update_college(self, college_id: int, name: str, location: str, field: str,
+            tuition_fee: float, exam_name: Optional[str] = None,
+            cutoffs: Optional[Dict[str, float]] = None):
+        """Update a college and replace its cutoffs for one exam in one transaction."""
+        def write(conn):
+            conn.execute(UPDATE_COLLEGE, (name, location, field, tuition_fee, college_id))
+            if exam_name:
+                self._write_cutoffs(conn, college_id, exam_name, cutoffs or {}, replace=True)
+
+        self.run_write(write)
+        self.refresh_college(college_id)
+
+    def delete_college(self, college_id: int):
+        """Delete a college and all of its cutoffs."""
+        def write(conn):
+            # Cutoffs first (foreign key constraint)
+            conn.execute(DELETE_COLLEGE_CUTOFFS, (college_id,))
+            conn.execute(DELETE_COLLEGE, (college_id,))
+
+        self.run_write(write)
+        self.refresh_college(college_id)
+
+    def admission_session(self) -> Tuple[int, int]:
+        """The (year, round) that writes to current cutoffs are recorded under."""
+        with self.connection() as conn:
+            return tuple(conn.execute("SELECT Year, Round FROM AdmissionSession").fetchone())
+
+    def set_admission_session(self, year: int, counselling_round: int = 1):
+        """Record later cutoff writes under a new year or counselling round.
+
+        Earlier sessions stay in the history; the current cutoffs are not
+        changed until they are next written.
+        """
+        self.run_write(lambda conn: conn.execute(
+            "UPDATE AdmissionSession SET Year = ?, Round = ?", (year, counselling_round)))
+
+    def record_cutoff_history(self, rows: Iterable[tuple]) -> int:
+        """Load past cutoffs in one transaction, replacing any already recorded.
+
+        Rows are (CollegeID, ExamName, Category, Year, Round, CutoffScore).
+        Current cutoffs are left alone. Returns the number of rows written.
+        """
+        def write(conn):
+            exam_ids = dict(conn.execute("SELECT ExamName, ExamID FROM Exams"))
+            try:
+                values = [(exam_ids[exam], category, college_id, year, counselling_round, score)
+                          for college_id, exam, category, year, counselling_round, score in rows]
+            except KeyError as e:
+                raise sqlite3.IntegrityError(f"Unknown exam: {e.args[0]}")
+            # A load covering most keys (a whole past year, say) is cheaper
+            # to summarise in one pass afterwards than row by row.
+            if len(values) > conn.execute("SELECT COUNT(*) FROM CutoffTrend").fetchone()[0]:
+                with deferred_trends(conn):
+                    conn.executemany(INSERT_HISTORY, values)
+            else:
+                conn.executemany(INSERT_HISTORY, values)
+            return len(values)
+
+        written = self.run_write(write)
+        self._data_changed()
+        return written
+
+    def get_cutoff_history(self, college_id: int) -> List[HistoryRow]:
+        """Every recorded cutoff of one college, oldest first within each exam and category."""
+        with self.connection() as conn:
+            return list(map(HistoryRow._make, conn.execute(SELECT_COLLEGE_HISTORY, (college_id,))))
+
+    def cutoff_trends(self, exam_name: str, category: str, field: Optional[str] = None,
+            min_years: int = 2, rising: bool = True, limit: int = 50) -> List[CutoffTrendRow]:
+        """Colleges whose cutoff moved the most between their first and last year.
+
+        ``rising`` picks the largest increases, otherwise the largest drops.
+        Reads the CutoffTrend summary in drift order, so it stops after
+        ``limit`` rows however long the history is.
+        """
+        query = f"""
+            SELECT t.CollegeID, c.CollegeName, c.Location, c.Field,
+                   t.FirstYear, t.LastYear, t.Years, t.FirstScore, t.LastScore,
+                   t.Drift, t.Slope
+            FROM CutoffTrend t
+            JOIN Colleges c ON c.CollegeID = t.CollegeID
+            WHERE t.ExamID = (SELECT ExamID FROM Exams WHERE ExamName = ?)
+            AND t.Category = ?
+            AND t.Years >= ?
+            {"AND c.Field = ?" if field else ""}
+            ORDER BY t.Drift {"DESC" if rising else "ASC"}
+            LIMIT ?
+        """
+        params = [exam_name, category, min_years] + ([field] if field else []) + [limit]
+        with self.connection() as conn:
+            return list(map(CutoffTrendRow._make, conn.execute(query, params)))
 
     def get_exam_types(self) -> List[str]:
         """Retrieve all exam types from database."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT ExamName FROM Exams ORDER BY ExamName")
-            exams = [row[0] for row in cursor.fetchall()]
-            conn.close()
-            return exams
+            with self.connection() as conn:
+                cursor = conn.execute("SELECT ExamName FROM Exams ORDER BY ExamName")
+                return [row[0] for row in cursor.fetchall()]
         except sqlite3.Error as e:
             raise Exception(f"Error loading exam types: {e}")
 
+    @staticmethod
+    def _as_of(year: Optional[int],
+            counselling_round: Optional[int]) -> Optional[Tuple[int, int]]:
+        """The (year, round) a search targets; no round means the end of the year."""
+        if year is None:
+            return None
+        return int(year), 99 if counselling_round is None else int(counselling_round)
+
+    def _build_search_query(self, exam_name: str, field: str, category: str,
+            score: float, budget: Optional[float] = None, as_of: Optional[Tuple[int, int]] = None,
+            after: Optional[Tuple[float, int]] = None, limit: Optional[int] = None):
+        """Build the SQL and parameters shared by search and its query plan.
+
+        ``after`` is a (CutoffScore, CollegeID) keyset: only rows ordered
+        after it are returned, at most ``limit`` of them.
+        """
+        if as_of is not None:
+            return self._build_as_of_query(exam_name, field, category, score, budget, as_of,
+                                           after, limit)
+        # CutoffRanking holds the Cutoffs join pre-sorted by (exam, field,
+        # category, score), so this is one primary-key range scan.
+        query = """
+            SELECT 
+                CollegeName,
+                Location,
+                CutoffScore,
+                Field,
+                TuitionFee,
+                CollegeID
+            FROM CutoffRanking
+            WHERE ExamName = ?
+            AND Field = ?
+            AND Category = ?
+        """
+        params = [exam_name, field, category]
+
+        # A keyset at or below the score implies the score bound. On its own
+        # it is a seek into the primary key; next to "CutoffScore <= ?" it
+        # would only filter rows scanned from the top of the range.
+        if after is not None and after[0] <= score:
+            query += " AND (CutoffScore, CollegeID) < (?, ?)"
+            params.extend(after)
+        else:
+            query += " AND CutoffScore <= ?"
+            params.append(score)
+
+        if budget:
+            query += " AND TuitionFee <= ?"
+            params.append(budget)
+
+        query += " ORDER BY CutoffScore DESC, CollegeID DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return query, params
+
+    @staticmethod
+    def _build_as_of_query(exam_name: str, field: str, category: str, score: float,
+            budget: Optional[float], as_of: Tuple[int, int],
+            after: Optional[Tuple[float, int]] = None, limit: Optional[int] = None):
+        # For each college in the field, one seek on the history primary key
+        # finds its latest cutoff at or before the target, so the cost grows
+        # with the number of colleges and not with the years of history.
+        query = """
+            SELECT CollegeName, Location, CutoffScore, Field, TuitionFee, CollegeID
+            FROM (
+                SELECT c.CollegeID, c.CollegeName, c.Location, c.Field, c.TuitionFee,
+                    (SELECT h.CutoffScore FROM CutoffHistory h
+                     WHERE h.ExamID = e.ExamID AND h.Category = ? AND h.CollegeID = c.CollegeID
+                     AND (h.Year, h.Round) <= (?, ?)
+                     ORDER BY h.Year DESC, h.Round DESC LIMIT 1) AS CutoffScore
+                FROM Colleges c, (SELECT ExamID FROM Exams WHERE ExamName = ?) e
+                WHERE c.Field = ?
+        """
+        params = [category, as_of[0], as_of[1], exam_name, field]
+
+        if budget:
+            query += " AND c.TuitionFee <= ?"
+            params.append(budget)
+
+        query += """
+            )
+            WHERE CutoffScore <= ?
+        """
+        params.append(score)
+        if after is not None:
+            query += " AND (CutoffScore, CollegeID) < (?, ?)"
+            params.extend(after)
+
+        query += " ORDER BY CutoffScore DESC, CollegeID DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return query, params
+
+    def explain_search(self, exam_name: str, field: str, category: str,
+            score: float, budget: Optional[float] = None, year: Optional[int] = None,
+            counselling_round: Optional[int] = None) -> List[str]:
+        """Return the EXPLAIN QUERY PLAN details for a search_colleges call."""
+        query, params = self._build_search_query(exam_name, field, category, score, budget,
+                                                 self._as_of(year, counselling_round))
+        with self.connection() as conn:
+            rows = conn.execute("EXPLAIN QUERY PLAN " + query, params).fetchall()
+        return [row[3] for row in rows]
+
     def search_colleges(self, exam_name: str, field: str, category: str,
-            score: float, budget: Optional[float] = None) -> List[College]:
-        """Search for colleges based on given criteria."""
+            score: float, budget: Optional[float] = None, year: Optional[int] = None,
+            counselling_round: Optional[int] = None) -> List[College]:
+        """Search for colleges based on given criteria.
+
+        By default the current cutoffs are searched. With ``year`` (and
+        optionally ``counselling_round``) each college's cutoff as recorded
+        at that point of its history is used instead.
+        """
+        as_of = self._as_of(year, counselling_round)
+        if self.result_cache is not None or self.cutoff_index is not None:
+            self.check_external_writes()
+        if self.result_cache is None:
+            return self._search_colleges_uncached(exam_name, field, category, score,
+                                                  budget, as_of)
+        key = (exam_name.strip(), field.strip(), category.strip(), float(score),
+               None if budget is None else float(budget), as_of)
+        colleges = self.result_cache.get_or_compute(
+            key, lambda: self._search_colleges_uncached(*key))
+        # Callers may reorder or trim the list; keep the cached copy intact.
+        return list(colleges)
+
+    def _search_colleges_uncached(self, exam_name: str, field: str, category: str,
+            score: float, budget: Optional[float] = None,
+            as_of: Optional[Tuple[int, int]] = None) -> List[College]:
+        if self.cutoff_index is not None and as_of is None:
+            return self.cutoff_index.search(exam_name, field, category, score, budget)
+        return self._search_sql(exam_name, field, category, score, budget, as_of)
+
+    def search_colleges_sql(self, exam_name: str, field: str, category: str,
+            score: float, budget: Optional[float] = None, year: Optional[int] = None,
+            counselling_round: Optional[int] = None) -> List[College]:
+        """Search for colleges with SQL, bypassing any cutoff index."""
+        return self._search_sql(exam_name, field, category, score, budget,
+                                self._as_of(year, counselling_round))
+
+    def _search_rows(self, exam_name: str, field: str, category: str, score: float,
+            budget: Optional[float], as_of: Optional[Tuple[int, int]],
+            after: Optional[Tuple[float, int]] = None, limit: Optional[int] = None) -> List[tuple]:
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            query = """
-                SELECT 
-                    c.CollegeName,
-                    c.Location,
-                    ct.CutoffScore,
-                    c.Field,
-                    c.TuitionFee
-                FROM Colleges c
-                JOIN Cutoffs ct ON c.CollegeID = ct.CollegeID
-                JOIN Exams e ON ct.ExamID = e.ExamID
-                WHERE e.ExamName = ?
-                AND c.Field = ?
-                AND ct.Category = ?
-                AND ct.CutoffScore <= ?
-            """
-            params = [exam_name, field, category, score]
-
-            if budget:
-                query += " AND c.TuitionFee <= ?"
-                params.append(budget)
-
-            query += " ORDER BY ct.CutoffScore DESC"
-
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-
-            colleges = [
-                College(
-                    name=row[0],
-                    location=row[1],
-                    cutoff_score=row[2],
-                    field=row[3],
-                    tuition_fee=row[4]
-                )
-                for row in results
-            ]
+            query, params = self._build_search_query(exam_name, field, category,
+                                                     score, budget, as_of, after, limit)
 
-            conn.close()
-            return colleges
+            with self.connection() as conn:
+                return conn.execute(query, params).fetchall()
+
+        except sqlite3.Error as e:
+            raise Exception(f"Error searching colleges: {e}")
 
+    @staticmethod
+    def _colleges(rows: List[tuple]) -> List[College]:
+        return [
+            College(
+                name=row[0],
+                location=row[1],
+                cutoff_score=row[2],
+                field=row[3],
+                tuition_fee=row[4]
+            )
+            for row in rows
+        ]
+
+    def _search_sql(self, exam_name: str, field: str, category: str, score: float,
+            budget: Optional[float], as_of: Optional[Tuple[int, int]]) -> List[College]:
+        return self._colleges(self._search_rows(exam_name, field, category, score,
+                                                budget, as_of))
+
+    def search_colleges_page(self, exam_name: str, field: str, category: str,
+            score: float, budget: Optional[float] = None,
+            after: Optional[Tuple[float, int]] = None, page_size: int = 100,
+            year: Optional[int] = None, counselling_round: Optional[int] = None) -> SearchPage:
+        """One page of search_colleges results, continuing after a keyset.
+
+        Pass the previous page's ``next_after`` as ``after`` to get the next
+        page. Keyset paging seeks straight to the next row, so late pages
+        cost the same as the first; a single page of ``page_size`` rows is
+        the top-k of the search.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        as_of = self._as_of(year, counselling_round)
+        after = None if after is None else (float(after[0]), int(after[1]))
+        if self.result_cache is not None or self.cutoff_index is not None:
+            self.check_external_writes()
+        if self.result_cache is None:
+            return self._search_page_uncached(exam_name, field, category, score, budget,
+                                              as_of, after, page_size)
+        key = ("page", exam_name.strip(), field.strip(), category.strip(), float(score),
+               None if budget is None else float(budget), as_of, after, page_size)
+        page = self.result_cache.get_or_compute(
+            key, lambda: self._search_page_uncached(*key[1:]))
+        return SearchPage(list(page.colleges), page.next_after)
+
+    def _search_page_uncached(self, exam_name: str, field: str, category: str,
+            score: float, budget: Optional[float], as_of: Optional[Tuple[int, int]],
+            after: Optional[Tuple[float, int]], page_size: int) -> SearchPage:
+        if self.cutoff_index is not None and as_of is None:
+            return self.cutoff_index.search_page(exam_name, field, category, score, budget,
+                                                 after, page_size)
+        # One extra row tells whether another page follows.
+        rows = self._search_rows(exam_name, field, category, score, budget, as_of,
+                                 after, page_size + 1)
+        if len(rows) <= page_size:
+            return SearchPage(self._colleges(rows), None)
+        last = rows[page_size - 1]
+        return SearchPage(self._colleges(rows[:page_size]), (last[2], last[5]))
+
+    def search_colleges_multi(self, scores: Dict[str, float], field: str,
+            categories: Iterable[str], budget: Optional[float] = None,
+            limit: Optional[int] = None) -> List[CollegeOption]:
+        """Search with several exam scores and eligible categories at once.
+
+        ``scores`` maps exam names to the student's score in each. Every
+        college in the field that any (exam, category) admits appears once,
+        with the option that clears its cutoff by the largest margin.
+        Colleges are ranked by that margin, smallest first, which for a
+        single exam is the usual highest-cutoff-first order. ``limit``
+        keeps only the first rows.
+        """
+        if limit is not None and limit < 0:
+            raise ValueError("limit cannot be negative")
+        scores = {exam: float(score) for exam, score in sorted(scores.items())}
+        categories = sorted(set(categories))
+        if not scores or not categories or limit == 0:
+            return []
+        if self.result_cache is not None or self.cutoff_index is not None:
+            self.check_external_writes()
+        if self.result_cache is None:
+            return self._search_multi_uncached(scores, field, categories, budget, limit)
+        key = ("multi", tuple(scores.items()), field.strip(), tuple(categories),
+               None if budget is None else float(budget), limit)
+        options = self.result_cache.get_or_compute(
+            key, lambda: self._search_multi_uncached(scores, field, categories, budget, limit))
+        return list(options)
+
+    def _search_multi_uncached(self, scores: Dict[str, float], field: str,
+            categories: List[str], budget: Optional[float],
+            limit: Optional[int]) -> List[CollegeOption]:
+        if self.cutoff_index is not None:
+            return self.cutoff_index.search_multi(scores, field, categories, budget, limit)
+        query = _multi_exam_query(len(scores), len(categories), bool(budget), limit is not None)
+        params = [value for item in scores.items() for value in item]
+        params += categories
+        params.append(field)
+        if budget:
+            params.append(budget)
+        if limit is not None:
+            params.append(limit)
+        try:
+            with self.connection() as conn:
+                rows = conn.execute(query, params).fetchall()
         except sqlite3.Error as e:
             raise Exception(f"Error searching colleges: {e}")
+        return [CollegeOption._make(row) for row in rows]
+
+    def iter_search_colleges(self, exam_name: str, field: str, category: str,
+            score: float, budget: Optional[float] = None, page_size: int = 100,
+            limit: Optional[int] = None, year: Optional[int] = None,
+            counselling_round: Optional[int] = None) -> Iterator[List[College]]:
+        """Yield search_colleges results a page at a time, stopping after ``limit`` rows."""
+        after = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            page = self.search_colleges_page(exam_name, field, category, score, budget,
+                                             after, size, year, counselling_round)
+            if page.colleges:
+                yield page.colleges
+            if page.next_after is None:
+                return
+            after = page.next_after
+            if remaining is not None:
+                remaining -= len(page.colleges)
 
 
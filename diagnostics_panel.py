@@ -0,0 +1,100 @@
+"""A small window showing the query stats collected by a DatabaseManager."""
+import tkinter as tk
+from tkinter import filedialog, messagebox
+import ttkbootstrap as ttk
+
+from query_stats import QueryStats, stats_from_env
+
+REFRESH_MS = 2000
+COLUMNS = [
+    ("calls", "Calls", 60),
+    ("rows", "Rows", 80),
+    ("mean_ms", "Mean ms", 80),
+    ("p95_ms", "p95 ms", 80),
+    ("max_ms", "Max ms", 80),
+    ("total_ms", "Total ms", 90),
+]
+
+
+def install_diagnostics(root, db_manager):
+    """Collect query stats if CAREER_COUNCIL_QUERY_STATS is set; Ctrl+Shift+D shows them."""
+    query_stats = stats_from_env()
+    if query_stats is None:
+        return None
+    db_manager.enable_query_stats(query_stats=query_stats)
+    root.bind('<Control-D>', lambda e: DiagnosticsPanel(root, query_stats))
+    return query_stats
+
+
+class DiagnosticsPanel:
+    def __init__(self, parent, query_stats: QueryStats):
+        self.query_stats = query_stats
+        self.window = ttk.Toplevel(parent)
+        self.window.title("Query Diagnostics")
+        self.window.geometry("900x600")
+
+        container = ttk.Frame(self.window, padding="10")
+        container.pack(fill=tk.BOTH, expand=True)
+
+        buttons = ttk.Frame(container)
+        buttons.pack(fill=tk.X, pady=(0, 10))
+        self.summary_var = tk.StringVar()
+        ttk.Label(buttons, textvariable=self.summary_var).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Export JSON", command=self.export,
+                   style="primary.TButton").pack(side=tk.RIGHT, padx=5)
+        ttk.Button(buttons, text="Reset", command=self.reset,
+                   style="secondary.TButton").pack(side=tk.RIGHT)
+
+        self.statements = ttk.Treeview(container, columns=[c[0] for c in COLUMNS], height=12)
+        self.statements.heading("#0", text="Statement")
+        self.statements.column("#0", width=380)
+        for key, title, width in COLUMNS:
+            self.statements.heading(key, text=title)
+            self.statements.column(key, width=width, anchor=tk.E)
+        self.statements.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(container, text=f"Slow queries (over {query_stats.slow_ms:g} ms)",
+                  font=("Helvetica", 11, "bold")).pack(anchor=tk.W, pady=(10, 5))
+        self.slow = tk.Text(container, height=10, wrap=tk.WORD)
+        self.slow.pack(fill=tk.BOTH, expand=True)
+
+        self.refresh()
+
+    def refresh(self):
+        """Redraw now and again every few seconds while the window is open."""
+        if not self.window.winfo_exists():
+            return
+        self.show()
+        self.window.after(REFRESH_MS, self.refresh)
+
+    def show(self):
+        snapshot = self.query_stats.snapshot()
+        self.statements.delete(*self.statements.get_children())
+        for statement in snapshot["statements"]:
+            self.statements.insert("", tk.END, text=statement["sql"],
+                                   values=[statement[key] for key, _, _ in COLUMNS])
+        calls = sum(s["calls"] for s in snapshot["statements"])
+        self.summary_var.set(f"{len(snapshot['statements'])} statements, "
+                             f"{calls} calls since {snapshot['since']}")
+
+        self.slow.delete("1.0", tk.END)
+        for query in reversed(snapshot["slow_queries"]):
+            self.slow.insert(tk.END, f"{query['at']}  {query['ms']:.1f} ms  "
+                                     f"{query['rows']} rows\n{query['sql']}\n")
+            for step in query["plan"] or []:
+                self.slow.insert(tk.END, f"    {step}\n")
+            self.slow.insert(tk.END, "\n")
+
+    def reset(self):
+        self.query_stats.reset()
+        self.show()
+
+    def export(self):
+        path = filedialog.asksaveasfilename(parent=self.window, defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            self.query_stats.dump(path)
+        except OSError as e:
+            messagebox.showerror("Export Error", f"Error writing {path}: {e}", parent=self.window)
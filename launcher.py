@@ -5,8 +5,15 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
 from PyQt6.QtCore import Qt, QSize, QTimer
 from PyQt6.QtGui import (QPainter, QColor, QPainterPath, QLinearGradient,
                          QIcon, QFont, QPalette)
-import subprocess
-import secrets
+import threading
+
+from startup_profile import mark_click
+
+DB_PATH = 'career_counseling.db'
+APP_MODULES = {
+    "admin": ("college_manager", "CollegeManagerGUI"),
+    "user": ("college_recommender", "CollegeRecommenderGUI"),
+}
 
 
 class LogoWidget(QWidget):
@@ -188,10 +195,39 @@ class StyleSheet:
     """
 
 
-class ModernLoginApp(QMainWindow):
+class Prewarmer:
+    """Import the Tk apps and open the database while the login screen is up."""
+
     def __init__(self):
+        self.db_manager = None
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            import college_manager
+            import college_recommender
+            from database_operations import DatabaseManager
+            self.db_manager = DatabaseManager(DB_PATH)
+        except Exception as e:
+            self.error = e
+
+    def wait(self):
+        """Block until warm-up finishes and return the database manager, if any."""
+        self._thread.join()
+        return self.db_manager
+
+
+class ModernLoginApp(QMainWindow):
+    def __init__(self, in_process=True):
         super().__init__()
         self.login_password = "admin123"  # In production, use proper security
+        # In-process mode hands over to a Tk app in this interpreter once the
+        # Qt event loop has exited, instead of starting a new Python process.
+        self.in_process = in_process
+        self.pending_app = None
+        self.prewarmer = Prewarmer() if in_process else None
         self.init_ui()
 
     def init_ui(self):
@@ -327,14 +363,24 @@ class ModernLoginApp(QMainWindow):
             self.password_widget.setFocus()
 
     def open_admin(self):
-        token = secrets.token_hex(16)
-        self.close()
-        subprocess.run(["python", "college_manager.py", token])
+        self.launch("admin")
 
     def open_user(self):
+        self.launch("user")
+
+    def launch(self, app_name):
+        mark_click()
+        if self.in_process:
+            # Closing the last window ends app.exec(); main() takes over.
+            self.pending_app = app_name
+            self.close()
+            return
+        # Only the subprocess path needs these; keep them off the startup path.
+        import secrets
+        import subprocess
         token = secrets.token_hex(16)
         self.close()
-        subprocess.run(["python", "college_recommender.py", token])
+        subprocess.run(["python", f"{APP_MODULES[app_name][0]}.py", token])
 
     def center_window(self):
         frame_geometry = self.frameGeometry()
@@ -355,9 +401,25 @@ def main():
     except:
         pass
 
-    window = ModernLoginApp()
+    window = ModernLoginApp(in_process="--subprocess" not in sys.argv)
     window.show()
-    sys.exit(app.exec())
+    status = app.exec()
+    if window.pending_app is None:
+        if window.prewarmer is not None and window.prewarmer.wait() is not None:
+            window.prewarmer.db_manager.close()
+        sys.exit(status)
+    run_in_process(window.pending_app, window.prewarmer)
+
+
+def run_in_process(app_name, prewarmer):
+    """Run a Tk app in this process, reusing the warmed-up modules and database."""
+    db_manager = prewarmer.wait()
+    if prewarmer.error is not None:
+        print(f"Warm-up failed, starting normally: {prewarmer.error}", file=sys.stderr)
+    module_name, class_name = APP_MODULES[app_name]
+    module = __import__(module_name)
+    gui = getattr(module, class_name)(db_manager=db_manager)
+    gui.run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,459 @@
+"""Versioned schema migrations for the career counseling database.
+
+Each migration has a version number and runs exactly once per database. The
+versions already applied are recorded in the SchemaVersion table, so opening
+an up-to-date database costs a single read. Pending migrations are applied
+together in one transaction: either all of them land or none do.
+
+To change the schema, append a new migration to MIGRATIONS; never edit one
+that has already shipped.
+"""
+import sqlite3
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS SchemaVersion (
+        Version INTEGER PRIMARY KEY,
+        Name TEXT NOT NULL,
+        AppliedAt TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+BASE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS Exams (
+        ExamID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ExamName TEXT UNIQUE NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS Colleges (
+        CollegeID INTEGER PRIMARY KEY AUTOINCREMENT,
+        CollegeName TEXT NOT NULL,
+        Location TEXT NOT NULL,
+        Field TEXT NOT NULL,
+        TuitionFee REAL NOT NULL,
+        UNIQUE(CollegeName, Location)
+    )""",
+    """CREATE TABLE IF NOT EXISTS Cutoffs (
+        CollegeID INTEGER,
+        ExamID INTEGER,
+        Category TEXT NOT NULL,
+        CutoffScore REAL NOT NULL,
+        FOREIGN KEY (CollegeID) REFERENCES Colleges(CollegeID),
+        FOREIGN KEY (ExamID) REFERENCES Exams(ExamID),
+        UNIQUE(CollegeID, ExamID, Category)
+    )""",
+]
+
+DEFAULT_EXAMS = ["JEE Main", "JEE Advanced", "NEET", "BITSAT"]
+
+# Indexes tailored to the search_colleges join. The Cutoffs index lets SQLite
+# range-scan CutoffScore for one (exam, category) in descending order, so the
+# ORDER BY needs no temporary B-tree and the scan never touches the table.
+SEARCH_INDEXES = [
+    """CREATE INDEX IF NOT EXISTS idx_cutoffs_exam_category_score
+       ON Cutoffs(ExamID, Category, CutoffScore, CollegeID)""",
+    """CREATE INDEX IF NOT EXISTS idx_colleges_field_fee
+       ON Colleges(Field, TuitionFee)""",
+]
+
+# Trigram full-text index over the admin-searchable Colleges columns. It is an
+# external-content table kept in sync by triggers, so it stores no extra copy.
+COLLEGE_SEARCH_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS CollegeSearch USING fts5(
+        CollegeName, Location, Field,
+        content='Colleges', content_rowid='CollegeID', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS colleges_search_insert AFTER INSERT ON Colleges BEGIN
+        INSERT INTO CollegeSearch(rowid, CollegeName, Location, Field)
+        VALUES (new.CollegeID, new.CollegeName, new.Location, new.Field);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS colleges_search_delete AFTER DELETE ON Colleges BEGIN
+        INSERT INTO CollegeSearch(CollegeSearch, rowid, CollegeName, Location, Field)
+        VALUES ('delete', old.CollegeID, old.CollegeName, old.Location, old.Field);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS colleges_search_update AFTER UPDATE ON Colleges BEGIN
+        INSERT INTO CollegeSearch(CollegeSearch, rowid, CollegeName, Location, Field)
+        VALUES ('delete', old.CollegeID, old.CollegeName, old.Location, old.Field);
+        INSERT INTO CollegeSearch(rowid, CollegeName, Location, Field)
+        VALUES (new.CollegeID, new.CollegeName, new.Location, new.Field);
+    END""",
+    "INSERT INTO CollegeSearch(CollegeSearch) VALUES ('rebuild')",
+]
+
+# The Cutoffs join, denormalised and clustered by (exam, field, category,
+# score). The recommendations for a score are a range of one group, so a
+# search is a primary-key range scan with no join. Triggers keep it in step
+# with every write to Exams, Colleges and Cutoffs, including other processes'.
+_RANKING_ROWS = """
+    SELECT e.ExamName, c.Field, ct.Category, ct.CutoffScore,
+           c.CollegeID, c.CollegeName, c.Location, c.TuitionFee
+    FROM Colleges c
+    JOIN Cutoffs ct ON c.CollegeID = ct.CollegeID
+    JOIN Exams e ON ct.ExamID = e.ExamID
+"""
+
+CUTOFF_RANKING_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS CutoffRanking (
+        ExamName TEXT NOT NULL,
+        Field TEXT NOT NULL,
+        Category TEXT NOT NULL,
+        CutoffScore REAL NOT NULL,
+        CollegeID INTEGER NOT NULL,
+        CollegeName TEXT NOT NULL,
+        Location TEXT NOT NULL,
+        TuitionFee REAL NOT NULL,
+        PRIMARY KEY (ExamName, Field, Category, CutoffScore, CollegeID)
+    ) WITHOUT ROWID""",
+    """CREATE INDEX IF NOT EXISTS idx_cutoff_ranking_college
+       ON CutoffRanking(CollegeID)""",
+    f"""CREATE TRIGGER IF NOT EXISTS cutoffs_ranking_insert AFTER INSERT ON Cutoffs BEGIN
+        INSERT INTO CutoffRanking {_RANKING_ROWS}
+        WHERE ct.rowid = new.rowid;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS cutoffs_ranking_delete AFTER DELETE ON Cutoffs BEGIN
+        DELETE FROM CutoffRanking
+        WHERE CollegeID = old.CollegeID AND Category = old.Category
+        AND ExamName = (SELECT ExamName FROM Exams WHERE ExamID = old.ExamID);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS cutoffs_ranking_update AFTER UPDATE ON Cutoffs
+    WHEN old.CollegeID IS NOT new.CollegeID OR old.ExamID IS NOT new.ExamID
+      OR old.Category IS NOT new.Category OR old.CutoffScore IS NOT new.CutoffScore
+    BEGIN
+        DELETE FROM CutoffRanking
+        WHERE CollegeID = old.CollegeID AND Category = old.Category
+        AND ExamName = (SELECT ExamName FROM Exams WHERE ExamID = old.ExamID);
+        INSERT INTO CutoffRanking {_RANKING_ROWS}
+        WHERE ct.rowid = new.rowid;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS colleges_ranking_insert AFTER INSERT ON Colleges BEGIN
+        INSERT INTO CutoffRanking {_RANKING_ROWS}
+        WHERE c.CollegeID = new.CollegeID;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS colleges_ranking_update AFTER UPDATE ON Colleges
+    WHEN old.CollegeID IS NOT new.CollegeID OR old.CollegeName IS NOT new.CollegeName
+      OR old.Location IS NOT new.Location OR old.Field IS NOT new.Field
+      OR old.TuitionFee IS NOT new.TuitionFee
+    BEGIN
+        UPDATE CutoffRanking
+        SET CollegeID = new.CollegeID, CollegeName = new.CollegeName,
+            Location = new.Location, Field = new.Field, TuitionFee = new.TuitionFee
+        WHERE CollegeID = old.CollegeID;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS colleges_ranking_delete AFTER DELETE ON Colleges BEGIN
+        DELETE FROM CutoffRanking WHERE CollegeID = old.CollegeID;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS exams_ranking_update AFTER UPDATE OF ExamName ON Exams BEGIN
+        UPDATE CutoffRanking SET ExamName = new.ExamName WHERE ExamName = old.ExamName;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS exams_ranking_delete AFTER DELETE ON Exams BEGIN
+        DELETE FROM CutoffRanking WHERE ExamName = old.ExamName;
+    END""",
+]
+
+
+# Multi-year cutoffs. Cutoffs keeps the current score that searches use;
+# every write to it is also recorded in CutoffHistory under the admission
+# session (year and counselling round) currently open, so updates no longer
+# erase earlier years. Past years can be loaded into CutoffHistory directly.
+ADMISSION_SESSION_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS AdmissionSession (
+        SessionID INTEGER PRIMARY KEY CHECK (SessionID = 1),
+        Year INTEGER NOT NULL,
+        Round INTEGER NOT NULL DEFAULT 1 CHECK (Round BETWEEN 1 AND 99)
+    )
+"""
+
+# CutoffTrend summarises each (exam, category, college) history using the
+# final round of every year: first and last values, drift (last minus first)
+# and the least-squares slope per year, kept as running sums. Recording a new
+# year or a later round is an O(1) update; writes out of order rebuild the
+# key from its few dozen CutoffHistory rows. Closed-out rows (a NULL score)
+# are left out of the summary.
+_TREND_COLUMN_LIST = """(ExamID, Category, CollegeID, FirstYear, FirstScore,
+    LastYear, LastRound, LastScore, Years, SumX, SumY, SumXY, SumXX)"""
+_TREND_COLUMNS = "CutoffTrend " + _TREND_COLUMN_LIST
+
+_TREND_ROWS = """
+    SELECT ExamID, Category, CollegeID,
+           MIN(Year),
+           (SELECT h.CutoffScore FROM CutoffHistory h
+            WHERE h.ExamID = y.ExamID AND h.Category = y.Category AND h.CollegeID = y.CollegeID
+              AND h.CutoffScore IS NOT NULL
+            ORDER BY h.Year, h.Round DESC LIMIT 1),
+           MAX(Year),
+           (SELECT h.Round FROM CutoffHistory h
+            WHERE h.ExamID = y.ExamID AND h.Category = y.Category AND h.CollegeID = y.CollegeID
+              AND h.CutoffScore IS NOT NULL
+            ORDER BY h.Year DESC, h.Round DESC LIMIT 1),
+           (SELECT h.CutoffScore FROM CutoffHistory h
+            WHERE h.ExamID = y.ExamID AND h.Category = y.Category AND h.CollegeID = y.CollegeID
+              AND h.CutoffScore IS NOT NULL
+            ORDER BY h.Year DESC, h.Round DESC LIMIT 1),
+           COUNT(*), SUM(Year), SUM(CutoffScore), SUM(Year * CutoffScore), SUM(Year * Year)
+    FROM (
+        SELECT ExamID, Category, CollegeID, Year, CutoffScore, MAX(Round)
+        FROM CutoffHistory WHERE CutoffScore IS NOT NULL {where}
+        GROUP BY ExamID, Category, CollegeID, Year
+    ) y
+    GROUP BY ExamID, Category, CollegeID
+"""
+
+
+# Upsert conditions: the inserted row is a newer year, or the same or a later
+# round of the last year recorded.
+_APPEND = "(excluded.LastYear > LastYear)"
+_REPLACE = "(excluded.LastYear = LastYear AND excluded.LastRound >= LastRound)"
+
+
+def _trend_key(row: str) -> str:
+    return (f"ExamID = {row}.ExamID AND Category = {row}.Category "
+            f"AND CollegeID = {row}.CollegeID")
+
+
+def _rebuild_trend(row: str) -> str:
+    """Trigger statements that recompute the CutoffTrend row of ``row`` (old or new)."""
+    return f"""
+        DELETE FROM CutoffTrend WHERE {_trend_key(row)};
+        INSERT INTO {_TREND_COLUMNS} {_TREND_ROWS.format(where="AND " + _trend_key(row))};"""
+
+
+# A newer year is appended to the sums and a later round of the last year
+# replaces its value, in one upsert that also starts a key's first row.
+# An older year leaves the row as it is and then rebuilds the key.
+HISTORY_TREND_INSERT = f"""CREATE TRIGGER IF NOT EXISTS history_trend_insert AFTER INSERT ON CutoffHistory
+WHEN new.CutoffScore IS NOT NULL
+BEGIN
+    INSERT INTO {_TREND_COLUMNS}
+    VALUES (new.ExamID, new.Category, new.CollegeID, new.Year, new.CutoffScore,
+            new.Year, new.Round, new.CutoffScore, 1, new.Year, new.CutoffScore,
+            new.Year * new.CutoffScore, new.Year * new.Year)
+    ON CONFLICT (ExamID, Category, CollegeID) DO UPDATE SET
+        Years = Years + ({_APPEND}),
+        SumX = SumX + CASE WHEN {_APPEND} THEN excluded.SumX ELSE 0 END,
+        SumXX = SumXX + CASE WHEN {_APPEND} THEN excluded.SumXX ELSE 0 END,
+        SumY = CASE WHEN {_APPEND} THEN SumY + excluded.SumY
+                    WHEN {_REPLACE} THEN SumY + excluded.SumY - LastScore
+                    ELSE SumY END,
+        SumXY = CASE WHEN {_APPEND} THEN SumXY + excluded.SumXY
+                     WHEN {_REPLACE} THEN SumXY + excluded.LastYear * (excluded.SumY - LastScore)
+                     ELSE SumXY END,
+        FirstScore = CASE WHEN {_REPLACE} AND FirstYear = excluded.LastYear
+                          THEN excluded.FirstScore ELSE FirstScore END,
+        LastYear = CASE WHEN {_APPEND} OR {_REPLACE} THEN excluded.LastYear ELSE LastYear END,
+        LastRound = CASE WHEN {_APPEND} OR {_REPLACE} THEN excluded.LastRound ELSE LastRound END,
+        LastScore = CASE WHEN {_APPEND} OR {_REPLACE} THEN excluded.LastScore ELSE LastScore END;
+    UPDATE CutoffTrend
+    SET {_TREND_COLUMN_LIST} = (
+        {_TREND_ROWS.format(where="AND " + _trend_key("CutoffTrend"))})
+    WHERE {_trend_key("new")} AND new.Year < LastYear;
+END"""
+
+CUTOFF_HISTORY_SCHEMA = [
+    ADMISSION_SESSION_SCHEMA,
+    """CREATE TABLE IF NOT EXISTS CutoffHistory (
+        ExamID INTEGER NOT NULL,
+        Category TEXT NOT NULL,
+        CollegeID INTEGER NOT NULL,
+        Year INTEGER NOT NULL,
+        Round INTEGER NOT NULL DEFAULT 1 CHECK (Round BETWEEN 1 AND 99),
+        -- NULL closes out a cutoff removed in this session, so as-of
+        -- searches stop carrying its earlier value forward.
+        CutoffScore REAL,
+        PRIMARY KEY (ExamID, Category, CollegeID, Year, Round)
+    ) WITHOUT ROWID""",
+    """CREATE INDEX IF NOT EXISTS idx_cutoff_history_college
+       ON CutoffHistory(CollegeID)""",
+    """CREATE TABLE IF NOT EXISTS CutoffTrend (
+        ExamID INTEGER NOT NULL,
+        Category TEXT NOT NULL,
+        CollegeID INTEGER NOT NULL,
+        FirstYear INTEGER NOT NULL,
+        FirstScore REAL NOT NULL,
+        LastYear INTEGER NOT NULL,
+        LastRound INTEGER NOT NULL,
+        LastScore REAL NOT NULL,
+        Years INTEGER NOT NULL,
+        SumX REAL NOT NULL,
+        SumY REAL NOT NULL,
+        SumXY REAL NOT NULL,
+        SumXX REAL NOT NULL,
+        Drift REAL GENERATED ALWAYS AS (LastScore - FirstScore) STORED,
+        Slope REAL GENERATED ALWAYS AS (
+            (Years * SumXY - SumX * SumY) / NULLIF(Years * SumXX - SumX * SumX, 0)) VIRTUAL,
+        PRIMARY KEY (ExamID, Category, CollegeID)
+    ) WITHOUT ROWID""",
+    """CREATE INDEX IF NOT EXISTS idx_cutoff_trend_drift
+       ON CutoffTrend(ExamID, Category, Drift)""",
+    """CREATE INDEX IF NOT EXISTS idx_cutoff_trend_college
+       ON CutoffTrend(CollegeID)""",
+    # An upsert's own conflict policy overrides OR REPLACE inside a trigger,
+    # so the history rows are written with an explicit ON CONFLICT clause.
+    """CREATE TRIGGER IF NOT EXISTS cutoffs_history_insert AFTER INSERT ON Cutoffs BEGIN
+        INSERT INTO CutoffHistory
+            (ExamID, Category, CollegeID, Year, Round, CutoffScore)
+        SELECT new.ExamID, new.Category, new.CollegeID, Year, Round, new.CutoffScore
+        FROM AdmissionSession WHERE true
+        ON CONFLICT(ExamID, Category, CollegeID, Year, Round) DO UPDATE SET
+            CutoffScore = excluded.CutoffScore;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS cutoffs_history_update AFTER UPDATE ON Cutoffs
+    WHEN old.CollegeID IS NOT new.CollegeID OR old.ExamID IS NOT new.ExamID
+      OR old.Category IS NOT new.Category OR old.CutoffScore IS NOT new.CutoffScore
+    BEGIN
+        INSERT INTO CutoffHistory
+            (ExamID, Category, CollegeID, Year, Round, CutoffScore)
+        SELECT new.ExamID, new.Category, new.CollegeID, Year, Round, new.CutoffScore
+        FROM AdmissionSession WHERE true
+        ON CONFLICT(ExamID, Category, CollegeID, Year, Round) DO UPDATE SET
+            CutoffScore = excluded.CutoffScore;
+    END""",
+    # A removed cutoff drops its current-session row and, if earlier sessions
+    # recorded it, is closed out so they are not carried forward. Re-adding
+    # it in the same session overwrites the closing row.
+    """CREATE TRIGGER IF NOT EXISTS cutoffs_history_delete AFTER DELETE ON Cutoffs BEGIN
+        DELETE FROM CutoffHistory
+        WHERE ExamID = old.ExamID AND Category = old.Category AND CollegeID = old.CollegeID
+          AND (Year, Round) = (SELECT Year, Round FROM AdmissionSession);
+        INSERT INTO CutoffHistory (ExamID, Category, CollegeID, Year, Round, CutoffScore)
+        SELECT old.ExamID, old.Category, old.CollegeID, s.Year, s.Round, NULL
+        FROM AdmissionSession s
+        WHERE EXISTS (
+            SELECT 1 FROM CutoffHistory h
+            WHERE h.ExamID = old.ExamID AND h.Category = old.Category
+              AND h.CollegeID = old.CollegeID AND (h.Year, h.Round) < (s.Year, s.Round));
+    END""",
+    # Trend rows go first, so deleting the history rows skips rebuilding them.
+    """CREATE TRIGGER IF NOT EXISTS colleges_history_delete AFTER DELETE ON Colleges BEGIN
+        DELETE FROM CutoffTrend WHERE CollegeID = old.CollegeID;
+        DELETE FROM CutoffHistory WHERE CollegeID = old.CollegeID;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS exams_history_delete AFTER DELETE ON Exams BEGIN
+        DELETE FROM CutoffTrend WHERE ExamID = old.ExamID;
+        DELETE FROM CutoffHistory WHERE ExamID = old.ExamID;
+    END""",
+    HISTORY_TREND_INSERT,
+    f"""CREATE TRIGGER IF NOT EXISTS history_trend_update AFTER UPDATE ON CutoffHistory BEGIN
+        {_rebuild_trend("old")}
+        {_rebuild_trend("new")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS history_trend_delete AFTER DELETE ON CutoffHistory
+    WHEN EXISTS (SELECT 1 FROM CutoffTrend WHERE {_trend_key("old")})
+    BEGIN
+        {_rebuild_trend("old")}
+    END""",
+]
+
+
+def _create_base_schema(conn: sqlite3.Connection):
+    for statement in BASE_SCHEMA:
+        conn.execute(statement)
+    if conn.execute("SELECT COUNT(*) FROM Exams").fetchone()[0] == 0:
+        conn.executemany("INSERT INTO Exams (ExamName) VALUES (?)",
+                         [(name,) for name in DEFAULT_EXAMS])
+
+
+def _create_search_indexes(conn: sqlite3.Connection):
+    for statement in SEARCH_INDEXES:
+        conn.execute(statement)
+
+
+def _create_college_search(conn: sqlite3.Connection):
+    """Create the trigram search index if this SQLite build supports it.
+
+    Builds without FTS5 or the trigram tokenizer skip it, and admin search
+    falls back to LIKE scans.
+    """
+    conn.execute("SAVEPOINT college_search")
+    try:
+        for statement in COLLEGE_SEARCH_SCHEMA:
+            conn.execute(statement)
+    except sqlite3.OperationalError:
+        conn.execute("ROLLBACK TO college_search")
+    conn.execute("RELEASE college_search")
+
+
+def _create_cutoff_ranking(conn: sqlite3.Connection):
+    for statement in CUTOFF_RANKING_SCHEMA:
+        conn.execute(statement)
+    conn.execute("DELETE FROM CutoffRanking")
+    conn.execute("INSERT INTO CutoffRanking " + _RANKING_ROWS)
+
+
+def _create_cutoff_history(conn: sqlite3.Connection):
+    """Create the history tables and record the existing cutoffs under this year."""
+    for statement in CUTOFF_HISTORY_SCHEMA:
+        conn.execute(statement)
+    conn.execute("""INSERT OR IGNORE INTO AdmissionSession (SessionID, Year, Round)
+                    VALUES (1, CAST(strftime('%Y', 'now', 'localtime') AS INTEGER), 1)""")
+    with deferred_trends(conn):
+        conn.execute("""INSERT OR IGNORE INTO CutoffHistory
+                            (ExamID, Category, CollegeID, Year, Round, CutoffScore)
+                        SELECT ct.ExamID, ct.Category, ct.CollegeID, s.Year, s.Round,
+                               ct.CutoffScore
+                        FROM Cutoffs ct, AdmissionSession s""")
+
+
+def rebuild_cutoff_trends(conn: sqlite3.Connection):
+    """Recompute every CutoffTrend row from CutoffHistory in one pass."""
+    conn.execute("DELETE FROM CutoffTrend")
+    conn.execute(f"INSERT INTO {_TREND_COLUMNS} {_TREND_ROWS.format(where='')}")
+
+
+@contextmanager
+def deferred_trends(conn: sqlite3.Connection):
+    """Skip per-row trend upkeep for a bulk CutoffHistory load, then rebuild once.
+
+    Must run inside a write transaction, so no other connection ever sees
+    the trigger missing.
+    """
+    if not conn.in_transaction:
+        raise sqlite3.ProgrammingError("deferred_trends needs an open transaction")
+    conn.execute("DROP TRIGGER IF EXISTS history_trend_insert")
+    yield
+    rebuild_cutoff_trends(conn)
+    conn.execute(HISTORY_TREND_INSERT)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "base schema", _create_base_schema),
+    (2, "search indexes", _create_search_indexes),
+    (3, "college search", _create_college_search),
+    (4, "cutoff ranking", _create_cutoff_ranking),
+    (5, "cutoff history", _create_cutoff_history),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Return the newest migration applied to a database, or 0 for none."""
+    try:
+        return conn.execute("SELECT MAX(Version) FROM SchemaVersion").fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        return 0
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations atomically and return how many were applied."""
+    if schema_version(conn) >= LATEST_VERSION:
+        return 0
+
+    # Take the write lock first so two processes starting together do not
+    # both migrate; the second one re-reads the version and finds it current.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(SCHEMA_VERSION_TABLE)
+        current = schema_version(conn)
+        applied = 0
+        for version, name, apply in MIGRATIONS:
+            if version <= current:
+                continue
+            apply(conn)
+            conn.execute("INSERT INTO SchemaVersion (Version, Name) VALUES (?, ?)",
+                         (version, name))
+            applied += 1
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return applied
@@ -0,0 +1,87 @@
+"""Bounded LRU cache for query results.
+
+Entries expire after a time-to-live. Writes bump a data version, which
+drops every entry and keeps results of queries that were running during
+the write from being stored. DatabaseManager bumps it for its own writes and
+when SQLite's PRAGMA data_version shows another process committed; the TTL
+is a backstop.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class QueryCache:
+    """Thread-safe LRU cache with a size limit, a TTL and a data version."""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0,
+            clock: Callable[[], float] = time.monotonic):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.data_version = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+        # key -> (stored at, value), least recently used first
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing and storing it on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.clock() - stored_at > self.ttl:
+                    del self._entries[key]
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            version = self.data_version
+
+        # Compute outside the lock so one slow query does not block other lookups.
+        value = compute()
+
+        with self._lock:
+            # A write that happened while computing makes this result stale.
+            if version == self.data_version:
+                self._entries[key] = (self.clock(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def bump_version(self):
+        """Invalidate every cached entry after the underlying data changed."""
+        with self._lock:
+            self.data_version += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Counters for monitoring how well the cache is doing."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "data_version": self.data_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,283 @@
+"""Per-statement timing for SQLite queries.
+
+DatabaseManager.enable_query_stats() makes the pool open connections of the
+instrumented classes below. Every statement run on them is timed from
+execute until its last row is fetched, and its rows are counted. Statements
+slower than a threshold are logged and kept in a slow-query list, optionally
+with their EXPLAIN QUERY PLAN.
+
+Set CAREER_COUNCIL_QUERY_STATS=1 (or a slow-query threshold in ms) before
+starting a GUI to collect stats there; Ctrl+Shift+D opens the diagnostics
+panel.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, List, Optional
+
+QUERY_STATS_ENV = "CAREER_COUNCIL_QUERY_STATS"
+
+# Upper bounds, in milliseconds, of the latency histogram buckets. A final
+# bucket catches everything slower.
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace so one statement always gets the same key."""
+    return " ".join(sql.split())
+
+
+class StatementStats:
+    """Counters and a latency histogram for one SQL statement."""
+
+    __slots__ = ("calls", "errors", "rows", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, seconds: float, rows: int, error: bool):
+        ms = seconds * 1000
+        self.calls += 1
+        self.errors += error
+        self.rows += rows
+        self.total += ms
+        self.min = min(self.min, ms)
+        self.max = max(self.max, ms)
+        self.buckets[bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+
+    def percentile(self, q: float) -> float:
+        """Approximate percentile: the upper bound of the bucket it falls in."""
+        wanted = q * self.calls
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS_MS, self.buckets):
+            seen += count
+            if seen >= wanted:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.total, 3),
+            "mean_ms": round(self.total / self.calls, 4) if self.calls else 0.0,
+            "min_ms": round(self.min, 4) if self.calls else 0.0,
+            "p50_ms": round(self.percentile(0.50), 4),
+            "p95_ms": round(self.percentile(0.95), 4),
+            "max_ms": round(self.max, 4),
+            "histogram": {f"<={bound}": count for bound, count
+                          in zip(BUCKET_BOUNDS_MS + ("inf",), self.buckets) if count},
+        }
+
+
+class QueryStats:
+    """Thread-safe collector of statement timings and slow queries."""
+
+    def __init__(self, slow_ms: float = 100.0, explain_slow: bool = False,
+            max_slow_queries: int = 100):
+        self.slow_ms = slow_ms
+        self.explain_slow = explain_slow
+        self.started = time.time()
+        self._statements = {}
+        self._slow = deque(maxlen=max_slow_queries)
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, seconds: float, rows: int, error: bool = False,
+            params=None, explain: Optional[Callable[[], List[str]]] = None):
+        """Add one statement execution; ``explain`` is only called for slow queries."""
+        key = normalize_sql(sql)
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = StatementStats()
+            stats.add(seconds, rows, error)
+        ms = seconds * 1000
+        if ms < self.slow_ms:
+            return
+        logger.warning(f"Slow query ({ms:.1f} ms, {rows} rows): {key}")
+        plan = explain() if self.explain_slow and explain is not None else None
+        with self._lock:
+            self._slow.append({
+                "sql": key,
+                "ms": round(ms, 3),
+                "rows": rows,
+                "params": repr(params)[:200] if params else None,
+                "plan": plan,
+                "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            })
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._slow.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> dict:
+        """Everything collected so far, with the slowest statements first."""
+        with self._lock:
+            statements = sorted(((sql, stats.snapshot()) for sql, stats
+                                 in self._statements.items()),
+                                key=lambda item: -item[1]["total_ms"])
+            slow = list(self._slow)
+        return {
+            "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "slow_ms": self.slow_ms,
+            "statements": [dict(sql=sql, **stats) for sql, stats in statements],
+            "slow_queries": slow,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def dump(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json() + "\n")
+
+
+def stats_from_env() -> Optional[QueryStats]:
+    """A collector configured by CAREER_COUNCIL_QUERY_STATS, or None if it is unset."""
+    value = os.environ.get(QUERY_STATS_ENV, "").strip()
+    if not value:
+        return None
+    try:
+        slow_ms = 100.0 if value.lower() in ("1", "true", "yes", "on") else float(value)
+    except ValueError:
+        slow_ms = 100.0
+    return QueryStats(slow_ms=slow_ms, explain_slow=True)
+
+
+def _is_query(sql: str) -> bool:
+    return sql.lstrip().upper().startswith(("SELECT", "WITH"))
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement to its connection's QueryStats.
+
+    Time spent in execute and in every fetch is added up, and the statement
+    is recorded when its rows run out, the cursor is reused or closed, or the
+    cursor is garbage collected.
+    """
+
+    _pending = None
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        sql, params, elapsed, rows = pending
+        stats = self.connection.query_stats
+        if stats is not None:
+            stats.record(sql, elapsed, rows, params=params,
+                         explain=lambda: self._explain(sql, params))
+
+    def _explain(self, sql: str, params) -> Optional[List[str]]:
+        if not _is_query(sql):
+            return None
+        try:
+            # A plain cursor, so the EXPLAIN itself is not recorded.
+            plan = sqlite3.Cursor(self.connection).execute("EXPLAIN QUERY PLAN " + sql, params)
+            return [row[-1] for row in plan]
+        except sqlite3.Error:
+            return None
+
+    def _run(self, run, sql, params, logged_params):
+        self._finish()
+        stats = self.connection.query_stats
+        if stats is None:
+            return run(sql, params)
+        started = time.perf_counter()
+        try:
+            run(sql, params)
+        except sqlite3.Error:
+            stats.record(sql, time.perf_counter() - started, 0, error=True,
+                         params=logged_params)
+            raise
+        elapsed = time.perf_counter() - started
+        if self.description is None:
+            stats.record(sql, elapsed, max(self.rowcount, 0), params=logged_params)
+        else:
+            self._pending = [sql, logged_params, elapsed, 0]
+        return self
+
+    def execute(self, sql, parameters=()):
+        return self._run(super().execute, sql, parameters, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        # The parameter rows may be a long list or a generator; do not log them.
+        return self._run(super().executemany, sql, seq_of_parameters, None)
+
+    def _fetched(self, started: float, rows: int, done: bool):
+        pending = self._pending
+        if pending is not None:
+            pending[2] += time.perf_counter() - started
+            pending[3] += rows
+            if done:
+                self._finish()
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(started, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0, True)
+            raise
+        self._fetched(started, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except sqlite3.Error:
+            pass
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors record into ``query_stats`` when it is set."""
+
+    query_stats: Optional[QueryStats] = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
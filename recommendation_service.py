@@ -0,0 +1,362 @@
+"""Headless HTTP service for college recommendations.
+
+A small asyncio HTTP/1.1 server in front of DatabaseManager, so a web front
+end can use the same recommendations as the Tk recommender::
+
+    GET  /health
+    GET  /queries          (with --query-stats)
+    GET  /exams
+    GET  /search?exam=JEE+Main&field=Engineering&category=General&score=250&budget=300000
+    GET  /chances?exam=JEE+Main&field=Engineering&category=General&score=250&k=10
+    POST /batch?limit=20   one student per line (JSON lines) or a JSON array
+
+Queries run on a thread pool backed by a read-only connection pool, so the
+event loop never blocks on SQLite. Identical searches that arrive while one
+is already running share its result. Large responses are streamed with
+chunked transfer encoding.
+
+Usage::
+
+    python recommendation_service.py --db career_counseling.db --port 8080
+"""
+import argparse
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from admission_chance import AdmissionChanceEngine
+from batch_recommender import BatchRecommender, parse_student
+from database_operations import College, DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+SearchKey = Tuple[str, str, str, float, Optional[float]]
+
+
+def college_json(college: College) -> dict:
+    """JSON object for a College; much cheaper than dataclasses.asdict."""
+    return {
+        "name": college.name,
+        "location": college.location,
+        "cutoff_score": college.cutoff_score,
+        "field": college.field,
+        "tuition_fee": college.tuition_fee,
+    }
+
+
+class HTTPError(Exception):
+    """Raised to answer a request with an error status."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class RecommendationService:
+    """Route HTTP requests to DatabaseManager on a pool of worker threads."""
+
+    def __init__(self, db_manager: DatabaseManager, workers: int = 4, chunk_size: int = 500):
+        self.db_manager = db_manager
+        self.chunk_size = chunk_size
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query")
+        self.chance_engine = AdmissionChanceEngine(db_manager)
+        self._in_flight: Dict[SearchKey, asyncio.Future] = {}
+
+        self.requests = 0
+        self.searches_run = 0
+        self.searches_coalesced = 0
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def search(self, key: SearchKey) -> List[College]:
+        """Run a search, sharing the result with identical searches in flight."""
+        future = self._in_flight.get(key)
+        if future is None:
+            self.searches_run += 1
+            future = asyncio.ensure_future(self._run(self.db_manager.search_colleges, *key))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._in_flight.pop(key, None))
+        else:
+            self.searches_coalesced += 1
+        # A client that disconnects must not cancel the query for the others.
+        return await asyncio.shield(future)
+
+    # --- HTTP plumbing ---------------------------------------------------
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter):
+        """Serve requests on one keep-alive connection until the client closes it."""
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                self.requests += 1
+                try:
+                    await self.dispatch(method, target, body, writer)
+                except HTTPError as e:
+                    await self._send_json(writer, e.status, {"error": str(e)})
+                except ConnectionError:
+                    raise
+                except Exception as e:
+                    logger.exception(f"Error handling {method} {target}")
+                    await self._send_json(writer, HTTPStatus.INTERNAL_SERVER_ERROR,
+                                          {"error": str(e)})
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as e:
+            # The request itself could not be parsed; answer and hang up.
+            await self._send_json(writer, e.status, {"error": str(e)}, keep_alive=False)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "incomplete request")
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "headers too large")
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method, target, headers, body
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: HTTPStatus,
+            payload, keep_alive: bool = True):
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+            + body)
+        await writer.drain()
+
+    def _start_stream(self, writer: asyncio.StreamWriter, content_type: str):
+        writer.write(
+            f"HTTP/1.1 200 OK\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Transfer-Encoding: chunked\r\n\r\n".encode("latin-1"))
+
+    async def _write_chunk(self, writer: asyncio.StreamWriter, data: bytes):
+        if data:
+            writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+            # Waiting for the socket to drain keeps a slow client from
+            # making us buffer the whole response.
+            await writer.drain()
+
+    async def _end_stream(self, writer: asyncio.StreamWriter):
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    # --- Endpoints -------------------------------------------------------
+
+    async def dispatch(self, method: str, target: str, body: bytes,
+            writer: asyncio.StreamWriter):
+        url = urlsplit(target)
+        route = (method, url.path)
+        if route == ("GET", "/health"):
+            await self._send_json(writer, HTTPStatus.OK, self.stats())
+        elif route == ("GET", "/queries"):
+            if self.db_manager.query_stats is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, "query stats are off (start with --query-stats)")
+            await self._send_json(writer, HTTPStatus.OK, self.db_manager.query_stats.snapshot())
+        elif route == ("GET", "/exams"):
+            exams = await self._run(self.db_manager.get_exam_types)
+            await self._send_json(writer, HTTPStatus.OK, {"exams": exams})
+        elif route == ("GET", "/search"):
+            await self.handle_search(parse_qs(url.query), writer)
+        elif route == ("GET", "/chances"):
+            await self.handle_chances(parse_qs(url.query), writer)
+        elif route == ("POST", "/batch"):
+            await self.handle_batch(body, parse_qs(url.query), writer)
+        elif url.path in ("/health", "/queries", "/exams", "/search", "/chances", "/batch"):
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {url.path}")
+        else:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"no such endpoint: {url.path}")
+
+    @staticmethod
+    def _search_key(params: Dict[str, List[str]]) -> SearchKey:
+        def value(name, required=True):
+            values = params.get(name)
+            if not values or not values[0].strip():
+                if required:
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, f"missing parameter: {name}")
+                return None
+            return values[0].strip()
+
+        try:
+            score = float(value("score"))
+            budget = value("budget", required=False)
+            budget = float(budget) if budget is not None else None
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "score and budget must be numbers")
+        return value("exam"), value("field"), value("category"), score, budget
+
+    async def handle_search(self, params: Dict[str, List[str]],
+            writer: asyncio.StreamWriter):
+        colleges = await self.search(self._search_key(params))
+        if len(colleges) <= self.chunk_size:
+            await self._send_json(writer, HTTPStatus.OK, {
+                "count": len(colleges),
+                "colleges": [college_json(college) for college in colleges]
+            })
+            return
+
+        self._start_stream(writer, "application/json")
+        await self._write_chunk(writer, f'{{"count": {len(colleges)}, "colleges": ['.encode())
+        for start in range(0, len(colleges), self.chunk_size):
+            chunk = colleges[start:start + self.chunk_size]
+            text = ", ".join(json.dumps(college_json(college)) for college in chunk)
+            await self._write_chunk(writer, ((", " if start else "") + text).encode("utf-8"))
+        await self._write_chunk(writer, b"]}")
+        await self._end_stream(writer)
+
+    async def handle_chances(self, params: Dict[str, List[str]],
+            writer: asyncio.StreamWriter):
+        """The most selective safe, target and reach colleges for one student."""
+        try:
+            k = int(params["k"][0]) if "k" in params else 10
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "k must be an integer")
+        chances = await self._run(self.chance_engine.chances, *self._search_key(params), k)
+        await self._send_json(writer, HTTPStatus.OK, {
+            "count": len(chances),
+            "colleges": [dict(college_json(result.college), chance=result.chance,
+                              band=result.band, margin=result.margin)
+                         for result in chances]
+        })
+
+    def _parse_students(self, body: bytes):
+        try:
+            text = body.decode("utf-8").strip()
+            if text.startswith("["):
+                rows = json.loads(text)
+            else:
+                rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+            for row in rows:
+                if not isinstance(row, dict):
+                    raise TypeError(f"expected an object, got {json.dumps(row)[:50]}")
+            return [parse_student(row) for row in rows]
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"invalid student record: {e}")
+
+    async def handle_batch(self, body: bytes, params: Dict[str, List[str]],
+            writer: asyncio.StreamWriter):
+        """Stream one JSON line of recommendations per student, in input order."""
+        try:
+            limit = int(params["limit"][0]) if "limit" in params else None
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "limit must be an integer")
+        records = self._parse_students(body)
+        results = BatchRecommender(self.db_manager, limit=limit).recommend(records)
+
+        self._start_stream(writer, "application/x-ndjson")
+        try:
+            while True:
+                # The generator is only ever advanced by one thread at a time.
+                chunk = await self._run(lambda: list(islice(results, self.chunk_size)))
+                if not chunk:
+                    break
+                lines = "".join(json.dumps({
+                    "student_id": result.student_id,
+                    "colleges": [college_json(college) for college in result.colleges]
+                }) + "\n" for result in chunk)
+                await self._write_chunk(writer, lines.encode("utf-8"))
+        except Exception as e:
+            # The status line is already sent; all we can do is cut the
+            # stream short so the client sees an incomplete response.
+            logger.exception("Error while streaming batch results")
+            raise ConnectionAbortedError(str(e))
+        await self._end_stream(writer)
+
+    def stats(self) -> dict:
+        """Counters reported by /health."""
+        return {
+            "status": "ok",
+            "requests": self.requests,
+            "searches_run": self.searches_run,
+            "searches_coalesced": self.searches_coalesced,
+            "searches_in_flight": len(self._in_flight),
+            "cache": self.db_manager.cache_stats(),
+        }
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle_connection, host, port,
+                                            limit=MAX_HEADER_BYTES)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        logger.info(f"Serving recommendations on {addresses}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.db_manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve college recommendations over HTTP.")
+    parser.add_argument("--db", default="career_counseling.db", help="database path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=4,
+                        help="query threads, and read connections in the pool")
+    parser.add_argument("--cutoff-index", action="store_true",
+                        help="answer searches from the in-memory cutoff index; it is "
+                             "reloaded in full whenever another process writes")
+    parser.add_argument("--cache", action="store_true",
+                        help="cache search results (bounded LRU with a TTL)")
+    parser.add_argument("--query-stats", type=float, metavar="SLOW_MS",
+                        help="time every query, log those slower than SLOW_MS "
+                             "and report them at /queries")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    db_manager = DatabaseManager(args.db, pool_size=args.workers, read_only=True,
+                                 use_cutoff_index=args.cutoff_index)
+    if args.cache:
+        db_manager.enable_result_cache()
+    if args.query_stats is not None:
+        db_manager.enable_query_stats(slow_ms=args.query_stats, explain_slow=True)
+    service = RecommendationService(db_manager, workers=args.workers)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
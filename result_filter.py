@@ -0,0 +1,74 @@
+"""Incremental substring filtering over a set of search results.
+
+Every item's searchable text is lower-cased once, when its page of results
+arrives. While the user keeps typing, each new query only re-checks the
+items that matched the previous query. Other queries (after a deletion, or
+a paste) start from the intersection of trigram posting lists instead of
+scanning every item; the trigram index is built the first time it is needed.
+"""
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+class ResultFilter:
+    """Filter a list of items by case-insensitive substring match."""
+
+    def __init__(self, items: List, fields: Callable[[object], Sequence[str]]):
+        self.items = items
+        self.fields = fields
+        # Fields are joined with a newline so a match never spans two fields.
+        self._texts = ["\n".join(fields(item)).lower() for item in items]
+        self._trigrams: Optional[Dict[str, List[int]]] = None
+        self._last_text = ""
+        self._last_matches = list(range(len(items)))
+
+    def add_items(self, items: Sequence):
+        """Append items to the filtered list, e.g. the next page of results."""
+        start = len(self._texts)
+        self.items.extend(items)
+        self._texts.extend("\n".join(self.fields(item)).lower() for item in items)
+        if self._trigrams is not None:
+            for position in range(start, len(self._texts)):
+                text = self._texts[position]
+                for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                    self._trigrams.setdefault(trigram, []).append(position)
+        # The previous query's matches do not cover the new items.
+        self._last_text = ""
+
+    def _build_trigrams(self):
+        self._trigrams = {}
+        for position, text in enumerate(self._texts):
+            for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                self._trigrams.setdefault(trigram, []).append(position)
+
+    def _candidates(self, text: str) -> List[int]:
+        if self._last_text and text.startswith(self._last_text):
+            return self._last_matches
+        if len(text) < 3:
+            return list(range(len(self.items)))
+        if self._trigrams is None:
+            self._build_trigrams()
+        postings = []
+        for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            posting = self._trigrams.get(trigram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return sorted(candidates)
+
+    def filter(self, text: str) -> List:
+        """Return the items containing ``text``, in their original order."""
+        text = text.lower()
+        if not text:
+            matches = list(range(len(self.items)))
+        else:
+            matches = [position for position in self._candidates(text)
+                       if text in self._texts[position]]
+        self._last_text = text
+        self._last_matches = matches
+        return [self.items[position] for position in matches]
@@ -0,0 +1,119 @@
+"""Debounced background search for Tk search boxes.
+
+Keystrokes restart a short timer, so a burst of typing issues one query.
+Queries run on a worker thread; when a newer query is requested the running
+one is told to stop, and only the newest result is handed back to the Tk
+main thread.
+"""
+import logging
+import queue
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class SearchScheduler:
+    """Run the latest requested search off the Tk main thread.
+
+    ``run_query(*args, cancelled=...)`` is called on a worker thread and may
+    poll ``cancelled()`` to stop early. ``on_result(result)`` and
+    ``on_error(exception)`` are called on the Tk main thread.
+    """
+
+    POLL_MS = 15
+
+    def __init__(self, root, run_query, on_result, on_error=None, delay_ms=250):
+        self.root = root
+        self.run_query = run_query
+        self.on_result = on_result
+        self.on_error = on_error
+        self.delay_ms = delay_ms
+
+        self.keystrokes = 0
+        self.queries_issued = 0
+        self.queries_cancelled = 0
+        self.results_applied = 0
+
+        # Only the query with the newest generation may deliver a result.
+        self._generation = 0
+        self._awaiting_result = False
+        self._pending_after = None
+        self._polling = False
+        self._results = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+
+    def request(self, *args, delay_ms=None):
+        """Schedule a search, replacing any search that has not finished yet."""
+        self.keystrokes += 1
+        if self._pending_after is not None:
+            self.root.after_cancel(self._pending_after)
+        delay = self.delay_ms if delay_ms is None else delay_ms
+        self._pending_after = self.root.after(delay, self._dispatch, args)
+
+    def _dispatch(self, args):
+        self._pending_after = None
+        if self._awaiting_result:
+            self.queries_cancelled += 1
+        self._awaiting_result = True
+        self._generation += 1
+        self.queries_issued += 1
+        self._executor.submit(self._run, self._generation, args)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.POLL_MS, self._poll)
+
+    def _is_stale(self, generation):
+        return generation != self._generation
+
+    def _run(self, generation, args):
+        if self._is_stale(generation):
+            return
+        try:
+            result = self.run_query(*args, cancelled=lambda: self._is_stale(generation))
+            self._results.put((generation, result, None))
+        except Exception as e:
+            self._results.put((generation, None, e))
+
+    def _poll(self):
+        """Deliver the newest finished result on the Tk main thread."""
+        latest = None
+        while True:
+            try:
+                latest = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+        if latest is not None and not self._is_stale(latest[0]):
+            _, result, error = latest
+            self._awaiting_result = False
+            self._polling = False
+            self.results_applied += 1
+            logger.debug(f"Search: {self.queries_issued} queries for {self.keystrokes} "
+                         f"requests ({self.queries_cancelled} superseded)")
+            if error is None:
+                self.on_result(result)
+            elif self.on_error is not None:
+                self.on_error(error)
+            return
+        self.root.after(self.POLL_MS, self._poll)
+
+    def stats(self):
+        """Counters for comparing queries issued against requests made."""
+        return {
+            "keystrokes": self.keystrokes,
+            "queries_issued": self.queries_issued,
+            "queries_cancelled": self.queries_cancelled,
+            "results_applied": self.results_applied,
+        }
+
+    def shutdown(self):
+        """Cancel pending work and stop the worker thread."""
+        if self._pending_after is not None:
+            try:
+                self.root.after_cancel(self._pending_after)
+            except tk.TclError:
+                pass  # the window was destroyed along with its timers
+            self._pending_after = None
+        self._generation += 1
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,166 @@
+"""Startup timing shared by the launcher and the two GUIs.
+
+The launcher records when a button was clicked in an environment variable,
+so the time survives into a child process. When CAREER_COUNCIL_REPORT_PAINT
+is set, the GUI reports how long it took from that click until its window
+was first painted.
+
+Run this module to profile one entry point from process start to first
+paint, with an import-time and a construction-time breakdown::
+
+    python startup_profile.py college_recommender [--exit]
+"""
+import builtins
+import importlib
+import os
+import sys
+import time
+
+CLICK_TIME_ENV = "CAREER_COUNCIL_CLICK_TIME"
+# Opt-in: without it the click time is recorded but nothing is printed.
+REPORT_PAINT_ENV = "CAREER_COUNCIL_REPORT_PAINT"
+# Set by the startup benchmark so the GUI closes itself once it has painted.
+EXIT_AFTER_PAINT_ENV = "CAREER_COUNCIL_EXIT_AFTER_PAINT"
+
+ENTRY_POINTS = {
+    "launcher": "ModernLoginApp",
+    "college_manager": "CollegeManagerGUI",
+    "college_recommender": "CollegeRecommenderGUI",
+}
+# Methods that build or fill the window and are timed while profiling.
+PROFILED_PREFIXES = ("__init__", "init_ui", "create_", "populate_", "load_")
+
+
+def mark_click():
+    """Remember the moment the user asked to open an app."""
+    os.environ[CLICK_TIME_ENV] = repr(time.time())
+
+
+def after_first_paint(root, callback):
+    """Call ``callback()`` once, as soon as a Tk window has been drawn."""
+    def on_expose(event):
+        root.unbind('<Expose>', binding)
+        callback()
+
+    binding = root.bind('<Expose>', on_expose, '+')
+
+
+def watch_first_paint(root, name):
+    """Report click-to-first-paint time for a Tk window, if a click was marked
+    and reporting was asked for."""
+    click_time = os.environ.pop(CLICK_TIME_ENV, None)
+    if click_time is None or not os.environ.get(REPORT_PAINT_ENV):
+        return
+
+    def report():
+        elapsed = time.time() - float(click_time)
+        print(f"{name}: {elapsed * 1000:.0f} ms from click to first paint", file=sys.stderr)
+        if os.environ.get(EXIT_AFTER_PAINT_ENV):
+            root.after_idle(root.destroy)
+
+    after_first_paint(root, report)
+
+
+class StartupProfile:
+    """Collect import and construction timings for one entry point."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports = []
+        self.methods = {}
+        self._depth = 0
+        self._original_import = builtins.__import__
+
+    def install_import_timer(self):
+        builtins.__import__ = self._timed_import
+
+    def remove_import_timer(self):
+        builtins.__import__ = self._original_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        depth = self._depth
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth = depth
+            self.imports.append((depth, name, time.perf_counter() - started))
+
+    def time_methods(self, cls):
+        """Wrap the window-building methods of ``cls`` with timers."""
+        for name, func in list(vars(cls).items()):
+            if callable(func) and name.startswith(PROFILED_PREFIXES):
+                setattr(cls, name, self._timed_method(name, func))
+
+    def _timed_method(self, name, func):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                calls, total = self.methods.get(name, (0, 0.0))
+                self.methods[name] = (calls + 1, total + time.perf_counter() - started)
+        wrapper.__name__ = name
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+
+    def report(self, out=sys.stderr):
+        elapsed = time.perf_counter() - self.started
+        print(f"time to first paint: {elapsed * 1000:.1f} ms", file=out)
+        print("imports (inclusive, two levels deep):", file=out)
+        for depth, name, seconds in sorted(self.imports, key=lambda i: -i[2]):
+            if depth < 2 and seconds >= 0.001:
+                print(f"  {'  ' * depth}{name:<{40 - 2 * depth}} {seconds * 1000:8.1f} ms", file=out)
+        print("construction (inclusive):", file=out)
+        for name, (calls, seconds) in sorted(self.methods.items(), key=lambda m: -m[1][1]):
+            print(f"  {name:<30} x{calls:<5} {seconds * 1000:8.1f} ms", file=out)
+
+
+def profile_entry_point(module_name, exit_after_paint=False):
+    """Start an entry point and print a startup profile when it first paints."""
+    profile = StartupProfile()
+    profile.install_import_timer()
+    module = importlib.import_module(module_name)
+    profile.remove_import_timer()
+
+    cls = getattr(module, ENTRY_POINTS[module_name])
+    profile.time_methods(cls)
+    init = cls.__init__
+
+    def profiled_init(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        if hasattr(self, "root"):
+            def painted():
+                profile.report()
+                if exit_after_paint:
+                    self.root.after_idle(self.root.destroy)
+            after_first_paint(self.root, painted)
+        else:
+            # The Qt launcher paints during the first event loop iteration.
+            from PyQt6.QtCore import QTimer
+            from PyQt6.QtWidgets import QApplication
+
+            def painted():
+                profile.report()
+                if exit_after_paint:
+                    QApplication.instance().quit()
+            QTimer.singleShot(0, painted)
+
+    cls.__init__ = profiled_init
+    # The GUIs refuse to start without a launch token argument.
+    sys.argv = [f"{module_name}.py", "profile"]
+    module.main()
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ENTRY_POINTS:
+        print(f"usage: python startup_profile.py {{{','.join(ENTRY_POINTS)}}} [--exit]")
+        sys.exit(2)
+    profile_entry_point(sys.argv[1], exit_after_paint="--exit" in sys.argv[2:])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Deterministic synthetic colleges and cutoffs for testing and benchmarks.
+
+The same configuration and seed always produce the same database, so
+benchmark results from different commits can be compared.
+
+Usage::
+
+    python synthetic_data.py --colleges 50000 --exams 6 --fees lognormal
+    python synthetic_data.py --db bench.db --colleges 1000 --replace
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+from database_operations import DatabaseManager
+from migrations import deferred_trends
+
+# Maximum marks for the exams seeded by the first migration; extra exams
+# get a generic 0-100 scale.
+EXAM_MAX_SCORES = {"JEE Main": 300, "JEE Advanced": 360, "NEET": 720, "BITSAT": 390}
+
+# Reserved categories open at a lower fraction of the General cutoff.
+CATEGORY_FACTORS = {"General": 1.0, "OBC": 0.9, "SC": 0.75, "ST": 0.7}
+
+FEE_DISTRIBUTIONS = ("uniform", "lognormal", "bimodal")
+
+_NAME_PREFIXES = ["National", "Institute of", "Government", "Regional", "State",
+                  "Indian", "Central", "Modern", "Global", "City"]
+_NAME_SUFFIXES = {"Engineering": "Institute of Technology",
+                  "Medicine": "Medical College",
+                  "Architecture": "School of Architecture"}
+
+
+@dataclass
+class SyntheticConfig:
+    colleges: int = 10000
+    exams: int = 4
+    categories: List[str] = field(default_factory=lambda: list(CATEGORY_FACTORS))
+    fields: List[str] = field(default_factory=lambda: list(_NAME_SUFFIXES))
+    locations: int = 300
+    exams_per_college: int = 2
+    fee_distribution: str = "lognormal"
+    fee_min: float = 20000.0
+    fee_max: float = 2500000.0
+    # Marks every exam is out of; None uses each exam's own maximum.
+    max_score: Optional[float] = None
+    # Cutoff history: the current cutoffs are the final round of last_year,
+    # and earlier years and rounds are recorded in CutoffHistory.
+    years: int = 1
+    rounds: int = 1
+    last_year: int = 2025
+    seed: int = 42
+
+
+def exam_names(count: int) -> List[str]:
+    """The seeded exams first, then numbered extra exams."""
+    names = list(EXAM_MAX_SCORES)[:count]
+    names += [f"Exam {number}" for number in range(len(names) + 1, count + 1)]
+    return names
+
+
+def _max_score(config: SyntheticConfig, exam: str) -> float:
+    return config.max_score or EXAM_MAX_SCORES.get(exam, 100)
+
+
+def _fee(rng: random.Random, config: SyntheticConfig) -> float:
+    low, high = config.fee_min, config.fee_max
+    if config.fee_distribution == "uniform":
+        fee = rng.uniform(low, high)
+    elif config.fee_distribution == "lognormal":
+        # Most colleges are cheap, a long tail is expensive.
+        middle = math.sqrt(low * high)
+        fee = rng.lognormvariate(math.log(middle) - 0.5, 0.8)
+    elif config.fee_distribution == "bimodal":
+        # Subsidised public colleges and expensive private ones.
+        if rng.random() < 0.4:
+            fee = rng.gauss(low * 3, low)
+        else:
+            fee = rng.gauss(high * 0.4, high * 0.15)
+    else:
+        raise ValueError(f"unknown fee distribution '{config.fee_distribution}'")
+    return round(min(max(fee, low), high), 2)
+
+
+def generate(config: SyntheticConfig) -> Tuple[List[tuple], List[tuple]]:
+    """Return (college rows, cutoff rows) for the configuration.
+
+    College rows are (CollegeID, CollegeName, Location, Field, TuitionFee)
+    and cutoff rows are (CollegeID, ExamName, Category, CutoffScore).
+    """
+    rng = random.Random(config.seed)
+    exams = exam_names(config.exams)
+    colleges, cutoffs = [], []
+    for college_id in range(1, config.colleges + 1):
+        college_field = rng.choice(config.fields)
+        suffix = _NAME_SUFFIXES.get(college_field, college_field)
+        name = f"{rng.choice(_NAME_PREFIXES)} {suffix} {college_id}"
+        location = f"City {rng.randrange(config.locations)}"
+        colleges.append((college_id, name, location, college_field, _fee(rng, config)))
+
+        # Selectivity is per college, so a college is hard to get into under
+        # every exam and category it accepts.
+        selectivity = rng.betavariate(2, 3)
+        for exam in rng.sample(exams, min(config.exams_per_college, len(exams))):
+            max_score = _max_score(config, exam)
+            for category in config.categories:
+                factor = CATEGORY_FACTORS.get(category, 0.8)
+                score = max_score * selectivity * factor * rng.uniform(0.95, 1.05)
+                cutoffs.append((college_id, exam, category, round(min(score, max_score), 2)))
+    return colleges, cutoffs
+
+
+def history(config: SyntheticConfig, cutoffs: List[tuple]) -> Iterator[tuple]:
+    """Earlier (year, round) cutoffs leading up to the current ones.
+
+    Yields (ExamName, Category, CollegeID, Year, Round, CutoffScore) rows.
+    Each college drifts at its own rate per year, and earlier counselling
+    rounds of a year close a little higher than its final round.
+    """
+    rng = random.Random(f"{config.seed}-history")
+    drift = [rng.gauss(0, 0.02) for _ in range(config.colleges + 1)]
+    first_year = config.last_year - config.years + 1
+    for college_id, exam, category, score in cutoffs:
+        max_score = _max_score(config, exam)
+        for year in range(first_year, config.last_year + 1):
+            final = score * (1 - drift[college_id] * (config.last_year - year))
+            if year < config.last_year:
+                final *= rng.uniform(0.97, 1.03)
+            for counselling_round in range(1, config.rounds + 1):
+                if year == config.last_year and counselling_round == config.rounds:
+                    continue  # recorded from Cutoffs by its trigger
+                value = final * (1 + 0.02 * (config.rounds - counselling_round))
+                yield (exam, category, college_id, year, counselling_round,
+                       round(min(max(value, 0.0), max_score), 2))
+
+
+def populate(db_manager: DatabaseManager, config: SyntheticConfig,
+        replace: bool = False, batch_size: int = 50000) -> Tuple[int, int]:
+    """Write a synthetic dataset and return (colleges, current cutoffs) written."""
+    colleges, cutoffs = generate(config)
+    with db_manager.transaction() as conn:
+        existing = conn.execute("SELECT COUNT(*) FROM Colleges").fetchone()[0]
+        if existing and not replace:
+            raise Exception(f"Error populating database: it already has {existing} "
+                            f"colleges and replace was not requested")
+        # Clearing the summaries first keeps the per-row delete triggers cheap.
+        conn.execute("DELETE FROM CutoffTrend")
+        conn.execute("DELETE FROM CutoffHistory")
+        conn.execute("DELETE FROM Cutoffs")
+        conn.execute("DELETE FROM Colleges")
+        conn.execute("UPDATE AdmissionSession SET Year = ?, Round = ?",
+                     (config.last_year, config.rounds))
+        conn.executemany("INSERT OR IGNORE INTO Exams (ExamName) VALUES (?)",
+                         [(name,) for name in exam_names(config.exams)])
+        exam_ids = dict(conn.execute("SELECT ExamName, ExamID FROM Exams"))
+        for start in range(0, len(colleges), batch_size):
+            conn.executemany(
+                "INSERT INTO Colleges (CollegeID, CollegeName, Location, Field, TuitionFee) "
+                "VALUES (?, ?, ?, ?, ?)", colleges[start:start + batch_size])
+        with deferred_trends(conn):
+            rows = history(config, cutoffs)
+            while True:
+                batch = [(exam_ids[exam], category, college_id, year, counselling_round, score)
+                         for exam, category, college_id, year, counselling_round, score
+                         in islice(rows, batch_size)]
+                if not batch:
+                    break
+                conn.executemany(
+                    "INSERT INTO CutoffHistory "
+                    "(ExamID, Category, CollegeID, Year, Round, CutoffScore) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", batch)
+            for start in range(0, len(cutoffs), batch_size):
+                conn.executemany(
+                    "INSERT INTO Cutoffs (CollegeID, ExamID, Category, CutoffScore) "
+                    "VALUES (?, ?, ?, ?)",
+                    ((college_id, exam_ids[exam], category, score)
+                     for college_id, exam, category, score in cutoffs[start:start + batch_size]))
+    db_manager.reload_cutoff_index()
+    return len(colleges), len(cutoffs)
+
+
+def import_rows(config: SyntheticConfig) -> Iterator[dict]:
+    """The same dataset as rows in the bulk import format."""
+    colleges, cutoffs = generate(config)
+    by_id = {row[0]: row for row in colleges}
+    for college_id, exam, category, score in cutoffs:
+        _, name, location, college_field, fee = by_id[college_id]
+        yield {"college_name": name, "location": location, "field": college_field,
+               "tuition_fee": fee, "exam": exam, "category": category,
+               "cutoff_score": score}
+
+
+def main():
+    defaults = SyntheticConfig()
+    parser = argparse.ArgumentParser(description="Fill a database with synthetic colleges.")
+    parser.add_argument("--db", default="career_counseling.db", help="database path")
+    parser.add_argument("--colleges", type=int, default=defaults.colleges)
+    parser.add_argument("--exams", type=int, default=defaults.exams)
+    parser.add_argument("--categories", default=",".join(defaults.categories),
+                        help="comma-separated category names")
+    parser.add_argument("--fields", default=",".join(defaults.fields),
+                        help="comma-separated field names")
+    parser.add_argument("--locations", type=int, default=defaults.locations)
+    parser.add_argument("--exams-per-college", type=int, default=defaults.exams_per_college)
+    parser.add_argument("--fees", choices=FEE_DISTRIBUTIONS, default=defaults.fee_distribution,
+                        help="tuition fee distribution")
+    parser.add_argument("--fee-min", type=float, default=defaults.fee_min)
+    parser.add_argument("--fee-max", type=float, default=defaults.fee_max)
+    parser.add_argument("--max-score", type=float, default=defaults.max_score,
+                        help="mark every exam out of this, instead of its real maximum")
+    parser.add_argument("--years", type=int, default=defaults.years,
+                        help="years of cutoff history, ending at --last-year")
+    parser.add_argument("--rounds", type=int, default=defaults.rounds,
+                        help="counselling rounds per year")
+    parser.add_argument("--last-year", type=int, default=defaults.last_year)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--replace", action="store_true",
+                        help="delete existing colleges and cutoffs first")
+    args = parser.parse_args()
+
+    config = SyntheticConfig(
+        colleges=args.colleges,
+        exams=args.exams,
+        categories=[name.strip() for name in args.categories.split(",") if name.strip()],
+        fields=[name.strip() for name in args.fields.split(",") if name.strip()],
+        locations=args.locations,
+        exams_per_college=args.exams_per_college,
+        fee_distribution=args.fees,
+        fee_min=args.fee_min,
+        fee_max=args.fee_max,
+        max_score=args.max_score,
+        years=args.years,
+        rounds=args.rounds,
+        last_year=args.last_year,
+        seed=args.seed
+    )
+    db_manager = DatabaseManager(args.db)
+    started = time.perf_counter()
+    try:
+        colleges, cutoffs = populate(db_manager, config, replace=args.replace)
+    except Exception as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        db_manager.close()
+    print(f"Wrote {colleges:,} colleges and {cutoffs:,} cutoffs to {args.db} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
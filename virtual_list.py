@@ -0,0 +1,134 @@
+"""A scrollable list that only creates widgets for the rows in view.
+
+Rows have a fixed height. The list keeps a small pool of row widgets, just
+enough to cover the viewport, and re-fills them with different items as the
+user scrolls, so showing 100 or 100,000 results costs the same number of
+widgets.
+"""
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+
+
+class VirtualList(ttk.Frame):
+    """Scrollable list of items rendered into a recycled pool of row widgets.
+
+    ``create_row(parent)`` builds one empty row widget and
+    ``update_row(row, item)`` fills it with an item. The row height is
+    measured from the first row unless ``row_height`` is given.
+    """
+
+    def __init__(self, master, create_row, update_row, row_height=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.create_row = create_row
+        self.update_row = update_row
+        self.row_height = row_height
+        self.items = []
+        self._offset = 0
+        self._rows = []
+
+        self.scrollbar = ttk.Scrollbar(self, orient=VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=RIGHT, fill=Y)
+        self.viewport = ttk.Frame(self)
+        self.viewport.pack(side=LEFT, fill=BOTH, expand=True)
+
+        self.message_label = ttk.Label(
+            self.viewport,
+            font=("Helvetica", 12),
+            foreground="gray",
+            justify="center"
+        )
+
+        self.viewport.bind('<Configure>', lambda e: self._refresh())
+        # Only scroll with the wheel while the pointer is over the list.
+        self.bind('<Enter>', self._bind_mousewheel)
+        self.bind('<Leave>', self._unbind_mousewheel)
+
+    def set_items(self, items, keep_scroll=False):
+        """Show a new sequence of items, scrolled to the top unless ``keep_scroll``."""
+        self.items = items
+        if not keep_scroll:
+            self._offset = 0
+        self.message_label.place_forget()
+        self._refresh()
+
+    def show_message(self, text):
+        """Clear the list and show a message in its place."""
+        self.set_items([])
+        self.message_label.configure(text=text)
+        self.message_label.place(relx=0.5, y=20, anchor=N)
+
+    def _content_height(self):
+        return len(self.items) * (self.row_height or 1)
+
+    def _max_offset(self):
+        return max(self._content_height() - self.viewport.winfo_height(), 0)
+
+    def _measure_row_height(self):
+        if self.row_height or not self.items:
+            return
+        row = self.create_row(self.viewport)
+        self.update_row(row, self.items[0])
+        row.update_idletasks()
+        self.row_height = max(row.winfo_reqheight(), 1)
+        self._rows.append(row)
+
+    def _refresh(self):
+        """Place and fill just the rows that intersect the viewport."""
+        self._measure_row_height()
+        height = self.viewport.winfo_height()
+        if not self.items or not self.row_height:
+            for row in self._rows:
+                row.place_forget()
+            self.scrollbar.set(0, 1)
+            return
+
+        self._offset = min(max(self._offset, 0), self._max_offset())
+        first = self._offset // self.row_height
+        visible = min(height // self.row_height + 2, len(self.items) - first)
+
+        while len(self._rows) < visible:
+            self._rows.append(self.create_row(self.viewport))
+
+        top = first * self.row_height - self._offset
+        for i, row in enumerate(self._rows):
+            if i < visible:
+                self.update_row(row, self.items[first + i])
+                row.place(x=0, y=top + i * self.row_height, relwidth=1,
+                          height=self.row_height)
+            else:
+                row.place_forget()
+
+        total = self._content_height()
+        self.scrollbar.set(self._offset / total, min((self._offset + height) / total, 1))
+
+    def scroll_to(self, offset):
+        """Scroll so that the given pixel offset is at the top."""
+        self._offset = int(offset)
+        self._refresh()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == MOVETO:
+            self.scroll_to(float(amount) * self._content_height())
+        elif unit == PAGES:
+            self.scroll_to(self._offset + int(amount) * self.viewport.winfo_height())
+        else:
+            self.scroll_to(self._offset + int(amount) * (self.row_height or 1))
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            steps = -1
+        elif event.num == 5:
+            steps = 1
+        else:
+            steps = -1 if event.delta > 0 else 1
+        self.scroll_to(self._offset + steps * (self.row_height or 1))
+
+    def _bind_mousewheel(self, event):
+        self.bind_all('<MouseWheel>', self._on_mousewheel)
+        self.bind_all('<Button-4>', self._on_mousewheel)
+        self.bind_all('<Button-5>', self._on_mousewheel)
+
+    def _unbind_mousewheel(self, event):
+        self.unbind_all('<MouseWheel>')
+        self.unbind_all('<Button-4>')
+        self.unbind_all('<Button-5>')